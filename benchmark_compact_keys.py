@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Script to compare text keys with compact keys on a generated database.
+
+Builds the users and profiles tables twice, once with the text keys of the
+original schema and once with INTEGER user IDs and 16 byte profile IDs, fills
+both with the same rows and prints their sizes and lookup timings.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+
+USERS_SCHEMA = """
+CREATE TABLE users (
+    user_id {user_key} NOT NULL PRIMARY KEY,
+    role VARCHAR(255) NOT NULL,
+    pin_hash VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    is_deleted BOOLEAN DEFAULT 0 NOT NULL
+)
+"""
+
+PROFILES_SCHEMA = """
+CREATE TABLE profiles (
+    profile_id {profile_key} NOT NULL PRIMARY KEY,
+    user_id {user_key} NOT NULL UNIQUE REFERENCES users (user_id),
+    email VARCHAR(100) NOT NULL,
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    gender VARCHAR(10) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    is_deleted BOOLEAN DEFAULT 0 NOT NULL
+)
+"""
+
+INDEXES = [
+    f"CREATE INDEX ix_{table}_{column} ON {table} ({column})"
+    for table in ("users", "profiles")
+    for column in ("created_at", "updated_at", "is_deleted")
+]
+
+JOIN_QUERY = """
+SELECT COUNT(*) FROM users u JOIN profiles p ON p.user_id = u.user_id
+WHERE u.is_deleted = FALSE AND p.is_deleted = FALSE
+"""
+
+# Layout -> (user_id type, profile_id type, user ID encoder, profile ID encoder)
+LAYOUTS = {
+    "text": ("VARCHAR(7)", "VARCHAR(36)", str, str),
+    "compact": ("INTEGER", "BLOB", int, lambda value: value.bytes),
+}
+
+# Lookups timed per query kind
+LOOKUPS = 20000
+
+
+def build(path: str, layout: str, rows: list) -> None:
+    user_key, profile_key, encode_user, encode_profile = LAYOUTS[layout]
+    conn = sqlite3.connect(path)
+    conn.execute(USERS_SCHEMA.format(user_key=user_key))
+    conn.execute(PROFILES_SCHEMA.format(user_key=user_key, profile_key=profile_key))
+    for index in INDEXES:
+        conn.execute(index)
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (user_id, role, pin_hash) VALUES (?, 'student', ?)",
+            ((encode_user(user_id), pin_hash) for user_id, _, pin_hash, *_ in rows),
+        )
+        conn.executemany(
+            "INSERT INTO profiles (profile_id, user_id, email, first_name, last_name, gender) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (encode_profile(profile_id), encode_user(user_id), email, first_name, last_name, "male")
+                for user_id, profile_id, _, email, first_name, last_name in rows
+            ),
+        )
+    conn.execute("VACUUM")
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def sizes(conn: sqlite3.Connection) -> dict[str, int]:
+    """Bytes used by each table and index."""
+    return dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+
+
+def timed(conn: sqlite3.Connection, query: str, params: list) -> float:
+    """Microseconds per execution of the query, over all parameters."""
+    start = time.perf_counter()
+    for values in params:
+        conn.execute(query, values).fetchall()
+    return (time.perf_counter() - start) / len(params) * 1e6
+
+
+def measure(path: str, layout: str, rows: list, batch: int) -> dict:
+    _, _, encode_user, encode_profile = LAYOUTS[layout]
+    sample = random.Random(0).sample(rows, min(LOOKUPS, len(rows)))
+    user_ids = [(encode_user(row[0]),) for row in sample]
+    profile_ids = [(encode_profile(row[1]),) for row in sample]
+    batches = [
+        tuple(encode_profile(row[1]) for row in sample[start:start + batch])
+        for start in range(0, len(sample) - batch + 1, batch)
+    ]
+    in_list = "(" + ", ".join("?" * batch) + ")"
+
+    conn = sqlite3.connect(path)
+    result = {"file": os.path.getsize(path), "sizes": sizes(conn)}
+    # Warm the page cache so every layout is timed from memory
+    conn.execute(JOIN_QUERY).fetchall()
+    result["user_lookup_us"] = timed(conn, "SELECT * FROM users WHERE user_id = ?", user_ids)
+    result["profile_lookup_us"] = timed(conn, "SELECT * FROM profiles WHERE profile_id = ?", profile_ids)
+    result["join_lookup_us"] = timed(
+        conn, "SELECT * FROM users u JOIN profiles p ON p.user_id = u.user_id WHERE u.user_id = ?", user_ids
+    )
+    result["batch_lookup_us"] = timed(conn, f"SELECT * FROM profiles WHERE profile_id IN {in_list}", batches)
+    start = time.perf_counter()
+    conn.execute(JOIN_QUERY).fetchall()
+    result["join_scan_ms"] = (time.perf_counter() - start) * 1000
+    conn.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of users, each with one profile")
+    parser.add_argument("--batch", type=int, default=500, help="Profile IDs per IN list lookup")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    rows = [
+        (
+            1_000_000 + i,
+            uuid.UUID(int=rng.getrandbits(128), version=4),
+            "$pbkdf2-sha256$29000$" + "x" * 64,
+            f"user{i}@example.com",
+            f"First{i % 5000}",
+            f"Last{i % 7919}",
+        )
+        for i in range(args.rows)
+    ]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for layout in LAYOUTS:
+            path = os.path.join(directory, f"{layout}.db")
+            start = time.perf_counter()
+            build(path, layout, rows)
+            print(f"Built {layout} database of {args.rows} rows in {time.perf_counter() - start:.1f} s")
+            results[layout] = measure(path, layout, rows, args.batch)
+
+    text, compact = results["text"], results["compact"]
+    print()
+    print(f"{'':32}{'text':>12}{'compact':>12}{'change':>10}")
+
+    def line(label: str, before: float, after: float, unit: str) -> None:
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{label:32}{before:>10.1f}{unit:>2}{after:>10.1f}{unit:>2}{change:>+9.0f}%")
+
+    mib = 1024 * 1024
+    line("Database file", text["file"] / mib, compact["file"] / mib, "MB")
+    for name in sorted(set(text["sizes"]) | set(compact["sizes"])):
+        if name in ("sqlite_schema", "sqlite_stat1"):
+            continue
+        line(name, text["sizes"].get(name, 0) / mib, compact["sizes"].get(name, 0) / mib, "MB")
+    line("User lookup", text["user_lookup_us"], compact["user_lookup_us"], "us")
+    line("Profile lookup", text["profile_lookup_us"], compact["profile_lookup_us"], "us")
+    line("User with profile lookup", text["join_lookup_us"], compact["join_lookup_us"], "us")
+    line(f"IN list of {args.batch} profiles", text["batch_lookup_us"], compact["batch_lookup_us"], "us")
+    line("Full users-profiles join", text["join_scan_ms"], compact["join_scan_ms"], "ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Script to compare the negotiated response encodings on a generated roster.
+
+Builds a page of students with profiles like GET /admin/students returns,
+serializes it once as the route would, then renders that data in every
+format src/api/negotiation.py can negotiate and prints the bytes on the
+wire with the median encode and decode times.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import msgpack
+from pydantic import TypeAdapter
+
+from src.api.negotiation import JSON, MSGPACK, compress, render, zstandard
+from src.models.user_profile import UserProfilePublic
+
+FIRST_NAMES = ["Kwame", "Ama", "Kofi", "Akosua", "Yaw", "Abena", "Kojo", "Efua", "Kwesi", "Adwoa"]
+LAST_NAMES = ["Mensah", "Owusu", "Boateng", "Asante", "Osei", "Addo", "Appiah", "Ofori", "Darko", "Amoah"]
+
+
+def generate(count: int) -> list:
+    rng = random.Random(0)
+    now = datetime.now(timezone.utc)
+    entries = []
+    for i in range(count):
+        created_at = (now - timedelta(minutes=rng.randrange(10**6))).isoformat()
+        updated_at = (now - timedelta(seconds=rng.randrange(10**6))).isoformat()
+        user_id = str(1_000_000 + i)
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        entries.append({
+            "user": {"user_id": user_id, "role": "student", "created_at": created_at, "updated_at": updated_at, "is_deleted": False},
+            "profile": {
+                "profile_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                "user_id": user_id,
+                "first_name": first_name,
+                "last_name": last_name,
+                "phone": f"024{rng.randrange(10**7):07d}",
+                "email": f"{first_name}.{last_name}{i}@example.com".lower(),
+                "gender": rng.choice(["male", "female"]),
+                "date_of_birth": f"{rng.randrange(1995, 2012)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+                "photo": f"/api/v1/profile/photos/{uuid.UUID(int=rng.getrandbits(128)).hex}.jpg",
+                "marital_status": "single",
+                "emergency_contact": f"020{rng.randrange(10**7):07d}",
+                "created_at": created_at,
+                "updated_at": updated_at,
+            },
+        })
+    return TypeAdapter(List[UserProfilePublic]).validate_python(entries)
+
+
+def median_ms(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1000, help="Students in the page")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per format")
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[UserProfilePublic])
+    models = generate(args.count)
+    content = adapter.dump_python(models, mode="json")
+    serialize_ms = median_ms(lambda: adapter.dump_python(models, mode="json"), args.repeat)
+
+    decoders = {JSON: json.loads, MSGPACK: lambda body: msgpack.unpackb(body, raw=False)}
+    formats = [(JSON, False), (MSGPACK, False)]
+    if zstandard is not None:
+        formats += [(JSON, True), (MSGPACK, True)]
+        decompressor = zstandard.ZstdDecompressor()
+
+    print(f"{args.count} students, model serialization shared by every format: {serialize_ms:.1f} ms")
+    print(f"{'':24}{'bytes':>10}{'vs JSON':>9}{'encode ms':>11}{'decode ms':>11}")
+    json_size = len(render(content, JSON))
+    for media_type, compressed in formats:
+        def encode() -> bytes:
+            body = render(content, media_type)
+            return compress(body) if compressed else body
+
+        def decode(body: bytes):
+            return decoders[media_type](decompressor.decompress(body) if compressed else body)
+
+        body = encode()
+        assert decode(body) == content
+        label = media_type.split("/")[1] + (" + zstd" if compressed else "")
+        print(
+            f"{label:24}{len(body):>10}{len(body) / json_size:>9.0%}"
+            f"{median_ms(encode, args.repeat):>11.2f}{median_ms(lambda: decode(body), args.repeat):>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Script to measure how long a fresh server takes to become ready.
+
+Starts uvicorn once per mode (no warm-up, warm-up, warm-up with the prebuilt
+OpenAPI document), polls /health/ready until it answers 200 and then times
+the first and second fetch of /openapi.json. The app's own startup report,
+from the import of src.api.main to ready, is printed alongside. Run it from
+the project root against a migrated database.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from src.core.config import API_PREFIX
+
+# Mode -> extra environment
+MODES = {
+    "no warm-up": {"WARMUP_ENABLED": "false"},
+    "warm-up": {"WARMUP_ENABLED": "true"},
+    "warm-up + openapi file": {"WARMUP_ENABLED": "true", "OPENAPI_SCHEMA_PATH": "{openapi}"},
+}
+
+
+def fetch_ms(url: str) -> float:
+    started = time.perf_counter()
+    urllib.request.urlopen(url, timeout=10).read()
+    return (time.perf_counter() - started) * 1000
+
+
+def run(env: dict, port: int, timeout: float) -> dict:
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        ["uvicorn", "src.api.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + timeout
+        while True:
+            try:
+                with urllib.request.urlopen(f"{base}{API_PREFIX}/health/ready", timeout=1) as response:
+                    report = json.load(response)
+                    break
+            except (urllib.error.URLError, ConnectionError):
+                if time.perf_counter() > deadline:
+                    raise RuntimeError("Server did not become ready in time")
+                time.sleep(0.01)
+        spawn_to_ready = (time.perf_counter() - started) * 1000
+        first = fetch_ms(f"{base}/openapi.json")
+        second = fetch_ms(f"{base}/openapi.json")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return {
+        "spawn_to_ready_ms": spawn_to_ready,
+        "import_to_ready_ms": report["ready_ms"],
+        "first_openapi_ms": first,
+        "second_openapi_ms": second,
+        "steps_ms": report["steps_ms"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="Server starts per mode")
+    parser.add_argument("--port", type=int, default=8098, help="Port to bind while measuring")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for readiness")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        openapi = os.path.join(directory, "openapi.json")
+        subprocess.run(["python", "build_openapi.py", "--output", openapi], check=True, stdout=subprocess.DEVNULL)
+
+        print(f"Median of {args.runs} starts, ms")
+        print(f"{'':26}{'spawn->ready':>14}{'import->ready':>15}{'1st openapi':>13}{'2nd openapi':>13}")
+        for mode, env in MODES.items():
+            env = {name: value.format(openapi=openapi) for name, value in env.items()}
+            results = [run(env, args.port, args.timeout) for _ in range(args.runs)]
+
+            def median(key: str) -> float:
+                return statistics.median(result[key] for result in results)
+
+            print(
+                f"{mode:26}{median('spawn_to_ready_ms'):>14.0f}{median('import_to_ready_ms'):>15.0f}"
+                f"{median('first_openapi_ms'):>13.1f}{median('second_openapi_ms'):>13.1f}"
+                f"   {results[-1]['steps_ms']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Script to write the OpenAPI document at build time.
+
+Point OPENAPI_SCHEMA_PATH at the output and workers load it during warm-up
+instead of building the schema. The document carries a fingerprint of the
+routes and models it was built from, and a worker whose fingerprint differs
+ignores it, so a stale file only costs the build it was meant to save.
+"""
+
+import argparse
+import json
+
+from src.api.main import app
+from src.core.warmup import build_openapi
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", default="openapi.json", help="Where to write the document")
+    args = parser.parse_args()
+
+    schema = build_openapi(app)
+    with open(args.output, "w") as f:
+        json.dump(schema, f, separators=(",", ":"))
+    print(f"Wrote {len(schema['paths'])} paths to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
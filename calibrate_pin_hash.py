@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Script to pick PIN hash rounds that fit a latency budget on this machine.
+
+Run it on the deployment hardware and copy the printed settings into .env.
+Existing hashes are upgraded transparently on each user's next login.
+"""
+
+import argparse
+
+from src.core.config import PIN_HASH_SCHEMES
+from src.services.auth import calibrate_rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Latency budget for a single hash")
+    parser.add_argument("--scheme", default=PIN_HASH_SCHEMES[0], help="passlib scheme to calibrate")
+    parser.add_argument("--samples", type=int, default=5, help="Number of timed hashes")
+    args = parser.parse_args()
+
+    result = calibrate_rounds(args.scheme, args.target_ms, samples=args.samples)
+
+    print(f"Scheme:        {result['scheme']}")
+    print(f"Probe rounds:  {result['probe_rounds']}")
+    print(f"Median:        {result['median_ms']:.1f} ms")
+    print(f"Slowest:       {result['slowest_ms']:.1f} ms")
+    print()
+    print("# .env")
+    print(f"PIN_HASH_SCHEMES={result['scheme']}")
+    print(f"PIN_HASH_ROUNDS={result['rounds']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -79,20 +79,25 @@ async def create_user(session: aiohttp.ClientSession, user_data: Dict[str, Any])
         print(f"❌ Error creating user: {e}")
         return None
 
-async def create_multiple_users(num_users: int = 20):
-    """Create multiple users sequentially to avoid SQLite locking."""
+async def create_multiple_users(num_users: int = 20, concurrency: int = 10):
+    """Create multiple users concurrently; the server serializes the writes."""
     print(f"🚀 Creating {num_users} users...")
     print("=" * 50)
     
     # Generate user data
     users_data = [generate_user_data(i) for i in range(num_users)]
     
-    # Create users sequentially
-    results = []
+    # Create users concurrently, bounded to stay within the server's admission queue
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def create_bounded(session: aiohttp.ClientSession, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            return await create_user(session, user_data)
+
     async with aiohttp.ClientSession() as session:
-        for user_data in users_data:
-            result = await create_user(session, user_data)
-            results.append(result)
+        results = await asyncio.gather(
+            *(create_bounded(session, user_data) for user_data in users_data)
+        )
     
     # Count successful creations
     successful = sum(1 for result in results if result is not None)
@@ -0,0 +1,38 @@
+"""Gunicorn settings, taken from .env like the rest of the config.
+
+With GUNICORN_PRELOAD the app is imported in the master. Collection stays
+disabled there until the app is warmed and frozen right before the first
+fork, and is re-enabled in each worker. See src/core/preload.py.
+"""
+
+import gc
+
+# Module level names are read as settings, "config" among them
+from src.core.config import GUNICORN_BIND, GUNICORN_PRELOAD, GUNICORN_WORKERS
+
+bind = GUNICORN_BIND
+workers = GUNICORN_WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = GUNICORN_PRELOAD
+
+if preload_app:
+    gc.disable()
+
+
+def when_ready(server) -> None:
+    # Runs in the master after the app is loaded and before any worker forks
+    if server.cfg.preload_app:
+        from src.api.main import app
+        from src.core.preload import freeze_for_fork, warm_up_app
+
+        warm_up_app(app)
+        freeze_for_fork()
+
+
+def post_fork(server, worker) -> None:
+    if server.cfg.preload_app:
+        gc.enable()
+        from src.api.main import app
+
+        # The import happened in the master, time this worker from its fork
+        app.state.startup.forked()
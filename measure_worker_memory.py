@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Script to measure per-worker memory with and without GUNICORN_PRELOAD.
+
+Starts gunicorn with gunicorn.conf.py once per mode, waits until every worker
+answers, sends a few requests to each, and reads the workers' memory. PSS
+splits shared pages between the processes sharing them and USS counts only
+a worker's private pages, so both drop when workers share the master's
+imports. Run it from the project root against a migrated database.
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import time
+import urllib.request
+
+import psutil
+
+
+def start(workers: int, preload: bool, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "GUNICORN_WORKERS": str(workers),
+        "GUNICORN_PRELOAD": str(preload).lower(),
+    }
+    return subprocess.Popen(
+        ["gunicorn", "-c", "gunicorn.conf.py", "src.api.main:app"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_for_workers(master: subprocess.Popen, workers: int, port: int, timeout: float) -> list[psutil.Process]:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        children = psutil.Process(master.pid).children()
+        if len(children) == workers:
+            try:
+                # Enough requests that the kernel spreads them over the workers
+                for _ in range(20 * workers):
+                    urllib.request.urlopen(f"http://127.0.0.1:{port}/docs", timeout=2).read()
+                return children
+            except OSError:
+                pass
+        time.sleep(0.2)
+    raise RuntimeError("Workers did not come up in time")
+
+
+def measure(workers: int, preload: bool, port: int, timeout: float) -> dict:
+    master = start(workers, preload, port)
+    try:
+        children = wait_for_workers(master, workers, port, timeout)
+        # Let startup tasks settle
+        time.sleep(1)
+        infos = [child.memory_full_info() for child in children]
+        master_info = psutil.Process(master.pid).memory_full_info()
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+    mib = 1024 * 1024
+    return {
+        "rss": sum(info.rss for info in infos) / len(infos) / mib,
+        "pss": sum(info.pss for info in infos) / len(infos) / mib,
+        "uss": sum(info.uss for info in infos) / len(infos) / mib,
+        "total_pss": (sum(info.pss for info in infos) + master_info.pss) / mib,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4, help="Workers to start in each mode")
+    parser.add_argument("--port", type=int, default=8099, help="Port to bind while measuring")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the workers")
+    args = parser.parse_args()
+
+    results = {preload: measure(args.workers, preload, args.port, args.timeout) for preload in (False, True)}
+
+    print(f"{args.workers} workers, MB per worker unless noted")
+    print(f"{'':24}{'no preload':>12}{'preload':>12}")
+    for key, label in (
+        ("rss", "RSS"),
+        ("pss", "PSS"),
+        ("uss", "USS (private)"),
+        ("total_pss", "Total PSS with master"),
+    ):
+        print(f"{label:24}{results[False][key]:>12.1f}{results[True][key]:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""In-process dispatch of batched API calls.
+
+Each call of a batch becomes its own ASGI request to the app's router, and
+the calls run concurrently. They run inside the batch request's middleware,
+so request logging sees the batch once, and its batching loaders are shared:
+lookups by id issued by different calls are fetched together. Admission
+control skips the batch itself and charges each write call against the
+db-write limit instead, as if it had been sent on its own. The batch
+resolves the caller's identity once and the auth dependencies of its calls
+reuse it.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import time
+from typing import Any, Optional
+
+import msgpack
+from fastapi import Request
+from starlette.exceptions import HTTPException
+
+from src.api.dependencies.auth import SHARED_IDENTITY
+from src.api.negotiation import JSON, MSGPACK_MEDIA_TYPES
+from src.core import config
+from src.core.admission import HASH_BOUND, classify_route
+from src.models.batch import BatchItem, BatchItemResponse
+from src.models.profiles import ProfileInDb
+from src.models.user import UserInDb
+
+app_logger = logging.getLogger("app")
+
+BATCH_PATH = f"{config.API_PREFIX}/batch"
+# Streams never finish, so they cannot be part of a batch
+STREAM_PREFIX = f"{config.API_PREFIX}/events"
+# Routes that set or clear cookies, which a call's response cannot pass on
+COOKIE_ROUTES = {
+    ("POST", f"{config.API_PREFIX}/user/login"),
+    ("POST", f"{config.API_PREFIX}/user/logout"),
+}
+
+# Scope entries a call inherits from the batch request
+INHERITED_SCOPE = ("asgi", "http_version", "scheme", "root_path", "client", "server", "app", "starlette.exception_handlers")
+# Request headers a call cannot set itself
+RESERVED_HEADERS = {"cookie", "authorization", "host", "content-length", "content-type", "content-encoding", "accept", "accept-encoding"}
+# Response headers passed back with a call's response
+RESPONSE_HEADERS = {"content-type", "content-disposition", "location", "retry-after", "www-authenticate"}
+
+
+def rejection(item: BatchItem) -> Optional[str]:
+    """Why a call cannot be part of a batch, None if it can."""
+    path = item.path.partition("?")[0]
+    if not path.startswith(f"{config.API_PREFIX}/"):
+        return f"Only {config.API_PREFIX} paths can be batched."
+    if path == BATCH_PATH or path.startswith(f"{BATCH_PATH}/"):
+        return "Batches cannot be nested."
+    if path.startswith(STREAM_PREFIX):
+        return "Event streams cannot be batched."
+    if (item.method, path) in COOKIE_ROUTES:
+        return "Routes that set or clear cookies cannot be batched."
+    # These keep their own admission limit
+    if classify_route(item.method, path) == HASH_BOUND:
+        return "Login and PIN hashing routes cannot be batched."
+    return None
+
+
+def _decode_body(content_type: str, body: bytes) -> tuple[Any, Optional[str]]:
+    """(body, encoding) of a call's response for the batch response."""
+    if not body:
+        return None, None
+    media_type = content_type.partition(";")[0].strip().lower()
+    if media_type == JSON or media_type.endswith("+json"):
+        return json.loads(body), None
+    if media_type in MSGPACK_MEDIA_TYPES:
+        return msgpack.unpackb(body, raw=False), None
+    if media_type.startswith("text/"):
+        return body.decode("utf-8", errors="replace"), None
+    return base64.b64encode(body).decode("ascii"), "base64"
+
+
+def _scope(request: Request, item: BatchItem, body: bytes, identity: tuple) -> dict:
+    path, _, query = item.path.partition("?")
+    headers = [(b"accept", JSON.encode())]
+    cookie = request.headers.get("cookie")
+    if cookie is not None:
+        headers.append((b"cookie", cookie.encode("latin-1")))
+    if body:
+        headers += [(b"content-type", JSON.encode()), (b"content-length", str(len(body)).encode())]
+    headers += [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in item.headers.items()
+        if name.lower() not in RESERVED_HEADERS
+    ]
+
+    scope = {name: request.scope[name] for name in INHERITED_SCOPE if name in request.scope}
+    scope.update(
+        type="http",
+        method=item.method,
+        path=path,
+        raw_path=path.encode(),
+        query_string=query.encode("latin-1"),
+        headers=headers,
+        state=dict(request.scope.get("state", {})),
+    )
+    scope[SHARED_IDENTITY] = identity
+    return scope
+
+
+async def _call(request: Request, item: BatchItem, identity: tuple) -> BatchItemResponse:
+    body = b"" if item.body is None else json.dumps(item.body).encode("utf-8")
+    scope = _scope(request, item, body, identity)
+    finished = asyncio.Event()
+    started = {}
+    chunks = []
+
+    async def receive() -> dict:
+        nonlocal body
+        if body is not None:
+            message = {"type": "http.request", "body": body, "more_body": False}
+            body = None
+            return message
+        # The call asks again only to watch for a disconnect
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            started.update(message)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app.router(scope, receive, send)
+    except HTTPException as e:
+        # The router's own 404 and 405, otherwise answered by the app's exception middleware
+        return BatchItemResponse(id=item.id, status=e.status_code, body={"detail": e.detail})
+    finally:
+        finished.set()
+
+    headers = {}
+    for name, value in started.get("headers", []):
+        name = name.decode("latin-1").lower()
+        if name in RESPONSE_HEADERS:
+            headers[name] = value.decode("latin-1")
+    content, encoding = _decode_body(headers.get("content-type", ""), b"".join(chunks))
+    return BatchItemResponse(id=item.id, status=started["status"], headers=headers, body=content, encoding=encoding)
+
+
+async def _admitted_call(request: Request, item: BatchItem, identity: tuple) -> BatchItemResponse:
+    """_call, holding a slot of the call's admission limiter like the middleware would."""
+    admission = getattr(request.app.state, "admission", None)
+    limiter = admission.limiter_for(item.method, item.path.partition("?")[0]) if admission is not None else None
+    if limiter is None:
+        return await _call(request, item, identity)
+
+    if not await limiter.acquire():
+        app_logger.warning(f"Shedding batched {item.method} {item.path} ({limiter.name} overloaded)")
+        return BatchItemResponse(
+            id=item.id,
+            status=503,
+            headers={"retry-after": str(limiter.retry_after())},
+            body={"detail": "Server is busy, please retry later."},
+        )
+    started = time.perf_counter()
+    latency = None
+    try:
+        response = await _call(request, item, identity)
+        latency = time.perf_counter() - started
+        return response
+    finally:
+        limiter.release(latency)
+
+
+async def dispatch(request: Request, item: BatchItem, token: str, identity: tuple[UserInDb, ProfileInDb]) -> BatchItemResponse:
+    """Run one call of a batch, answering with an error response instead of raising."""
+    reason = rejection(item)
+    if reason is not None:
+        return BatchItemResponse(id=item.id, status=400, body={"detail": reason})
+    try:
+        return await asyncio.wait_for(
+            _admitted_call(request, item, (token, *identity)), timeout=config.BATCH_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        return BatchItemResponse(id=item.id, status=504, body={"detail": "Timed out."})
+    except Exception as e:
+        app_logger.exception(f"Batched {item.method} {item.path} failed: {e}")
+        return BatchItemResponse(id=item.id, status=500, body={"detail": "Internal Server Error"})
@@ -1,5 +1,7 @@
 """Authentication dependencies for user authentication and authorization."""
 
+from typing import Optional
+
 from databases import Database
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
@@ -13,6 +15,16 @@ from src.models.profiles import ProfileInDb
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
+# Scope key of (token, user, profile) resolved once by a batch for its calls
+SHARED_IDENTITY = "auth.identity"
+
+
+def _shared_identity(request: Request, token: str) -> Optional[tuple[UserInDb, ProfileInDb]]:
+    shared = request.scope.get(SHARED_IDENTITY)
+    if shared is None or shared[0] != token:
+        return None
+    return shared[1], shared[2]
+
 
 async def get_auth_service() -> AuthService:
     """Get AuthService dependency."""
@@ -37,12 +49,17 @@ async def get_token_from_cookies(request: Request) -> str:
 
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(get_token_from_cookies),
     auth_service: AuthService = Depends(get_auth_service),
     user_repo: UserRepository = Depends(get_user_repository),
     profile_repo: ProfileRepository = Depends(get_repository(ProfileRepository)),
 ) -> ProfileInDb:
     """Get the current user's profile from the access token."""
+    shared = _shared_identity(request, token)
+    if shared is not None:
+        return shared[1]
+
     try:
         # Verify token and extract user_id
         user_id = await auth_service.verify_token(token)
@@ -72,12 +89,17 @@ async def get_current_user(
 
 
 async def get_current_user_with_role(
+    request: Request,
     token: str = Depends(get_token_from_cookies),
     auth_service: AuthService = Depends(get_auth_service),
     user_repo: UserRepository = Depends(get_user_repository),
     profile_repo: ProfileRepository = Depends(get_repository(ProfileRepository)),
 ) -> tuple[UserInDb, ProfileInDb]:
     """Get the current user and profile with role information from the access token."""
+    shared = _shared_identity(request, token)
+    if shared is not None:
+        return shared
+
     try:
         # Verify token and extract user_id and role
         token_data = await auth_service.verify_token_with_role(token)
@@ -0,0 +1,20 @@
+"""Dependency for sparse fieldsets."""
+
+from typing import Optional
+
+from fastapi import HTTPException, Query, status
+
+from src.models.fields import parse_fields
+from src.models.profiles import ProfilePublic
+
+
+def get_profile_fields(
+    fields: Optional[str] = Query(
+        default=None,
+        description="Comma separated profile fields to return, e.g. user_id,first_name,last_name",
+    ),
+) -> Optional[tuple[str, ...]]:
+    try:
+        return parse_fields(ProfilePublic, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
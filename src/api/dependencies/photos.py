@@ -0,0 +1,12 @@
+"""Dependency for photo storage."""
+
+from fastapi import Request
+
+from src.services.photos import PhotoStorage
+
+
+def get_photo_storage(request: Request) -> PhotoStorage:
+    storage = getattr(request.app.state, "photo_storage", None)
+    if storage is None:
+        raise RuntimeError("Photo storage not initialized.")
+    return storage
@@ -0,0 +1,35 @@
+"""Rate limiting dependencies, resolved before any hashing or database work."""
+
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Request, status
+
+from src.models.user import UserLogin
+
+
+async def enforce_rate_limit(request: Request, route: str, user_id: Optional[str] = None) -> None:
+    """Raise a 429 when the client is over the route's limits."""
+    limiter = getattr(request.app.state, "rate_limiter", None)
+    if limiter is None:
+        return
+
+    client_ip = request.client.host if request.client else None
+    retry_after = await limiter.check(route, ip=client_ip, user_id=user_id)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please retry later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+def rate_limit(route: str) -> Callable:
+    """Dependency factory enforcing the per-IP policy of a route."""
+    async def check_rate_limit(request: Request) -> None:
+        await enforce_rate_limit(request, route)
+    return check_rate_limit
+
+
+async def rate_limit_login(request: Request, login_data: UserLogin) -> None:
+    """Enforce the login policy per client IP and per targeted user_id."""
+    await enforce_rate_limit(request, "login", user_id=login_data.user_id)
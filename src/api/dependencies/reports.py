@@ -0,0 +1,12 @@
+"""Dependency for the report engine."""
+
+from fastapi import Request
+
+from src.services.reports import ReportEngine
+
+
+def get_report_engine(request: Request) -> ReportEngine:
+    engine = getattr(request.app.state, "reports", None)
+    if engine is None:
+        raise RuntimeError("Report engine not initialized.")
+    return engine
@@ -2,6 +2,7 @@
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
+from src.api.negotiation import NegotiatedResponse
 from src.errors.core import CoreError
 
 def setup_exception_handlers(app: FastAPI) -> None:
@@ -10,6 +11,7 @@ def setup_exception_handlers(app: FastAPI) -> None:
     async def db_exception_handler(
         request: Request, exc: CoreError
     ) -> JSONResponse:
-        return JSONResponse(
+        # In the negotiated format when raised from a route
+        return NegotiatedResponse(
             status_code=exc.status_code, content={"detail": exc.message}
         )
@@ -1,12 +1,19 @@
 """Main module"""
 
+import time
+
+# Start of the app import, for the startup metrics
+IMPORT_STARTED = time.perf_counter()
+
 import logging
 
 from fastapi import FastAPI
 from src.api.exception_handlers import setup_exception_handlers
 from src.api.middleware import setup_middleware
+from src.api.negotiation import NegotiatedResponse
 from src.api.routes import setup_routes
 from src.core import config, tasks
+from src.core.warmup import Startup
 
 app = FastAPI()
 request_logger = logging.getLogger("request")
@@ -19,13 +26,14 @@ def setup_event_handlers(app: FastAPI) -> None:
 
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
-    app = FastAPI(title=config.PROJECT_NAME, version=config.VERSION)
+    app = FastAPI(title=config.PROJECT_NAME, version=config.VERSION, default_response_class=NegotiatedResponse)
 
     setup_routes(app)
     setup_event_handlers(app)
     setup_middleware(app)
     setup_exception_handlers(app)
 
+    app.state.startup = Startup(IMPORT_STARTED, import_ms=round((time.perf_counter() - IMPORT_STARTED) * 1000, 1))
     return app
 
 
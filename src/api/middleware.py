@@ -1,14 +1,66 @@
 """Middleware config"""
 
-from fastapi import FastAPI, Request
+import time
+
+from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware
 import logging
 
+from src.core import config
+from src.core.activity import RequestActivity
+from src.core.admission import create_admission_controller
+from src.db.loader import loader_scope
+
 request_logger = logging.getLogger("request")
 
 
 def setup_middleware(app: FastAPI) -> None:
+    # Registered first so it sits innermost, behind CORS and request logging
+    if config.ADMISSION_ENABLED:
+        admission = create_admission_controller()
+        app.state.admission = admission
+
+        @app.middleware("http")
+        async def admission_control(request: Request, call_next):
+            limiter = admission.limiter_for(request.method, request.url.path)
+            if limiter is None:
+                return await call_next(request)
+
+            if not await limiter.acquire():
+                request_logger.warning(
+                    f"Shedding {request.method} {request.url.path} ({limiter.name} overloaded)"
+                )
+                return JSONResponse(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    content={"detail": "Server is busy, please retry later."},
+                    headers={"Retry-After": str(limiter.retry_after())},
+                )
+
+            started = time.perf_counter()
+            latency = None
+            try:
+                response = await call_next(request)
+                latency = time.perf_counter() - started
+                return response
+            finally:
+                limiter.release(latency)
+
+    activity = RequestActivity(
+        quiet_requests=config.MAINTENANCE_QUIET_REQUESTS,
+        quiet_seconds=config.MAINTENANCE_QUIET_SECONDS,
+    )
+    app.state.activity = activity
+
+    @app.middleware("http")
+    async def request_loaders(request: Request, call_next):
+        # Background maintenance waits for quiet periods, counted here to
+        # save a middleware layer of its own
+        activity.note_request()
+        # Batched lookups and their remembered results last for one request
+        with loader_scope():
+            return await call_next(request)
+
     origins =["*"]
     app.add_middleware(
         CORSMiddleware,
@@ -0,0 +1,184 @@
+"""Content negotiation for bandwidth-constrained clients.
+
+Responses are JSON unless the Accept header asks for MessagePack, and are
+zstd-compressed when Accept-Encoding allows it and zstandard is installed.
+Request bodies may be sent the same ways, with Content-Type and
+Content-Encoding. Everything goes through FastAPI's normal path: the route
+serializes its response model to JSON-compatible data once, and
+NegotiatedResponse only chooses the bytes that data is rendered to.
+
+The routers use NegotiatedRoute, which reads the headers into a context
+variable for NegotiatedResponse, the app's default response class. Errors
+raised before the route runs, such as validation errors, stay JSON, so
+clients should decode by the response's Content-Type.
+"""
+
+import json
+from contextvars import ContextVar
+from typing import Any, Callable, Coroutine, Optional
+
+import msgpack
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+
+from src.core import config
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+# Older names clients still send
+MSGPACK_MEDIA_TYPES = {MSGPACK, "application/x-msgpack", "application/vnd.msgpack"}
+ZSTD = "zstd"
+
+# (media type, compressed), for the response of the current request
+_response_format: ContextVar[tuple[str, bool]] = ContextVar("response_format", default=(JSON, False))
+
+
+def _parse_list(header: str) -> dict[str, float]:
+    """Values of an Accept style header with their q weights."""
+    weights = {}
+    for item in header.split(","):
+        value, _, params = item.partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, number = param.strip().partition("=")
+            if name == "q":
+                try:
+                    weight = float(number)
+                except ValueError:
+                    weight = 0.0
+        weights[value.strip().lower()] = weight
+    return weights
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """MessagePack when the client names it at least as highly as JSON, otherwise JSON."""
+    if not accept or "msgpack" not in accept:
+        return JSON
+    weights = _parse_list(accept)
+    msgpack_weight = max(weights.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES)
+    json_weight = max(weights.get(JSON, 0.0), weights.get("application/*", 0.0), weights.get("*/*", 0.0))
+    return MSGPACK if msgpack_weight > 0 and msgpack_weight >= json_weight else JSON
+
+
+def negotiate_compression(accept_encoding: Optional[str]) -> bool:
+    if zstandard is None or not config.RESPONSE_ZSTD_ENABLED or not accept_encoding or ZSTD not in accept_encoding:
+        return False
+    return _parse_list(accept_encoding).get(ZSTD, 0.0) > 0
+
+
+def render(content: Any, media_type: str) -> bytes:
+    """Encode JSON-compatible data, the same way for every response."""
+    if media_type == MSGPACK:
+        return msgpack.packb(content, use_bin_type=True)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def compress(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=config.RESPONSE_ZSTD_LEVEL).compress(body)
+
+
+def decompress(body: bytes) -> bytes:
+    try:
+        return zstandard.ZstdDecompressor().decompress(body, max_output_size=config.REQUEST_MAX_DECOMPRESSED_BYTES)
+    except zstandard.ZstdError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or too large zstd body.")
+
+
+class NegotiatedResponse(JSONResponse):
+    """JSON response rendered in the format the request negotiated."""
+
+    def __init__(self, content: Any, *args, **kwargs) -> None:
+        self._media_type, self._compressed = _response_format.get()
+        super().__init__(content, *args, **kwargs)
+        self.headers.append("Vary", "Accept, Accept-Encoding")
+        if self._compressed:
+            self.headers["Content-Encoding"] = ZSTD
+
+    def render(self, content: Any) -> bytes:
+        # Read by init_headers after rendering
+        self.media_type = self._media_type
+        body = render(content, self._media_type)
+        if self._compressed and len(body) < config.RESPONSE_COMPRESS_MIN_BYTES:
+            self._compressed = False
+        return compress(body) if self._compressed else body
+
+
+class NegotiatedRequest(Request):
+    """Request whose body may be MessagePack or zstd-compressed.
+
+    FastAPI only parses bodies it sees as JSON, so the body is presented as
+    JSON and json() decodes whichever format was sent.
+    """
+
+    def __init__(self, scope, receive, *, media_type: str, compressed: bool) -> None:
+        super().__init__(scope, receive)
+        self.body_media_type = media_type
+        self.body_compressed = compressed
+
+    @property
+    def headers(self) -> Headers:
+        if not hasattr(self, "_headers"):
+            raw = [
+                (name, JSON.encode() if name == b"content-type" else value)
+                for name, value in self.scope["headers"]
+                if name != b"content-encoding"
+            ]
+            self._headers = Headers(raw=raw)
+        return self._headers
+
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            body = await super().body()
+            self._body = decompress(body) if self.body_compressed else body
+        return self._body
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            if self.body_media_type == MSGPACK:
+                self._json = msgpack.unpackb(body, raw=False)
+            else:
+                self._json = json.loads(body)
+        return self._json
+
+
+def _body_format(headers: Headers) -> Optional[tuple[str, bool]]:
+    """(media type, compressed) of a body that needs decoding, None for plain JSON."""
+    content_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+    encoding = headers.get("content-encoding", "").strip().lower()
+    media_type = MSGPACK if content_type in MSGPACK_MEDIA_TYPES else None
+    compressed = encoding == ZSTD
+    if encoding and not compressed:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=f"Unsupported Content-Encoding {encoding}.")
+    if compressed and zstandard is None:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="zstd bodies are not supported.")
+    if media_type is None and not compressed:
+        return None
+    return media_type or JSON, compressed
+
+
+class NegotiatedRoute(APIRoute):
+    """Route that decodes negotiated request bodies and picks the response format."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def negotiated_handler(request: Request) -> Response:
+            headers = request.headers
+            _response_format.set(
+                (negotiate_media_type(headers.get("accept")), negotiate_compression(headers.get("accept-encoding")))
+            )
+            body_format = _body_format(headers)
+            if body_format is not None:
+                media_type, compressed = body_format
+                request = NegotiatedRequest(request.scope, request.receive, media_type=media_type, compressed=compressed)
+            return await handler(request)
+
+        return negotiated_handler
@@ -10,6 +10,9 @@ def setup_routes(app: FastAPI) -> None:
     from src.api.routes.user import user_router
     from src.api.routes.profile import profile_router
     from src.api.routes.admin import admin_router
+    from src.api.routes.events import events_router
+    from src.api.routes.health import health_router
+    from src.api.routes.batch import batch_router
   
 
 
@@ -19,6 +22,9 @@ def setup_routes(app: FastAPI) -> None:
     app.include_router(user_router, prefix=f"{api_prefix}/user", tags=["users"])
     app.include_router(profile_router, prefix=f"{api_prefix}/profile", tags=["profile"])
     app.include_router(admin_router, prefix=f"{api_prefix}/admin", tags=["admin"])
+    app.include_router(events_router, prefix=f"{api_prefix}/events", tags=["events"])
+    app.include_router(health_router, prefix=f"{api_prefix}/health", tags=["health"])
+    app.include_router(batch_router, prefix=f"{api_prefix}/batch", tags=["batch"])
   
    
     
\ No newline at end of file
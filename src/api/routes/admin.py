@@ -1,15 +1,48 @@
 """Admin and school management routes."""
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from datetime import date
+from typing import List, Literal, Optional
 
 from src.api.dependencies.auth import require_admin
 from src.api.dependencies.database import get_repository
+from src.api.dependencies.fields import get_profile_fields
+from src.api.dependencies.rate_limit import rate_limit
+from src.api.dependencies.reports import get_report_engine
+from src.api.negotiation import NegotiatedResponse, NegotiatedRoute
+from src.core import config
+from src.core.metrics import collect_metrics
+from src.db.repos.archive import ArchiveRepository
+from src.db.repos.changes import ChangeLogRepository
+from src.db.repos.reports import ReportRepository
+from src.db.repos.roster import RosterRepository
+from src.db.repos.stats import RosterStatsRepository
 from src.db.repos.user_profile import UserProfileRepository
+from src.models.archive import ArchivedProfile, ArchivedUserProfiles, ArchiveRun, RestoredUser
+from src.models.changes import RosterChanges
+from src.models.reports import DemographicReport
+from src.models.roster import RosterFilter, RosterPage
+from src.models.stats import RosterStats
 from src.models.user_profile import UserProfileCreate, UserProfilePublic
-from src.models.user import UserUpdate
+from src.enums.gender import GenderEnum
+from src.enums.marital_status import MaritalStatusEnum
+from src.enums.users import UserRole
+from src.models.user import UserPublic, UserUpdate
+from src.services.reports import ReportEngine, demographics_csv
 
-admin_router = APIRouter()
+admin_router = APIRouter(route_class=NegotiatedRoute)
+
+user_public_adapter = TypeAdapter(UserPublic)
+
+
+def roster_fields_response(entries) -> NegotiatedResponse:
+    """Serialize (user, profile projection) pairs from a sparse fieldset read."""
+    return NegotiatedResponse(content=[
+        {"user": user_public_adapter.dump_python(user, mode="json"), "profile": profile.model_dump(mode="json")}
+        for user, profile in entries
+    ])
 
 @admin_router.get("/profile", response_model=UserProfilePublic, status_code=status.HTTP_200_OK)
 async def get_admin_profile(
@@ -19,7 +52,12 @@ async def get_admin_profile(
     user, profile = current_user_data
     return UserProfilePublic(user=user, profile=profile)
 
-@admin_router.post("/students", response_model=UserProfilePublic, status_code=status.HTTP_201_CREATED)
+@admin_router.post(
+    "/students",
+    response_model=UserProfilePublic,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("create-user"))],
+)
 async def create_student(
     user_profile_create: UserProfileCreate,
     user_profile_repo: UserProfileRepository = Depends(get_repository(UserProfileRepository)),
@@ -37,23 +75,147 @@ async def create_student(
 @admin_router.get("/students", response_model=List[UserProfilePublic], status_code=status.HTTP_200_OK)
 async def list_students(
     search: Optional[str] = Query(None, description="Search by name or email"),
+    page: Optional[int] = Query(None, ge=1, description="Page number, omit for the full list"),
+    fields: Optional[tuple[str, ...]] = Depends(get_profile_fields),
     user_profile_repo: UserProfileRepository = Depends(get_repository(UserProfileRepository)),
     current_user_data = Depends(require_admin),
 ):
     """List/search students (admin only)."""
-    students = await user_profile_repo.get_user_profiles_by_role(role="student", search=search)
+    students = await user_profile_repo.get_user_profiles_by_role(role="student", search=search, page=page, fields=fields)
+    if fields is not None:
+        return roster_fields_response(students)
     return [UserProfilePublic(user=s.user, profile=s.profile) for s in students]
 
 @admin_router.get("/staff", response_model=List[UserProfilePublic], status_code=status.HTTP_200_OK)
 async def list_staff(
     search: Optional[str] = Query(None, description="Search by name or email"),
+    page: Optional[int] = Query(None, ge=1, description="Page number, omit for the full list"),
+    fields: Optional[tuple[str, ...]] = Depends(get_profile_fields),
     user_profile_repo: UserProfileRepository = Depends(get_repository(UserProfileRepository)),
     current_user_data = Depends(require_admin),
 ):
     """List/search staff (admin only)."""
-    staff = await user_profile_repo.get_user_profiles_by_role(role="staff", search=search)
+    staff = await user_profile_repo.get_user_profiles_by_role(role="staff", search=search, page=page, fields=fields)
+    if fields is not None:
+        return roster_fields_response(staff)
     return [UserProfilePublic(user=s.user, profile=s.profile) for s in staff]
 
+@admin_router.get("/roster", response_model=RosterPage, status_code=status.HTTP_200_OK)
+async def filter_roster(
+    role: Optional[UserRole] = Query(None, description="Only users of this role"),
+    gender: Optional[GenderEnum] = Query(None, description="Only users of this gender"),
+    marital_status: Optional[MaritalStatusEnum] = Query(None, description="Only users of this marital status"),
+    search: Optional[str] = Query(None, description="Search by name or email"),
+    sort: Literal["last_name", "first_name", "user_id"] = Query("last_name", description="Sort key"),
+    descending: bool = Query(False, description="Sort in descending order"),
+    offset: int = Query(0, ge=0, description="Matching entries to skip"),
+    limit: int = Query(config.ROSTER_PAGE_SIZE, ge=0, le=1000, description="Entries per page, 0 to only count"),
+    roster_repo: RosterRepository = Depends(get_repository(RosterRepository)),
+    current_user_data = Depends(require_admin),
+):
+    """Filter, sort and count users with profiles (admin only)."""
+    return await roster_repo.filter_roster(RosterFilter(
+        role=role,
+        gender=gender,
+        marital_status=marital_status,
+        search=search,
+        sort=sort,
+        descending=descending,
+        offset=offset,
+        limit=limit,
+    ))
+
+@admin_router.get("/changes", response_model=RosterChanges, status_code=status.HTTP_200_OK)
+async def get_roster_changes(
+    since: int = Query(0, ge=0, description="Cursor from the previous sync, 0 for a full sync"),
+    limit: int = Query(config.SYNC_PAGE_SIZE, ge=1, le=config.SYNC_MAX_PAGE_SIZE, description="Changes per page"),
+    role: Optional[UserRole] = Query(None, description="Only keep entries of this role on the roster"),
+    scan: Optional[int] = Query(None, ge=0, description="scan from the previous page of a full sync"),
+    change_repo: ChangeLogRepository = Depends(get_repository(ChangeLogRepository)),
+    current_user_data = Depends(require_admin),
+):
+    """Roster entries changed after a cursor, as upserts and tombstones (admin only)."""
+    return await change_repo.get_changes(since=since, limit=limit, role=role.value if role else None, scan=scan)
+
+@admin_router.get("/stats", response_model=RosterStats, status_code=status.HTTP_200_OK)
+async def get_roster_stats(
+    stats_repo: RosterStatsRepository = Depends(get_repository(RosterStatsRepository)),
+    current_user_data = Depends(require_admin),
+):
+    """Counts of users by role, gender and marital status (admin only)."""
+    return await stats_repo.get_stats()
+
+@admin_router.post("/stats/rebuild", response_model=RosterStats, status_code=status.HTTP_200_OK)
+async def rebuild_roster_stats(
+    stats_repo: RosterStatsRepository = Depends(get_repository(RosterStatsRepository)),
+    current_user_data = Depends(require_admin),
+):
+    """Recompute the roster statistics from scratch (admin only)."""
+    return await stats_repo.rebuild()
+
+@admin_router.get("/reports/demographics", response_model=DemographicReport, status_code=status.HTTP_200_OK)
+async def get_demographic_report(
+    format: Literal["json", "csv"] = Query("json", description="Response format"),
+    report_repo: ReportRepository = Depends(get_repository(ReportRepository)),
+    report_engine: ReportEngine = Depends(get_report_engine),
+    current_user_data = Depends(require_admin),
+):
+    """Age bands, gender ratios by role and monthly enrolments (admin only)."""
+    report = await report_repo.get_demographics(report_engine, as_of=date.today())
+    if format == "csv":
+        return Response(
+            content=demographics_csv(report),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="demographics-{report.as_of}.csv"'},
+        )
+    return report
+
+@admin_router.get("/archive/users/{user_id}", response_model=ArchivedUserProfiles, status_code=status.HTTP_200_OK)
+async def get_archived_user(
+    user_id: str,
+    archive_repo: ArchiveRepository = Depends(get_repository(ArchiveRepository)),
+    current_user_data = Depends(require_admin),
+):
+    """Archived user and profiles of a user ID (admin only)."""
+    return await archive_repo.get_archived(user_id=user_id)
+
+@admin_router.get("/archive/profiles/{profile_id}", response_model=ArchivedProfile, status_code=status.HTTP_200_OK)
+async def get_archived_profile(
+    profile_id: str,
+    archive_repo: ArchiveRepository = Depends(get_repository(ArchiveRepository)),
+    current_user_data = Depends(require_admin),
+):
+    """Archived profile by profile ID (admin only)."""
+    return await archive_repo.get_archived_profile(profile_id=profile_id)
+
+@admin_router.post("/archive/users/{user_id}/restore", response_model=RestoredUser, status_code=status.HTTP_200_OK)
+async def restore_archived_user(
+    user_id: str,
+    archive_repo: ArchiveRepository = Depends(get_repository(ArchiveRepository)),
+    current_user_data = Depends(require_admin),
+):
+    """Move an archived user back to the active roster (admin only)."""
+    return await archive_repo.restore_user(user_id=user_id)
+
+@admin_router.post("/archive/run", response_model=ArchiveRun, status_code=status.HTTP_200_OK)
+async def run_archival(
+    request: Request,
+    current_user_data = Depends(require_admin),
+):
+    """Archive everything past the retention period now (admin only)."""
+    archive_job = getattr(request.app.state, "archive", None)
+    if archive_job is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Archival is disabled.")
+    return await archive_job.run_once()
+
+@admin_router.get("/metrics", response_model=dict, status_code=status.HTTP_200_OK)
+async def get_metrics(
+    request: Request,
+    current_user_data = Depends(require_admin),
+):
+    """Runtime metrics of this worker (admin only)."""
+    return collect_metrics(request.app)
+
 @admin_router.put("/students/{user_id}", response_model=UserProfilePublic, status_code=status.HTTP_200_OK)
 async def update_student(
     user_id: str,
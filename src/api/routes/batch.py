@@ -0,0 +1,39 @@
+"""Batch route to run several API calls in one round trip."""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from src.api.batch import dispatch
+from src.api.dependencies.auth import get_current_user_with_role, get_token_from_cookies
+from src.api.negotiation import NegotiatedRoute
+from src.core import config
+from src.models.batch import BatchRequest, BatchResponse
+from src.models.profiles import ProfileInDb
+from src.models.user import UserInDb
+
+batch_router = APIRouter(route_class=NegotiatedRoute)
+
+
+@batch_router.post("", response_model=BatchResponse, status_code=status.HTTP_200_OK)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    token: str = Depends(get_token_from_cookies),
+    current_user_data: tuple[UserInDb, ProfileInDb] = Depends(get_current_user_with_role),
+) -> BatchResponse:
+    """Run API calls concurrently and return their responses in order.
+
+    The caller is authenticated once for the whole batch. Each call gets its
+    own status code; calls run in no particular order, so a batch should not
+    read what another of its calls writes. Cookies set by calls are dropped.
+    """
+    if len(batch.requests) > config.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {config.BATCH_MAX_REQUESTS} calls per batch.",
+        )
+    responses = await asyncio.gather(
+        *(dispatch(request, item, token, current_user_data) for item in batch.requests)
+    )
+    return BatchResponse(responses=responses)
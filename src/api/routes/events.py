@@ -0,0 +1,85 @@
+"""Server-Sent Events routes."""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from src.api.dependencies.auth import require_staff
+from src.api.dependencies.database import get_repository
+from src.api.negotiation import NegotiatedRoute
+from src.core import config
+from src.db.repos.changes import ChangeLogRepository
+from src.services.events import EVICTED, RosterEventHub
+
+events_router = APIRouter(route_class=NegotiatedRoute)
+
+
+def get_event_hub(request: Request) -> RosterEventHub:
+    hub = getattr(request.app.state, "event_hub", None)
+    if hub is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Event stream is not available.",
+        )
+    return hub
+
+
+@events_router.get("/roster", status_code=status.HTTP_200_OK, response_class=StreamingResponse)
+async def stream_roster_events(
+    last_event_id: Optional[int] = Header(None, description="Resume after this event"),
+    hub: RosterEventHub = Depends(get_event_hub),
+    change_repo: ChangeLogRepository = Depends(get_repository(ChangeLogRepository)),
+    current_user_data = Depends(require_staff),
+):
+    """Stream user and profile create, update and delete events (staff only).
+
+    Each event's id is its change log cursor. A client that falls too far
+    behind receives an "evicted" event and is disconnected; it reconnects with
+    Last-Event-ID, or resyncs through /admin/changes.
+    """
+    # Subscribe before replaying so nothing committed in between is missed
+    subscriber = hub.subscribe()
+    replayed = []
+    if last_event_id is not None:
+        try:
+            replayed = await hub.replay(last_event_id, config.SSE_QUEUE_SIZE + 1)
+            # Events behind the horizon were pruned from the change log
+            expired = last_event_id < await change_repo.get_horizon()
+        except Exception:
+            hub.unsubscribe(subscriber)
+            raise
+        if expired or len(replayed) > config.SSE_QUEUE_SIZE:
+            # Too far behind to replay, tell the client to resync
+            subscriber.evict()
+            replayed = []
+
+    async def stream():
+        last_seq = last_event_id or 0
+        try:
+            yield f"retry: {int(config.SSE_POLL_INTERVAL_MS * 2)}\n\n"
+            for event in replayed:
+                last_seq = event.seq
+                yield event.message
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), config.SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is EVICTED:
+                    yield f"event: evicted\ndata: {{\"last_event_id\": {last_seq}}}\n\n"
+                    return
+                if event.seq <= last_seq:
+                    continue
+                last_seq = event.seq
+                yield event.message
+        finally:
+            hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,23 @@
+"""Health routes for load balancers and orchestrators."""
+
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse
+
+from src.api.negotiation import NegotiatedRoute
+
+health_router = APIRouter(route_class=NegotiatedRoute)
+
+
+@health_router.get("/ready", response_model=dict, status_code=status.HTTP_200_OK)
+async def get_readiness(request: Request):
+    """Ready once the database is connected and the warm-up succeeded, 503 until then."""
+    startup = getattr(request.app.state, "startup", None)
+    details = startup.snapshot() if startup is not None else {}
+    db = getattr(request.app.state, "_db", None)
+    if startup is None or not startup.ready or db is None or not db.is_connected:
+        state = "failed" if startup is not None and startup.error else "starting"
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": state, **details},
+        )
+    return {"status": "ready", **details}
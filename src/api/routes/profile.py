@@ -3,15 +3,29 @@
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import FileResponse
 
-from src.api.dependencies.auth import get_current_user
+from src.api.dependencies.auth import get_current_user, get_current_user_with_role
 from src.api.dependencies.database import get_repository
+from src.api.dependencies.fields import get_profile_fields
+from src.api.dependencies.photos import get_photo_storage
+from src.api.negotiation import NegotiatedResponse, NegotiatedRoute
+from src.core import config
 from src.db.repos.profiles import ProfileRepository
-from src.models.profiles import ProfilePublic, ProfileUpdate, ProfileCreate
+from src.models.photos import PhotoPublic
+from src.models.profiles import (
+    ProfileBatchRequest,
+    ProfileBatchResponse,
+    ProfileCreate,
+    ProfileInDb,
+    ProfilePublic,
+    ProfileUpdate,
+)
 from src.models.user_profile import UserProfileInDb
+from src.services.photos import PhotoStorage
 
-profile_router = APIRouter()
+profile_router = APIRouter(route_class=NegotiatedRoute)
 
 
 @profile_router.get(
@@ -20,10 +34,14 @@ profile_router = APIRouter()
     status_code=status.HTTP_200_OK,
 )
 async def get_profiles(
+    page: Optional[int] = Query(default=None, ge=1, description="Page number, omit for all profiles"),
+    fields: Optional[tuple[str, ...]] = Depends(get_profile_fields),
     profile_repo: ProfileRepository = Depends(get_repository(ProfileRepository)),
 ) -> List[ProfilePublic]:
     """Get all profiles."""
-    profiles_in_db = await profile_repo.get_profiles()
+    profiles_in_db = await profile_repo.get_profiles(page=page, fields=fields)
+    if fields is not None:
+        return NegotiatedResponse(content=[profile.model_dump(mode="json") for profile in profiles_in_db])
     return [ProfilePublic(**profile.dict()) for profile in profiles_in_db]
 
 
@@ -36,6 +54,7 @@ async def get_profile(
     profile_repo: ProfileRepository = Depends(get_repository(ProfileRepository)),
     profile_id: Optional[UUID] = Query(default=None, description="The profile's UUID"),
     user_id: Optional[int] = Query(default=None, description="The associated user's ID"),
+    fields: Optional[tuple[str, ...]] = Depends(get_profile_fields),
 ) -> ProfilePublic:
     """Get a profile by profile ID or user ID."""
     if profile_id is None and user_id is None:
@@ -43,6 +62,9 @@ async def get_profile(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Either profile_id or user_id must be provided.",
         )
+    if fields is not None:
+        profile = await profile_repo.get_profile_fields(fields=fields, id=profile_id, user_id=user_id)
+        return NegotiatedResponse(content=profile.model_dump(mode="json"))
     if profile_id is not None:
         profile = await profile_repo.get_profile_by_id(id=profile_id)
         if profile is None:
@@ -59,7 +81,38 @@ async def get_profile(
                 detail="Profile not found.",
             )
         return profile
-        return await profile_repo.get_profile_by_user_id(user_id=user_id)
+
+
+@profile_router.post(
+    "/batch",
+    response_model=ProfileBatchResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_profiles_batch(
+    batch: ProfileBatchRequest,
+    fields: Optional[tuple[str, ...]] = Depends(get_profile_fields),
+    profile_repo: ProfileRepository = Depends(get_repository(ProfileRepository)),
+    current_user: ProfileInDb = Depends(get_current_user),
+) -> ProfileBatchResponse:
+    """Get many profiles by user IDs or profile IDs in one query."""
+    if batch.user_ids is not None:
+        ids = list(dict.fromkeys(batch.user_ids))
+        found = await profile_repo.get_profiles_by_user_ids(ids, fields=fields)
+    else:
+        ids = list(dict.fromkeys(str(profile_id) for profile_id in batch.profile_ids))
+        found = await profile_repo.get_profiles_by_ids(ids, fields=fields)
+    missing = [id for id in ids if id not in found]
+    if fields is not None:
+        return NegotiatedResponse(content={
+            "profiles": [found[id].model_dump(mode="json") for id in ids if id in found],
+            "missing": missing,
+        })
+    return ProfileBatchResponse(
+        profiles=[found[id] for id in ids if id in found],
+        missing=missing,
+    )
+
+
 @profile_router.get(
     "/me",
     response_model=ProfilePublic,
@@ -102,6 +155,72 @@ async def update_profile(
     )
 
 
+@profile_router.post(
+    "/{profile_id}/photo",
+    response_model=PhotoPublic,
+    status_code=status.HTTP_201_CREATED,
+)
+async def upload_profile_photo(
+    profile_id: UUID,
+    file: UploadFile = File(..., description="JPEG, PNG, WEBP or GIF image"),
+    profile_repo: ProfileRepository = Depends(get_repository(ProfileRepository)),
+    photo_storage: PhotoStorage = Depends(get_photo_storage),
+    current_user_data = Depends(get_current_user_with_role),
+) -> PhotoPublic:
+    """Upload a profile photo; users may set their own, staff may set anyone's."""
+    user, _ = current_user_data
+    profile = await profile_repo.get_profile_by_id(id=profile_id)
+    if profile.user_id != user.user_id and user.role not in ("staff", "admin", "super_admin"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You may only change your own photo.",
+        )
+
+    data = await file.read(config.PHOTO_MAX_BYTES + 1)
+    if len(data) > config.PHOTO_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Photo must be at most {config.PHOTO_MAX_BYTES} bytes.",
+        )
+
+    photo = await photo_storage.save(data)
+    await profile_repo.update_profile(id=profile_id, profile_update=ProfileUpdate(photo=photo.url))
+    return PhotoPublic(filename=photo.filename, url=photo.url, thumbnails=photo.thumbnails)
+
+
+@profile_router.get(
+    "/photos/{variant}/{filename}",
+    status_code=status.HTTP_200_OK,
+    response_class=FileResponse,
+)
+async def get_photo(
+    variant: str,
+    filename: str,
+    photo_storage: PhotoStorage = Depends(get_photo_storage),
+) -> Response:
+    """Serve an original ("original") or a thumbnail (its size in pixels).
+
+    URLs are content addressed, so responses are cached forever. Range
+    requests are supported, and with PHOTO_SENDFILE_HEADER set the fronting
+    proxy sends the file itself.
+    """
+    found = await photo_storage.resolve(variant, filename)
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Photo not found.",
+        )
+    path, media_type = found
+    headers = {"Cache-Control": "public, max-age=31536000, immutable"}
+
+    if config.PHOTO_SENDFILE_HEADER:
+        relative_path = path.relative_to(photo_storage.root).as_posix()
+        headers[config.PHOTO_SENDFILE_HEADER] = f"{config.PHOTO_SENDFILE_PREFIX}/{relative_path}"
+        return Response(headers=headers, media_type=media_type)
+
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
 @profile_router.delete(
     "/{profile_id}",
     response_model=ProfilePublic,
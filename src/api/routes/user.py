@@ -10,18 +10,21 @@ from src.models.token import AccessToken
 from src.db.repos.user import UserRepository
 from src.models.user import UserLogin, UserPublic, UserUpdate, UserMe, UserMeWithRole
 from src.api.dependencies.database import get_repository
+from src.api.dependencies.rate_limit import rate_limit, rate_limit_login
+from src.api.negotiation import NegotiatedRoute
 from src.errors.database import NotFoundError
 from src.db.repos.user_profile import UserProfileRepository
 from src.models.user_profile import UserProfileCreate, UserProfilePublic, UserProfileCreateResponse
 from src.models.user import UserInDb
 
-user_router = APIRouter()
+user_router = APIRouter(route_class=NegotiatedRoute)
 
 
 @user_router.post(
     "/create-user",
     response_model=UserProfileCreateResponse,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("create-user"))],
 )
 async def create_user(
     user_profile_create: UserProfileCreate,
@@ -29,30 +32,16 @@ async def create_user(
     user_repo: UserRepository = Depends(get_repository(UserRepository)),
 ) -> UserProfileCreateResponse:
     """Create a new user with profile and return user_id, pin, and profile_id."""
-    
-    # Debug the incoming request
-    print(f"Received user PIN: {user_profile_create.user.pin}")
-    print(f"Type of received PIN: {type(user_profile_create.user.pin)}")
-    print(f"Received PIN is None: {user_profile_create.user.pin is None}")
-    
     user_profile_in_db, generated_pin = await user_profile_repo.create_user_profile(
         new_user=user_profile_create.user,
         new_profile=user_profile_create.profile,
     )
-    
-    print(f"Generated PIN in endpoint: {generated_pin}")  # Debug log
-    print(f"Type of generated_pin: {type(generated_pin)}")  # Debug log
-    print(f"Generated PIN repr: {repr(generated_pin)}")  # Debug log
-    
+
     response_data = UserProfileCreateResponse(
         user_id=user_profile_in_db.user.user_id,
         pin=generated_pin,  # Return the generated PIN
         profile_id=str(user_profile_in_db.profile.profile_id)
     )
-    
-    print(f"Response data pin: {response_data.pin}")  # Debug log
-    print(f"Response data type: {type(response_data.pin)}")  # Debug log
-    
     return response_data
 
 
@@ -97,6 +86,7 @@ async def delete_user(
     "/login",
     response_model=AccessToken,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(rate_limit_login)],
 )
 async def user_login(
     response: Response,
@@ -0,0 +1,30 @@
+"""Request activity of this worker, used to find quiet periods for background work."""
+
+import time
+from collections import deque
+
+
+class RequestActivity:
+    """Remembers when the latest requests started.
+
+    The worker is quiet while fewer than quiet_requests requests started in
+    the last quiet_seconds. Only the start times of the last quiet_requests
+    requests are kept, so the check is constant time at any request rate.
+    """
+
+    def __init__(self, *, quiet_requests: int, quiet_seconds: float) -> None:
+        self.quiet_seconds = quiet_seconds
+        self.requests = 0
+        self._recent: deque[float] = deque(maxlen=max(1, quiet_requests))
+
+    def note_request(self) -> None:
+        self.requests += 1
+        self._recent.append(time.monotonic())
+
+    def is_quiet(self) -> bool:
+        if len(self._recent) < self._recent.maxlen:
+            return True
+        return time.monotonic() - self._recent[0] > self.quiet_seconds
+
+    def snapshot(self) -> dict:
+        return {"requests": self.requests, "quiet": self.is_quiet()}
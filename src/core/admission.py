@@ -0,0 +1,196 @@
+"""Admission control for expensive route classes."""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Optional
+
+from src.core import config
+
+app_logger = logging.getLogger("app")
+
+HASH_BOUND = "hash-bound"
+DB_WRITE = "db-write"
+
+# Routes that hash a PIN before touching the database
+HASH_BOUND_ROUTES = {
+    ("POST", f"{config.API_PREFIX}/user/login"),
+    ("POST", f"{config.API_PREFIX}/user/create-user"),
+    ("POST", f"{config.API_PREFIX}/admin/students"),
+}
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Charges each of its calls instead, see src/api/batch.py
+BATCH_ROUTE = ("POST", f"{config.API_PREFIX}/batch")
+
+
+def classify_route(method: str, path: str) -> Optional[str]:
+    """Return the route class for a request, or None if it is not admission controlled."""
+    if (method, path) == BATCH_ROUTE:
+        return None
+    if (method, path) in HASH_BOUND_ROUTES:
+        return HASH_BOUND
+    if method in WRITE_METHODS and path.startswith(config.API_PREFIX):
+        return DB_WRITE
+    return None
+
+
+class AdaptiveLimiter:
+    """Concurrency limiter with a bounded wait queue and an AIMD limit.
+
+    The limit grows by roughly one slot per limit's worth of requests that
+    finish under the latency target, and is cut multiplicatively (at most once
+    per target interval) when a request takes longer than the target.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        max_queue: int,
+        queue_timeout: float,
+        latency_target: float,
+        backoff: float = 0.9,
+    ) -> None:
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.backoff = backoff
+
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self.in_flight = 0
+        self.shed = 0
+        self.avg_latency = latency_target
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting up to the queue timeout. Returns False when shed."""
+        if self._has_capacity() and not self._waiters:
+            self.in_flight += 1
+            return True
+
+        if len(self._waiters) >= self.max_queue:
+            self.shed += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as the deadline passed, give it back
+                self.release(None)
+            else:
+                waiter.cancel()
+            self.shed += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(None)
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        return True
+
+    def release(self, latency: Optional[float]) -> None:
+        """Return a slot and feed the observed latency back into the limit."""
+        self.in_flight -= 1
+        if latency is not None:
+            self._adjust(latency)
+        self._wake_waiters()
+
+    def _adjust(self, latency: float) -> None:
+        self.avg_latency = 0.8 * self.avg_latency + 0.2 * latency
+        if latency <= self.latency_target:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            return
+
+        now = time.monotonic()
+        if now - self._last_decrease >= self.latency_target:
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def retry_after(self) -> int:
+        """Estimate, in whole seconds, when a rejected client may retry."""
+        backlog = self.queued + 1
+        return max(1, math.ceil(self.avg_latency * backlog / max(int(self.limit), 1)))
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "shed": self.shed,
+            "avg_latency_ms": round(self.avg_latency * 1000, 2),
+        }
+
+
+class AdmissionController:
+    """Holds one adaptive limiter per route class."""
+
+    def __init__(self, limiters: dict[str, AdaptiveLimiter]) -> None:
+        self.limiters = limiters
+
+    def limiter_for(self, method: str, path: str) -> Optional[AdaptiveLimiter]:
+        route_class = classify_route(method, path)
+        if route_class is None:
+            return None
+        return self.limiters.get(route_class)
+
+    def snapshot(self) -> dict:
+        return {name: limiter.snapshot() for name, limiter in self.limiters.items()}
+
+
+def create_admission_controller() -> AdmissionController:
+    """Build the controller from config."""
+    return AdmissionController(
+        {
+            HASH_BOUND: AdaptiveLimiter(
+                HASH_BOUND,
+                initial_limit=config.ADMISSION_HASH_BOUND_LIMIT,
+                min_limit=1,
+                max_limit=config.ADMISSION_HASH_BOUND_MAX_LIMIT,
+                max_queue=config.ADMISSION_HASH_BOUND_QUEUE,
+                queue_timeout=config.ADMISSION_QUEUE_TIMEOUT,
+                latency_target=config.ADMISSION_HASH_BOUND_TARGET_MS / 1000,
+            ),
+            DB_WRITE: AdaptiveLimiter(
+                DB_WRITE,
+                initial_limit=config.ADMISSION_DB_WRITE_LIMIT,
+                min_limit=1,
+                max_limit=config.ADMISSION_DB_WRITE_MAX_LIMIT,
+                max_queue=config.ADMISSION_DB_WRITE_QUEUE,
+                queue_timeout=config.ADMISSION_QUEUE_TIMEOUT,
+                latency_target=config.ADMISSION_DB_WRITE_TARGET_MS / 1000,
+            ),
+        }
+    )
@@ -1,7 +1,10 @@
 """ configs."""
 
+import os
+
 from databases import DatabaseURL
 from starlette.config import Config
+from starlette.datastructures import CommaSeparatedStrings
 
 config = Config(".env")
 
@@ -34,3 +37,170 @@ REFRESH_TOKEN_EXPIRE_DAYS = config("REFRESH_TOKEN_EXPIRE_DAYS", cast=int, defaul
 SECRET_KEY = config("SECRET_KEY", cast=str, default="")
 ALGORITHM = config("ALGORITHM", cast=str, default="HS256")
 
+# PIN hashing, the first scheme hashes new PINs and the others are only verified.
+# Hashes with another scheme or round count are upgraded on the next login.
+# Run calibrate_pin_hash.py on the deployment machine to choose the rounds.
+PIN_HASH_SCHEMES = config("PIN_HASH_SCHEMES", cast=CommaSeparatedStrings, default="sha256_crypt")
+PIN_HASH_ROUNDS = config("PIN_HASH_ROUNDS", cast=int, default=535000)
+
+# Admission control
+ADMISSION_ENABLED = config("ADMISSION_ENABLED", cast=bool, default=True)
+ADMISSION_QUEUE_TIMEOUT = config("ADMISSION_QUEUE_TIMEOUT", cast=float, default=2.0)
+ADMISSION_HASH_BOUND_LIMIT = config("ADMISSION_HASH_BOUND_LIMIT", cast=int, default=os.cpu_count() or 1)
+ADMISSION_HASH_BOUND_MAX_LIMIT = config("ADMISSION_HASH_BOUND_MAX_LIMIT", cast=int, default=2 * (os.cpu_count() or 1))
+ADMISSION_HASH_BOUND_QUEUE = config("ADMISSION_HASH_BOUND_QUEUE", cast=int, default=4 * (os.cpu_count() or 1))
+ADMISSION_HASH_BOUND_TARGET_MS = config("ADMISSION_HASH_BOUND_TARGET_MS", cast=float, default=750)
+ADMISSION_DB_WRITE_LIMIT = config("ADMISSION_DB_WRITE_LIMIT", cast=int, default=16)
+ADMISSION_DB_WRITE_MAX_LIMIT = config("ADMISSION_DB_WRITE_MAX_LIMIT", cast=int, default=64)
+ADMISSION_DB_WRITE_QUEUE = config("ADMISSION_DB_WRITE_QUEUE", cast=int, default=128)
+ADMISSION_DB_WRITE_TARGET_MS = config("ADMISSION_DB_WRITE_TARGET_MS", cast=float, default=100)
+
+# Rate limiting, limits are "<hits>/<seconds>" and an empty value disables one
+RATE_LIMIT_ENABLED = config("RATE_LIMIT_ENABLED", cast=bool, default=True)
+# The sqlite backend shares the windows between gunicorn workers; memory keeps
+# them per process, so each limit is multiplied by GUNICORN_WORKERS.
+RATE_LIMIT_BACKEND = config("RATE_LIMIT_BACKEND", cast=str, default="sqlite")  # sqlite | memory
+RATE_LIMIT_DB_PATH = config("RATE_LIMIT_DB_PATH", cast=str, default="rate_limits.db")
+RATE_LIMIT_MAX_KEYS = config("RATE_LIMIT_MAX_KEYS", cast=int, default=100_000)
+RATE_LIMIT_LOGIN_IP = config("RATE_LIMIT_LOGIN_IP", cast=str, default="30/60")
+RATE_LIMIT_LOGIN_USER = config("RATE_LIMIT_LOGIN_USER", cast=str, default="5/60")
+RATE_LIMIT_CREATE_USER_IP = config("RATE_LIMIT_CREATE_USER_IP", cast=str, default="60/60")
+
+# Single-writer queue, writes arriving within the window share one commit
+WRITE_COORDINATOR_ENABLED = config("WRITE_COORDINATOR_ENABLED", cast=bool, default=True)
+WRITE_COORDINATOR_WINDOW_MS = config("WRITE_COORDINATOR_WINDOW_MS", cast=float, default=2)
+WRITE_COORDINATOR_MAX_BATCH = config("WRITE_COORDINATOR_MAX_BATCH", cast=int, default=64)
+
+# Profile photos, stored by content hash with JPEG thumbnails per bounding box size.
+# Set PHOTO_SENDFILE_HEADER (e.g. X-Accel-Redirect) to let a fronting proxy serve
+# files with sendfile from PHOTO_SENDFILE_PREFIX mapped to PHOTO_STORAGE_DIR.
+PHOTO_STORAGE_DIR = config("PHOTO_STORAGE_DIR", cast=str, default="media/photos")
+PHOTO_THUMBNAIL_SIZES = config("PHOTO_THUMBNAIL_SIZES", cast=CommaSeparatedStrings, default="64,256,512")
+PHOTO_MAX_BYTES = config("PHOTO_MAX_BYTES", cast=int, default=5 * 1024 * 1024)
+PHOTO_WORKERS = config("PHOTO_WORKERS", cast=int, default=2)
+PHOTO_SENDFILE_HEADER = config("PHOTO_SENDFILE_HEADER", cast=str, default="")
+PHOTO_SENDFILE_PREFIX = config("PHOTO_SENDFILE_PREFIX", cast=str, default="/_photos")
+
+# Cache for roster and profile list reads, entries are tagged with the
+# generation of the tables they were read from so writes invalidate them
+RESULT_CACHE_ENABLED = config("RESULT_CACHE_ENABLED", cast=bool, default=True)
+RESULT_CACHE_MAX_ENTRIES = config("RESULT_CACHE_MAX_ENTRIES", cast=int, default=256)
+ROSTER_PAGE_SIZE = config("ROSTER_PAGE_SIZE", cast=int, default=50)
+
+# Share one database round trip between identical concurrent point reads
+SINGLE_FLIGHT_ENABLED = config("SINGLE_FLIGHT_ENABLED", cast=bool, default=True)
+
+# Most ids accepted by the profile multi-get endpoint
+PROFILE_BATCH_MAX_IDS = config("PROFILE_BATCH_MAX_IDS", cast=int, default=200)
+
+# Roster delta sync, changes returned per page
+SYNC_PAGE_SIZE = config("SYNC_PAGE_SIZE", cast=int, default=500)
+SYNC_MAX_PAGE_SIZE = config("SYNC_MAX_PAGE_SIZE", cast=int, default=5000)
+# Changes older than CHANGE_LOG_RETENTION_DAYS are pruned by the maintenance
+# scheduler, CHANGE_LOG_PRUNE_BATCH_SIZE rows per write (at most 999). Sync
+# cursors behind the pruned changes answer 410 and must resync from 0.
+CHANGE_LOG_RETENTION_DAYS = config("CHANGE_LOG_RETENTION_DAYS", cast=float, default=30)
+CHANGE_LOG_PRUNE_BATCH_SIZE = config("CHANGE_LOG_PRUNE_BATCH_SIZE", cast=int, default=500)
+
+# Server-Sent Events of roster changes. Subscribers more than SSE_QUEUE_SIZE
+# events behind are disconnected and resume with Last-Event-ID.
+SSE_POLL_INTERVAL_MS = config("SSE_POLL_INTERVAL_MS", cast=float, default=500)
+SSE_QUEUE_SIZE = config("SSE_QUEUE_SIZE", cast=int, default=256)
+SSE_KEEPALIVE_SECONDS = config("SSE_KEEPALIVE_SECONDS", cast=float, default=15)
+
+# Webhooks for roster changes, delivered from an outbox written with each change.
+# WEBHOOK_CONCURRENCY is the number of batches in flight per endpoint.
+WEBHOOK_URLS = config("WEBHOOK_URLS", cast=CommaSeparatedStrings, default="")
+WEBHOOK_BATCH_SIZE = config("WEBHOOK_BATCH_SIZE", cast=int, default=100)
+WEBHOOK_CONCURRENCY = config("WEBHOOK_CONCURRENCY", cast=int, default=2)
+WEBHOOK_TIMEOUT_SECONDS = config("WEBHOOK_TIMEOUT_SECONDS", cast=float, default=10)
+WEBHOOK_MAX_ATTEMPTS = config("WEBHOOK_MAX_ATTEMPTS", cast=int, default=12)
+WEBHOOK_BACKOFF_SECONDS = config("WEBHOOK_BACKOFF_SECONDS", cast=float, default=1)
+WEBHOOK_MAX_BACKOFF_SECONDS = config("WEBHOOK_MAX_BACKOFF_SECONDS", cast=float, default=600)
+WEBHOOK_POLL_INTERVAL_MS = config("WEBHOOK_POLL_INTERVAL_MS", cast=float, default=1000)
+
+# Per-worker in-memory roster snapshot for filtering. Changes made by other
+# workers show up after at most ROSTER_SNAPSHOT_MAX_AGE_MS; more than
+# ROSTER_SNAPSHOT_MAX_DELTA pending changes reload it instead of patching.
+ROSTER_SNAPSHOT_ENABLED = config("ROSTER_SNAPSHOT_ENABLED", cast=bool, default=True)
+ROSTER_SNAPSHOT_MAX_AGE_MS = config("ROSTER_SNAPSHOT_MAX_AGE_MS", cast=float, default=500)
+ROSTER_SNAPSHOT_MAX_DELTA = config("ROSTER_SNAPSHOT_MAX_DELTA", cast=int, default=10000)
+
+# Demographic reports, computed in REPORT_WORKERS processes reading
+# REPORT_CHUNK_SIZE rows at a time. REPORT_AGE_BANDS are the lower bounds of
+# the age bands after the first.
+REPORT_AGE_BANDS = config("REPORT_AGE_BANDS", cast=CommaSeparatedStrings, default="18,25,35,45,55,65")
+REPORT_CHUNK_SIZE = config("REPORT_CHUNK_SIZE", cast=int, default=20000)
+REPORT_WORKERS = config("REPORT_WORKERS", cast=int, default=1)
+
+# Archival of users and profiles soft-deleted more than ARCHIVE_RETENTION_DAYS
+# ago, ARCHIVE_BATCH_SIZE users and profiles per transaction (at most 999,
+# SQLite's limit on bound variables).
+ARCHIVE_ENABLED = config("ARCHIVE_ENABLED", cast=bool, default=True)
+ARCHIVE_RETENTION_DAYS = config("ARCHIVE_RETENTION_DAYS", cast=float, default=365)
+ARCHIVE_INTERVAL_SECONDS = config("ARCHIVE_INTERVAL_SECONDS", cast=float, default=3600)
+ARCHIVE_BATCH_SIZE = config("ARCHIVE_BATCH_SIZE", cast=int, default=200)
+ARCHIVE_BATCH_PAUSE_MS = config("ARCHIVE_BATCH_PAUSE_MS", cast=float, default=50)
+
+# SQLite maintenance: planner statistics, incremental vacuum, WAL
+# checkpoints and change log pruning. Tasks run while the worker is quiet, with fewer than
+# MAINTENANCE_QUIET_REQUESTS requests started in the last
+# MAINTENANCE_QUIET_SECONDS; a task overdue by a whole interval runs anyway.
+# Each run stops after MAINTENANCE_BUDGET_MS of work, pausing
+# MAINTENANCE_STEP_PAUSE_MS between steps, and resumes on a later check.
+# Incremental vacuum needs auto_vacuum=INCREMENTAL, see README.
+MAINTENANCE_ENABLED = config("MAINTENANCE_ENABLED", cast=bool, default=True)
+MAINTENANCE_CHECK_SECONDS = config("MAINTENANCE_CHECK_SECONDS", cast=float, default=30)
+MAINTENANCE_QUIET_REQUESTS = config("MAINTENANCE_QUIET_REQUESTS", cast=int, default=5)
+MAINTENANCE_QUIET_SECONDS = config("MAINTENANCE_QUIET_SECONDS", cast=float, default=10)
+MAINTENANCE_BUDGET_MS = config("MAINTENANCE_BUDGET_MS", cast=float, default=200)
+MAINTENANCE_STEP_PAUSE_MS = config("MAINTENANCE_STEP_PAUSE_MS", cast=float, default=50)
+MAINTENANCE_ANALYZE_INTERVAL_SECONDS = config("MAINTENANCE_ANALYZE_INTERVAL_SECONDS", cast=float, default=6 * 3600)
+MAINTENANCE_ANALYZE_LIMIT = config("MAINTENANCE_ANALYZE_LIMIT", cast=int, default=1000)
+MAINTENANCE_VACUUM_INTERVAL_SECONDS = config("MAINTENANCE_VACUUM_INTERVAL_SECONDS", cast=float, default=3600)
+MAINTENANCE_VACUUM_PAGES = config("MAINTENANCE_VACUUM_PAGES", cast=int, default=64)
+MAINTENANCE_CHECKPOINT_INTERVAL_SECONDS = config("MAINTENANCE_CHECKPOINT_INTERVAL_SECONDS", cast=float, default=300)
+MAINTENANCE_PRUNE_INTERVAL_SECONDS = config("MAINTENANCE_PRUNE_INTERVAL_SECONDS", cast=float, default=3600)
+MAINTENANCE_HISTORY = config("MAINTENANCE_HISTORY", cast=int, default=50)
+
+# Gunicorn, read by gunicorn.conf.py. With GUNICORN_PRELOAD the master
+# imports and warms the app before forking so workers share its memory.
+GUNICORN_BIND = config("GUNICORN_BIND", cast=str, default="0.0.0.0:8080")
+GUNICORN_WORKERS = config("GUNICORN_WORKERS", cast=int, default=1)
+GUNICORN_PRELOAD = config("GUNICORN_PRELOAD", cast=bool, default=False)
+
+# Archival, SQLite maintenance and webhook delivery run in the one worker
+# holding the background lease, a database row renewed every third of
+# WORKER_LEASE_SECONDS. Another worker takes over within that time after the
+# holder dies. Disabled, every worker runs them.
+WORKER_LEASE_ENABLED = config("WORKER_LEASE_ENABLED", cast=bool, default=True)
+WORKER_LEASE_SECONDS = config("WORKER_LEASE_SECONDS", cast=float, default=30)
+
+# Warm-up in the startup handler; a worker reports ready on /health/ready once
+# it succeeded. OPENAPI_SCHEMA_PATH is the document build_openapi.py writes at
+# build time, used when it matches the routes instead of building the schema.
+WARMUP_ENABLED = config("WARMUP_ENABLED", cast=bool, default=True)
+OPENAPI_SCHEMA_PATH = config("OPENAPI_SCHEMA_PATH", cast=str, default="")
+
+# Response negotiation, see src/api/negotiation.py. zstd needs the optional
+# zstandard package; bodies under RESPONSE_COMPRESS_MIN_BYTES go uncompressed.
+RESPONSE_ZSTD_ENABLED = config("RESPONSE_ZSTD_ENABLED", cast=bool, default=True)
+RESPONSE_ZSTD_LEVEL = config("RESPONSE_ZSTD_LEVEL", cast=int, default=3)
+RESPONSE_COMPRESS_MIN_BYTES = config("RESPONSE_COMPRESS_MIN_BYTES", cast=int, default=512)
+REQUEST_MAX_DECOMPRESSED_BYTES = config("REQUEST_MAX_DECOMPRESSED_BYTES", cast=int, default=10 * 1024 * 1024)
+
+# Batch endpoint, see src/api/batch.py. A call still running after
+# BATCH_TIMEOUT_SECONDS answers 504.
+BATCH_MAX_REQUESTS = config("BATCH_MAX_REQUESTS", cast=int, default=20)
+BATCH_TIMEOUT_SECONDS = config("BATCH_TIMEOUT_SECONDS", cast=float, default=30)
+
+# Event loop lag, sampled every LOOP_MONITOR_INTERVAL_MS; a wake-up later than
+# LOOP_MONITOR_STALL_MS is a stall. Percentiles cover the last
+# LOOP_MONITOR_WINDOW samples. LOOP_MONITOR_DEBUG captures the stack of the
+# last LOOP_MONITOR_HISTORY stalls, see src/services/loop_monitor.py.
+LOOP_MONITOR_ENABLED = config("LOOP_MONITOR_ENABLED", cast=bool, default=True)
+LOOP_MONITOR_INTERVAL_MS = config("LOOP_MONITOR_INTERVAL_MS", cast=float, default=100)
+LOOP_MONITOR_STALL_MS = config("LOOP_MONITOR_STALL_MS", cast=float, default=100)
+LOOP_MONITOR_WINDOW = config("LOOP_MONITOR_WINDOW", cast=int, default=600)
+LOOP_MONITOR_DEBUG = config("LOOP_MONITOR_DEBUG", cast=bool, default=False)
+LOOP_MONITOR_HISTORY = config("LOOP_MONITOR_HISTORY", cast=int, default=20)
@@ -0,0 +1,31 @@
+"""Runtime metrics gathered from the components held on app.state."""
+
+from fastapi import FastAPI
+
+# Metric section name -> app.state attribute of a component with snapshot()
+METRIC_SOURCES = {
+    "startup": "startup",
+    "admission": "admission",
+    "writer": "writer",
+    "result_cache": "result_cache",
+    "single_flight": "single_flight",
+    "roster_snapshot": "roster_snapshot",
+    "events": "event_hub",
+    "webhooks": "webhooks",
+    "reports": "reports",
+    "archive": "archive",
+    "activity": "activity",
+    "maintenance": "maintenance",
+    "background_lease": "background_lease",
+    "event_loop": "loop_monitor",
+}
+
+
+def collect_metrics(app: FastAPI) -> dict:
+    """Return a snapshot of every running component that reports metrics."""
+    metrics = {}
+    for name, attribute in METRIC_SOURCES.items():
+        component = getattr(app.state, attribute, None)
+        if component is not None:
+            metrics[name] = component.snapshot()
+    return metrics
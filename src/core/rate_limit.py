@@ -0,0 +1,215 @@
+"""Sliding-window rate limiting.
+
+Each key keeps three integers: the index of the current fixed window, the hit
+count of the previous window and the hit count of the current one. The
+sliding estimate weights the previous window by how much of it still overlaps
+the sliding window, which is accurate enough for abuse protection and needs no
+per-hit timestamps.
+"""
+
+import asyncio
+import logging
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from src.core import config
+
+app_logger = logging.getLogger("app")
+
+
+class RateLimit:
+    """A limit of `hits` per `window` seconds."""
+
+    __slots__ = ("hits", "window")
+
+    def __init__(self, hits: int, window: int) -> None:
+        self.hits = hits
+        self.window = window
+
+    @classmethod
+    def parse(cls, value: str) -> Optional["RateLimit"]:
+        """Parse "<hits>/<seconds>", an empty value disables the limit."""
+        if not value:
+            return None
+        hits, window = value.split("/", 1)
+        return cls(int(hits), int(window))
+
+    def __repr__(self) -> str:
+        return f"RateLimit({self.hits}/{self.window}s)"
+
+
+class RoutePolicy:
+    """Per-IP and per-user limits for one route."""
+
+    __slots__ = ("per_ip", "per_user")
+
+    def __init__(self, per_ip: Optional[RateLimit] = None, per_user: Optional[RateLimit] = None) -> None:
+        self.per_ip = per_ip
+        self.per_user = per_user
+
+
+POLICIES = {
+    "login": RoutePolicy(
+        per_ip=RateLimit.parse(config.RATE_LIMIT_LOGIN_IP),
+        per_user=RateLimit.parse(config.RATE_LIMIT_LOGIN_USER),
+    ),
+    "create-user": RoutePolicy(
+        per_ip=RateLimit.parse(config.RATE_LIMIT_CREATE_USER_IP),
+    ),
+}
+
+
+def _evaluate(
+    state: Optional[tuple[int, int, int]], limit: RateLimit, now: float
+) -> tuple[Optional[tuple[int, int, int]], Optional[float]]:
+    """Apply one hit to a window state.
+
+    Returns the new state and None when the hit is allowed, or None and the
+    number of seconds until the estimate drops below the limit when rejected.
+    """
+    window = int(now // limit.window)
+    elapsed = (now % limit.window) / limit.window
+
+    if state is None or state[0] < window - 1:
+        previous, current = 0, 0
+    elif state[0] == window - 1:
+        previous, current = state[2], 0
+    else:
+        previous, current = state[1], state[2]
+
+    estimate = previous * (1 - elapsed) + current
+    if estimate + 1 > limit.hits:
+        if previous and current < limit.hits:
+            # Wait for enough of the previous window to slide out
+            overlap_needed = (limit.hits - 1 - current) / previous
+            retry = (1 - overlap_needed - elapsed) * limit.window
+        else:
+            retry = (1 - elapsed) * limit.window
+        return None, max(retry, 0.0)
+
+    return (window, previous, current + 1), None
+
+
+class MemoryBackend:
+    """Per-process window store, evicting least recently used keys."""
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._windows: OrderedDict[str, tuple[int, int, int]] = OrderedDict()
+
+    async def hit(self, key: str, limit: RateLimit, now: float) -> Optional[float]:
+        state, retry = _evaluate(self._windows.get(key), limit, now)
+        if state is not None:
+            self._windows[key] = state
+            self._windows.move_to_end(key)
+        while len(self._windows) > self.max_keys:
+            self._windows.popitem(last=False)
+        return retry
+
+    async def close(self) -> None:
+        self._windows.clear()
+
+
+class SQLiteBackend:
+    """Window store shared by all workers on the host through a small SQLite file."""
+
+    CREATE_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS rate_limit_windows (
+        key TEXT PRIMARY KEY,
+        window INTEGER NOT NULL,
+        previous INTEGER NOT NULL,
+        current INTEGER NOT NULL,
+        expires_at REAL NOT NULL
+    ) WITHOUT ROWID
+    """
+    GET_WINDOW_QUERY = "SELECT window, previous, current FROM rate_limit_windows WHERE key = ?"
+    UPSERT_WINDOW_QUERY = """
+    INSERT INTO rate_limit_windows (key, window, previous, current, expires_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (key) DO UPDATE SET
+        window = excluded.window,
+        previous = excluded.previous,
+        current = excluded.current,
+        expires_at = excluded.expires_at
+    """
+    EVICT_QUERY = "DELETE FROM rate_limit_windows WHERE expires_at < ?"
+
+    def __init__(self, path: str, evict_every: int = 1000) -> None:
+        self.path = path
+        self.evict_every = evict_every
+        self._hits = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(self.CREATE_TABLE_QUERY)
+
+    def _hit(self, key: str, limit: RateLimit, now: float) -> Optional[float]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(self.GET_WINDOW_QUERY, (key,)).fetchone()
+                state, retry = _evaluate(row, limit, now)
+                if state is not None:
+                    expires_at = (state[0] + 2) * limit.window
+                    self._conn.execute(self.UPSERT_WINDOW_QUERY, (key, *state, expires_at))
+                self._hits += 1
+                if self._hits % self.evict_every == 0:
+                    self._conn.execute(self.EVICT_QUERY, (now,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return retry
+
+    async def hit(self, key: str, limit: RateLimit, now: float) -> Optional[float]:
+        return await asyncio.to_thread(self._hit, key, limit, now)
+
+    async def close(self) -> None:
+        self._conn.close()
+
+
+class RateLimiter:
+    """Checks requests against the route policies."""
+
+    def __init__(self, backend, policies: dict[str, RoutePolicy] = POLICIES) -> None:
+        self.backend = backend
+        self.policies = policies
+
+    async def check(self, route: str, *, ip: Optional[str] = None, user_id: Optional[str] = None) -> Optional[int]:
+        """Record a hit for the route, returning a Retry-After in seconds if it is over a limit."""
+        policy = self.policies.get(route)
+        if policy is None:
+            return None
+
+        now = time.time()
+        checks = []
+        if policy.per_ip and ip:
+            checks.append((f"{route}:ip:{ip}", policy.per_ip))
+        if policy.per_user and user_id:
+            checks.append((f"{route}:user:{user_id}", policy.per_user))
+
+        for key, limit in checks:
+            retry = await self.backend.hit(key, limit, now)
+            if retry is not None:
+                app_logger.warning(f"Rate limit exceeded for {key} ({limit})")
+                return max(1, math.ceil(retry))
+        return None
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def create_rate_limiter() -> Optional[RateLimiter]:
+    """Build the rate limiter from config, or None when disabled."""
+    if not config.RATE_LIMIT_ENABLED:
+        return None
+    if config.RATE_LIMIT_BACKEND == "sqlite":
+        backend = SQLiteBackend(config.RATE_LIMIT_DB_PATH)
+    else:
+        backend = MemoryBackend(max_keys=config.RATE_LIMIT_MAX_KEYS)
+    return RateLimiter(backend)
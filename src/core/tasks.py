@@ -3,14 +3,58 @@
 from fastapi import FastAPI
 from typing import Callable
 
+from src.core.rate_limit import create_rate_limiter
+from src.core.warmup import warm_up
 from src.db.repos.tasks import connect_database, disconnect_database
+from src.services.archive import create_archive_job
+from src.services.events import attach_event_hub, create_event_hub, detach_event_hub
+from src.services.leases import create_background_lease
+from src.services.loop_monitor import create_loop_monitor
+from src.services.maintenance import create_maintenance_scheduler
+from src.services.photos import create_photo_storage
+from src.services.reports import create_report_engine
+from src.services.webhooks import create_webhook_dispatcher
 
 
 def create_start_app_handler(app: FastAPI) -> Callable:
     """Connect to db."""
 
     async def start_app() -> None:
+        # First, so stalls during the rest of startup are seen too
+        app.state.loop_monitor = create_loop_monitor()
+        if app.state.loop_monitor is not None:
+            await app.state.loop_monitor.start()
         await connect_database(app)
+        app.state.rate_limiter = create_rate_limiter()
+        app.state.photo_storage = create_photo_storage()
+        app.state.reports = create_report_engine()
+        if getattr(app.state, "_db", None) is not None:
+            event_hub = create_event_hub(app.state._db)
+            await event_hub.start()
+            attach_event_hub(app.state._db, event_hub)
+            app.state.event_hub = event_hub
+
+            # Taken before the jobs start, they only run in the worker holding it
+            app.state.background_lease = create_background_lease(app.state._db)
+            if app.state.background_lease is not None:
+                await app.state.background_lease.start()
+
+            app.state.webhooks = create_webhook_dispatcher(app.state._db, app.state.background_lease)
+            if app.state.webhooks is not None:
+                await app.state.webhooks.start()
+
+            app.state.archive = create_archive_job(app.state._db, app.state.background_lease)
+            if app.state.archive is not None:
+                await app.state.archive.start()
+
+            app.state.maintenance = create_maintenance_scheduler(
+                app.state._db, getattr(app.state, "activity", None), app.state.background_lease
+            )
+            if app.state.maintenance is not None:
+                await app.state.maintenance.start()
+
+        if getattr(app.state, "startup", None) is not None:
+            await warm_up(app, app.state.startup)
         print("Application started")
         print("Application started")
 
@@ -21,7 +65,26 @@ def create_stop_app_handler(app: FastAPI) -> Callable:
     """Disconnect db."""
 
     async def stop_app() -> None:
+        if getattr(app.state, "maintenance", None) is not None:
+            await app.state.maintenance.stop()
+        if getattr(app.state, "archive", None) is not None:
+            await app.state.archive.stop()
+        if getattr(app.state, "webhooks", None) is not None:
+            await app.state.webhooks.stop()
+        if getattr(app.state, "background_lease", None) is not None:
+            await app.state.background_lease.stop()
+        if getattr(app.state, "event_hub", None) is not None:
+            await app.state.event_hub.stop()
+            detach_event_hub(app.state._db)
+        if getattr(app.state, "rate_limiter", None) is not None:
+            await app.state.rate_limiter.close()
+        if getattr(app.state, "photo_storage", None) is not None:
+            await app.state.photo_storage.close()
+        if getattr(app.state, "reports", None) is not None:
+            await app.state.reports.close()
         await disconnect_database(app)
+        if getattr(app.state, "loop_monitor", None) is not None:
+            await app.state.loop_monitor.stop()
         print("Application stopped")
         print("Application stopped")
 
@@ -0,0 +1,265 @@
+"""Warm-up run by the startup handler before a worker reports ready.
+
+Each step primes something the first requests would otherwise pay for: the
+OpenAPI document (built, or loaded from the artifact build_openapi.py writes),
+the passlib backends and jose, the request and response validators of every
+route, and the database connection with the roster snapshot. The readiness
+endpoint reports ready once every step has succeeded, and the time each
+took is kept for the startup metrics. With WARMUP_ENABLED off only the
+database step runs.
+"""
+
+import enum
+import hashlib
+import json
+import logging
+import time
+import typing
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+import fastapi
+import pydantic
+from fastapi import FastAPI
+from fastapi.dependencies.utils import get_flat_dependant
+from fastapi.routing import APIRoute
+from jose import jwt
+from pydantic import BaseModel
+
+from src.core import config
+from src.db.snapshot import get_roster_snapshot
+from src.models.roster import RosterFilter
+from src.services.auth import AuthService
+
+app_logger = logging.getLogger("app")
+
+# Key in the document's info object holding openapi_fingerprint of the app it was built from
+FINGERPRINT_KEY = "x-fingerprint"
+
+
+class Startup:
+    """Startup progress of this worker, from the app import, or its fork under preload, to ready."""
+
+    def __init__(self, imported_at: float, import_ms: float) -> None:
+        self.imported_at = imported_at
+        self.import_ms = import_ms
+        # Whether the app was imported in the gunicorn master before the fork
+        self.preloaded = False
+        self.ready = False
+        self.error: Optional[str] = None
+        self.steps: dict[str, float] = {}
+        self.openapi_source: Optional[str] = None
+        self.ready_ms: Optional[float] = None
+
+    def forked(self) -> None:
+        """Count the time to ready from this worker's fork instead of the master's import."""
+        self.imported_at = time.perf_counter()
+        self.preloaded = True
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "preloaded": self.preloaded,
+            "import_ms": self.import_ms,
+            "steps_ms": dict(self.steps),
+            "openapi_source": self.openapi_source,
+            "ready_ms": self.ready_ms,
+        }
+
+
+def _routes(app: FastAPI) -> list[APIRoute]:
+    return [route for route in app.routes if isinstance(route, APIRoute)]
+
+
+def _describe_type(annotation: Any, models: dict[str, Any]) -> str:
+    """repr of a type, collecting the models and enums it refers to into models."""
+    if isinstance(annotation, type) and issubclass(annotation, (BaseModel, enum.Enum)):
+        name = f"{annotation.__module__}.{annotation.__qualname__}"
+        if name not in models:
+            models[name] = None
+            models[name] = _describe_model(annotation, models)
+    for argument in typing.get_args(annotation):
+        _describe_type(argument, models)
+    return repr(annotation)
+
+
+def _describe_default(field: Any) -> str:
+    if field.default_factory is not None:
+        return f"factory {getattr(field.default_factory, '__qualname__', type(field.default_factory).__name__)}"
+    return repr(field.default)
+
+
+def _describe_model(model: type, models: dict[str, Any]) -> Any:
+    if issubclass(model, enum.Enum):
+        return [[member.name, repr(member.value)] for member in model]
+    return {
+        "doc": model.__doc__,
+        "fields": [
+            [
+                name,
+                _describe_type(field.annotation, models),
+                field.is_required(),
+                _describe_default(field),
+                field.alias,
+                field.title,
+                field.description,
+                repr(field.examples),
+                repr(field.metadata),
+                repr(field.json_schema_extra),
+            ]
+            for name, field in model.model_fields.items()
+        ],
+    }
+
+
+def _describe_field(field: Any, models: dict[str, Any]) -> Any:
+    if field is None:
+        return None
+    info = field.field_info
+    return [
+        field.name,
+        field.alias,
+        type(info).__name__,
+        _describe_type(info.annotation, models),
+        field.required,
+        _describe_default(info),
+        info.description,
+        repr(info.metadata),
+    ]
+
+
+def openapi_fingerprint(app: FastAPI) -> str:
+    """Hash of everything the OpenAPI document is generated from: the routes, their
+    parameters, the models and enums they use, and the generator versions.
+
+    Much cheaper than building the document, so a prebuilt one can be checked
+    against the app before it is used.
+    """
+    models: dict[str, Any] = {}
+    routes = []
+    for route in _routes(app):
+        dependant = get_flat_dependant(route.dependant)
+        params = dependant.path_params + dependant.query_params + dependant.header_params + dependant.cookie_params
+        routes.append([
+            route.path_format,
+            sorted(route.methods),
+            route.name,
+            route.operation_id,
+            route.summary,
+            route.description,
+            route.response_description,
+            [str(tag) for tag in route.tags],
+            route.deprecated,
+            route.include_in_schema,
+            route.status_code,
+            getattr(route.response_class, "__qualname__", repr(route.response_class)),
+            repr(route.responses),
+            [_describe_field(param, models) for param in params],
+            _describe_field(route.body_field, models),
+            _describe_field(route.response_field, models),
+            sorted(requirement.security_scheme.scheme_name for requirement in dependant.security_requirements),
+        ])
+    definition = {
+        "generator": [fastapi.__version__, pydantic.VERSION, app.openapi_version],
+        "info": [app.title, app.version, app.summary, app.description, app.servers, app.openapi_tags],
+        "routes": sorted(routes, key=lambda route: (route[0], route[1])),
+        "models": models,
+    }
+    return hashlib.sha256(json.dumps(definition, sort_keys=True, default=repr).encode("utf-8")).hexdigest()
+
+
+def build_openapi(app: FastAPI) -> dict:
+    """The OpenAPI document with the fingerprint of the app embedded, for writing at build time."""
+    schema = app.openapi()
+    return {**schema, "info": {**schema["info"], FINGERPRINT_KEY: openapi_fingerprint(app)}}
+
+
+def load_openapi(app: FastAPI, path: str) -> bool:
+    """Use a prebuilt OpenAPI document if it was built from this app, returns whether it was used."""
+    try:
+        schema = json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        app_logger.warning(f"Could not read the OpenAPI document at {path}, building it instead")
+        return False
+    if schema.get("info", {}).get(FINGERPRINT_KEY) != openapi_fingerprint(app):
+        app_logger.warning(f"The OpenAPI document at {path} does not match the routes and models, building it instead")
+        return False
+    app.openapi_schema = schema
+    return True
+
+
+def prime_openapi(app: FastAPI) -> str:
+    """Make /openapi.json free on first use. Returns where the document came from."""
+    if app.openapi_schema is not None:
+        return "memory"
+    if config.OPENAPI_SCHEMA_PATH and load_openapi(app, config.OPENAPI_SCHEMA_PATH):
+        return "file"
+    app.openapi()
+    return "built"
+
+
+def prime_auth() -> None:
+    # passlib picks each scheme's backend on first use
+    for scheme in AuthService.pwd_context.schemes():
+        handler = AuthService.pwd_context.handler(scheme)
+        if hasattr(handler, "get_backend"):
+            handler.get_backend()
+    jwt.decode(jwt.encode({"sub": "warm-up"}, key="warm-up", algorithm=config.ALGORITHM), key="warm-up", algorithms=[config.ALGORITHM])
+
+
+def prime_validation(app: FastAPI) -> None:
+    """Run every route's body and response validators once, on empty input."""
+    for route in _routes(app):
+        for field in (route.body_field, route.response_field):
+            if field is not None:
+                # Validation errors are returned, not raised
+                field.validate({}, {}, loc=("warm-up",))
+
+
+async def prime_database(app: FastAPI) -> None:
+    db = getattr(app.state, "_db", None)
+    if db is None or not db.is_connected:
+        raise RuntimeError("Database is not connected")
+    await db.fetch_one(query="SELECT 1")
+    snapshot = get_roster_snapshot(db)
+    if snapshot is not None and await snapshot.query(RosterFilter(limit=0)) is None:
+        raise RuntimeError("Roster snapshot could not be loaded")
+
+
+@contextmanager
+def _step(startup: Startup, name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        startup.error = f"{name}: {e}"
+        raise
+    startup.steps[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+async def warm_up(app: FastAPI, startup: Startup) -> None:
+    """Run every warm-up step and mark the worker ready if they all succeed."""
+    started = time.perf_counter()
+    try:
+        if config.WARMUP_ENABLED:
+            with _step(startup, "openapi"):
+                startup.openapi_source = prime_openapi(app)
+            with _step(startup, "auth"):
+                prime_auth()
+            with _step(startup, "validation"):
+                prime_validation(app)
+        with _step(startup, "database"):
+            await prime_database(app)
+    except Exception:
+        app_logger.exception(f"Warm-up failed at {startup.error}")
+        return
+
+    startup.ready = True
+    finished = time.perf_counter()
+    startup.ready_ms = round((finished - startup.imported_at) * 1000, 1)
+    since = "fork" if startup.preloaded else "import"
+    app_logger.info(
+        f"Ready {startup.ready_ms} ms after {since}, warm-up took {round((finished - started) * 1000, 1)} ms"
+    )
@@ -0,0 +1,62 @@
+"""Bounded cache for list query results.
+
+Entries are stored with the generations of the tables they were read from.
+Every write bumps its table's generation in the same transaction, so an entry
+whose generations no longer match is stale and is dropped on read.
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from weakref import WeakKeyDictionary
+
+from databases import Database
+
+_caches: "WeakKeyDictionary[Database, ResultCache]" = WeakKeyDictionary()
+
+MISS = object()
+
+
+class ResultCache:
+    """Least recently used cache keyed by query parameters."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[tuple, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, generations: tuple) -> Any:
+        """Return the cached value, or MISS if absent or read under other generations."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != generations:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return MISS
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, generations: tuple, value: Any) -> None:
+        self._entries[key] = (generations, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def snapshot(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def attach_result_cache(db: Database, cache: ResultCache) -> None:
+    _caches[db] = cache
+
+
+def detach_result_cache(db: Database) -> None:
+    _caches.pop(db, None)
+
+
+def get_result_cache(db: Database) -> Optional[ResultCache]:
+    return _caches.get(db)
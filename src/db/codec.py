@@ -0,0 +1,43 @@
+"""Storage encoding of the IDs the API exposes as strings.
+
+profile_id is stored as the 16 bytes of its UUID and user_id as an INTEGER.
+Repositories bind profile IDs through encode_profile_id and turn rows into
+API values with decode_row. User IDs bound as strings need no encoding: the
+INTEGER affinity of the user_id columns converts decimal strings on insert
+and comparison.
+"""
+
+import uuid
+from typing import Any, Mapping, Optional
+
+# Columns holding a user ID
+USER_ID_COLUMNS = ("user_id", "admin_id")
+
+
+def encode_profile_id(value: Any) -> Optional[bytes]:
+    """Stored form of a profile ID, or None if it is not a UUID and so matches nothing."""
+    if isinstance(value, uuid.UUID):
+        return value.bytes
+    try:
+        return uuid.UUID(str(value)).bytes
+    except ValueError:
+        return None
+
+
+def decode_profile_id(value: Optional[bytes]) -> Optional[str]:
+    return str(uuid.UUID(bytes=value)) if value is not None else None
+
+
+def decode_user_id(value: Optional[int]) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def decode_row(row: Mapping) -> dict:
+    """Copy a users or profiles row with its IDs in API form."""
+    values = dict(row)
+    for column in USER_ID_COLUMNS:
+        if column in values:
+            values[column] = decode_user_id(values[column])
+    if "profile_id" in values:
+        values["profile_id"] = decode_profile_id(values["profile_id"])
+    return values
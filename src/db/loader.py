@@ -0,0 +1,113 @@
+"""Per-request batching loaders.
+
+Lookups by id issued during the same event loop iteration are collected and
+fetched with one query, and results are remembered until the request ends or
+the request writes something.
+"""
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Hashable, Iterator, Optional
+
+BatchLoad = Callable[[list], Awaitable[dict]]
+
+_scope: ContextVar[Optional[dict[str, "DataLoader"]]] = ContextVar("loader_scope", default=None)
+
+
+def _consume(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+class DataLoader:
+    """Batches and memoizes lookups by key.
+
+    batch_load receives a list of keys and returns a dict of the ones it
+    found; keys it leaves out load as None.
+    """
+
+    def __init__(self, batch_load: BatchLoad) -> None:
+        self.batch_load = batch_load
+        self.batches = 0
+        self._memo: dict[Hashable, asyncio.Future] = {}
+        self._queued: list[tuple[Hashable, asyncio.Future]] = []
+
+    async def load(self, key: Hashable) -> Any:
+        future = self._memo.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            future.add_done_callback(_consume)
+            self._memo[key] = future
+            self._queued.append((key, future))
+            if len(self._queued) == 1:
+                # First key of this iteration, this caller runs the batch
+                await self._dispatch()
+                return future.result()
+
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            # The caller running the batch was cancelled, load it again
+            return await self.load(key)
+
+    async def _dispatch(self) -> None:
+        futures = self._queued
+        try:
+            # Let the other tasks that are ready this iteration queue their keys
+            await asyncio.sleep(0)
+            self._queued = []
+            self.batches += 1
+            found = await self.batch_load([key for key, _ in futures])
+        except asyncio.CancelledError:
+            if self._queued is futures:
+                self._queued = []
+            for key, future in futures:
+                self._forget(key, future)
+                future.cancel()
+            raise
+        except Exception as e:
+            for key, future in futures:
+                self._forget(key, future)
+                future.set_exception(e)
+            return
+        for key, future in futures:
+            if not future.done():
+                future.set_result(found.get(key))
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._memo.get(key) is future:
+            del self._memo[key]
+
+    def clear(self) -> None:
+        """Forget remembered results, lookups already in flight still complete."""
+        self._memo = {}
+
+
+@contextmanager
+def loader_scope() -> Iterator[None]:
+    """Give the code run inside it its own set of loaders."""
+    token = _scope.set({})
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def get_loader(name: str, batch_load: BatchLoad) -> Optional[DataLoader]:
+    """Return the named loader of the current scope, or None outside a scope."""
+    loaders = _scope.get()
+    if loaders is None:
+        return None
+    loader = loaders.get(name)
+    if loader is None:
+        loader = loaders[name] = DataLoader(batch_load)
+    return loader
+
+
+def clear_loaders() -> None:
+    """Drop remembered results in the current scope after a write."""
+    for loader in (_scope.get() or {}).values():
+        loader.clear()
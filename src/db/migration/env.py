@@ -64,6 +64,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # Only takes effect on a new database, before its first table;
+        # existing ones are converted with a VACUUM, see README
+        connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.commit()
+
         context.configure(
             connection=connection, target_metadata=target_metadata
         )
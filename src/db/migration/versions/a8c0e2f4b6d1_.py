@@ -0,0 +1,150 @@
+"""Compact Keys Migration
+
+Revision ID: a8c0e2f4b6d1
+Revises: f1a3c5e7b9d0
+Create Date: 2026-10-19 19:00:00.000000
+
+Stores user IDs as INTEGER and profile IDs as the 16 bytes of the UUID
+instead of text. users.user_id becomes an alias of the rowid, so the users
+table no longer needs a separate primary key index. SQLite cannot change a
+column's type, so each table is rebuilt and its rows copied over.
+"""
+
+import uuid
+from typing import Callable, Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c0e2f4b6d1'
+down_revision: Union[str, None] = 'f1a3c5e7b9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rebuilt in this order, referenced tables first
+TABLES = ("users", "profiles", "admins", "users_archive", "profiles_archive")
+
+
+def timestamps(indexed: bool = False) -> tuple[sa.Column, sa.Column, sa.Column]:
+    return (
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False, index=indexed),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False, index=indexed),
+        sa.Column("is_deleted", sa.Boolean, nullable=False, server_default=sa.false(), index=indexed),
+    )
+
+
+def archive_timestamps() -> tuple[sa.Column, ...]:
+    return (
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("is_deleted", sa.Boolean, nullable=False),
+        sa.Column("archived_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def profile_columns() -> tuple[sa.Column, ...]:
+    return (
+        sa.Column("email", sa.String(100), nullable=False),
+        sa.Column("first_name", sa.String(50), nullable=False),
+        sa.Column("last_name", sa.String(50), nullable=False),
+        sa.Column("phone", sa.String(20), nullable=False),
+        sa.Column("gender", sa.String(10), nullable=False),
+        sa.Column("date_of_birth", sa.Date(), nullable=True),
+        sa.Column("photo", sa.String(255), nullable=True),
+        sa.Column("marital_status", sa.String(20), nullable=True),
+        sa.Column("emergency_contact", sa.String(20), nullable=True),
+    )
+
+
+def create_tables(user_key: sa.types.TypeEngine, profile_key: sa.types.TypeEngine) -> dict[str, Callable[[], None]]:
+    """Table name -> function creating it with the given key types."""
+    return {
+        "users": lambda: op.create_table(
+            "users",
+            sa.Column("user_id", user_key, primary_key=True, autoincrement=False),
+            sa.Column("role", sa.String(255), nullable=False),
+            sa.Column("pin_hash", sa.String(255), nullable=False),
+            *timestamps(indexed=True),
+        ),
+        "profiles": lambda: op.create_table(
+            "profiles",
+            sa.Column("profile_id", profile_key, primary_key=True),
+            sa.Column("user_id", user_key, sa.ForeignKey("users.user_id"), nullable=False, unique=True),
+            *profile_columns(),
+            *timestamps(indexed=True),
+        ),
+        "admins": lambda: op.create_table(
+            "admins",
+            sa.Column("admin_id", user_key, sa.ForeignKey("users.user_id"), primary_key=True, autoincrement=False),
+            sa.Column("is_admin", sa.Boolean(), nullable=False, server_default=sa.text("0")),
+            sa.Column("permissions", sa.JSON(), nullable=False, server_default=sa.text("'{}'")),
+            *timestamps(indexed=True),
+        ),
+        "users_archive": lambda: op.create_table(
+            "users_archive",
+            sa.Column("user_id", user_key, primary_key=True, autoincrement=False),
+            sa.Column("role", sa.String(255), nullable=False),
+            sa.Column("pin_hash", sa.String(255), nullable=False),
+            *archive_timestamps(),
+        ),
+        "profiles_archive": lambda: op.create_table(
+            "profiles_archive",
+            sa.Column("profile_id", profile_key, primary_key=True),
+            sa.Column("user_id", user_key, nullable=False, index=True),
+            *profile_columns(),
+            *archive_timestamps(),
+        ),
+    }
+
+
+def uuid_to_blob(value):
+    return uuid.UUID(value).bytes if value is not None else None
+
+
+def blob_to_uuid(value):
+    return str(uuid.UUID(bytes=value)) if value is not None else None
+
+
+def rebuild_tables(creators: dict[str, Callable[[], None]], conversions: dict[str, str]) -> None:
+    """Recreate each table and copy its rows, converting the key columns."""
+    bind = op.get_bind()
+    bind.connection.driver_connection.create_function("uuid_to_blob", 1, uuid_to_blob, deterministic=True)
+    bind.connection.driver_connection.create_function("blob_to_uuid", 1, blob_to_uuid, deterministic=True)
+
+    for table in TABLES:
+        # Index names are global, drop them before the new table reuses them
+        indexes = bind.execute(
+            sa.text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"),
+            {"table": table},
+        ).scalars().all()
+        for index in indexes:
+            op.execute(f"DROP INDEX {index}")
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+
+        creators[table]()
+        columns = [row[1] for row in bind.execute(sa.text(f"PRAGMA table_info({table})"))]
+        select = ", ".join(conversions.get(column, column).format(column=column) for column in columns)
+        op.execute(f"INSERT INTO {table} ({', '.join(columns)}) SELECT {select} FROM {table}_old")
+        op.execute(f"DROP TABLE {table}_old")
+
+
+def upgrade() -> None:
+    rebuild_tables(
+        create_tables(sa.Integer(), sa.LargeBinary(16)),
+        {
+            "user_id": "CAST({column} AS INTEGER)",
+            "admin_id": "CAST({column} AS INTEGER)",
+            "profile_id": "uuid_to_blob({column})",
+        },
+    )
+
+
+def downgrade() -> None:
+    rebuild_tables(
+        create_tables(sa.String(7), sa.String(36)),
+        {
+            "user_id": "CAST({column} AS TEXT)",
+            "admin_id": "CAST({column} AS TEXT)",
+            "profile_id": "blob_to_uuid({column})",
+        },
+    )
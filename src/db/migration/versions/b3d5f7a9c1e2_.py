@@ -0,0 +1,40 @@
+"""Change Log Retention Migration
+
+Revision ID: b3d5f7a9c1e2
+Revises: a8c0e2f4b6d1
+Create Date: 2026-10-20 09:00:00.000000
+
+Pruning keeps one change_log row per user on the roster for changes older
+than the retention, so syncing from cursor 0 still yields the full roster.
+change_log_horizon holds the highest pruned cursor; older cursors must
+resync. The (user_id, seq) index finds a user's later changes.
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d5f7a9c1e2'
+down_revision: Union[str, None] = 'a8c0e2f4b6d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_change_log_horizon_table() -> None:
+    op.create_table(
+        "change_log_horizon",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("seq", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.execute("INSERT INTO change_log_horizon (id, seq) VALUES (1, 0)")
+
+
+def upgrade() -> None:
+    create_change_log_horizon_table()
+    op.create_index("ix_change_log_user_id_seq", "change_log", ["user_id", "seq"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_change_log_user_id_seq", table_name="change_log")
+    op.execute("DROP TABLE IF EXISTS change_log_horizon")
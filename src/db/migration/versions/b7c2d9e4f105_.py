@@ -0,0 +1,47 @@
+"""Roster Stats Table Migration
+
+Revision ID: b7c2d9e4f105
+Revises: a41f8611536a
+Create Date: 2026-10-19 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c2d9e4f105'
+down_revision: Union[str, None] = 'a41f8611536a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_roster_stats_table() -> None:
+    # One row per (role, gender, marital status) combination of active users
+    # with an active profile. Marital status is '' when not given.
+    op.create_table(
+        "roster_stats",
+        sa.Column("role", sa.String(255), primary_key=True),
+        sa.Column("gender", sa.String(10), primary_key=True),
+        sa.Column("marital_status", sa.String(20), primary_key=True),
+        sa.Column("count", sa.Integer, nullable=False, server_default=sa.text("0")),
+    )
+
+    op.execute(
+        """
+        INSERT INTO roster_stats (role, gender, marital_status, count)
+        SELECT u.role, p.gender, COALESCE(p.marital_status, ''), COUNT(*)
+        FROM users u
+        JOIN profiles p ON p.user_id = u.user_id
+        WHERE u.is_deleted = FALSE AND p.is_deleted = FALSE
+        GROUP BY u.role, p.gender, COALESCE(p.marital_status, '')
+        """
+    )
+
+
+def upgrade() -> None:
+    create_roster_stats_table()
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS roster_stats")
@@ -0,0 +1,41 @@
+"""Table Generations Migration
+
+Revision ID: c3e8a1f0d2b6
+Revises: b7c2d9e4f105
+Create Date: 2026-10-19 11:00:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8a1f0d2b6'
+down_revision: Union[str, None] = 'b7c2d9e4f105'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_table_generations_table() -> None:
+    # Bumped in the same transaction as every write to the named table
+    generations_table = op.create_table(
+        "table_generations",
+        sa.Column("table_name", sa.String(64), primary_key=True),
+        sa.Column("generation", sa.Integer, nullable=False, server_default=sa.text("0")),
+    )
+
+    op.bulk_insert(
+        generations_table,
+        [
+            {"table_name": "users", "generation": 0},
+            {"table_name": "profiles", "generation": 0},
+        ],
+    )
+
+
+def upgrade() -> None:
+    create_table_generations_table()
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS table_generations")
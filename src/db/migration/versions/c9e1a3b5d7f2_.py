@@ -0,0 +1,37 @@
+"""Worker Leases Migration
+
+Revision ID: c9e1a3b5d7f2
+Revises: b3d5f7a9c1e2
+Create Date: 2026-10-21 09:00:00.000000
+
+A worker_leases row names the gunicorn worker that runs a background job
+until expires_at, in Unix seconds. The holder renews it well before then,
+another worker takes it over once it has expired.
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e1a3b5d7f2'
+down_revision: Union[str, None] = 'b3d5f7a9c1e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_worker_leases_table() -> None:
+    op.create_table(
+        "worker_leases",
+        sa.Column("name", sa.Text, primary_key=True),
+        sa.Column("holder", sa.Text, nullable=False),
+        sa.Column("expires_at", sa.Float, nullable=False),
+    )
+
+
+def upgrade() -> None:
+    create_worker_leases_table()
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS worker_leases")
@@ -0,0 +1,49 @@
+"""Change Log Table Migration
+
+Revision ID: d5f1b3c7e9a2
+Revises: c3e8a1f0d2b6
+Create Date: 2026-10-19 13:00:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f1b3c7e9a2'
+down_revision: Union[str, None] = 'c3e8a1f0d2b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_change_log_table() -> None:
+    # seq is the sync cursor. AUTOINCREMENT keeps it from ever reusing a value,
+    # and since SQLite commits one writer at a time it follows commit order.
+    op.execute(
+        """
+        CREATE TABLE change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name VARCHAR(64) NOT NULL,
+            user_id VARCHAR(7) NOT NULL,
+            action VARCHAR(10) NOT NULL,
+            changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+    # Existing roster entries, so syncing from cursor 0 yields the full roster
+    op.execute(
+        """
+        INSERT INTO change_log (table_name, user_id, action)
+        SELECT 'profiles', user_id, 'create' FROM profiles
+        WHERE is_deleted = FALSE
+        ORDER BY created_at, user_id
+        """
+    )
+
+
+def upgrade() -> None:
+    create_change_log_table()
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS change_log")
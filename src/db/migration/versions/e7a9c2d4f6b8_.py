@@ -0,0 +1,46 @@
+"""Webhook Outbox Table Migration
+
+Revision ID: e7a9c2d4f6b8
+Revises: d5f1b3c7e9a2
+Create Date: 2026-10-19 15:00:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a9c2d4f6b8'
+down_revision: Union[str, None] = 'd5f1b3c7e9a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_webhook_outbox_table() -> None:
+    # One row per event and endpoint, deleted once delivered. Times are Unix
+    # seconds so the dispatcher can compare them without parsing.
+    op.create_table(
+        "webhook_outbox",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("endpoint", sa.String(2048), nullable=False),
+        sa.Column("payload", sa.Text, nullable=False),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("next_attempt_at", sa.Float, nullable=False, server_default=sa.text("0")),
+        sa.Column("claimed_until", sa.Float, nullable=True),
+        sa.Column("last_error", sa.Text, nullable=True),
+        sa.Column("dead_at", sa.Float, nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index(
+        "ix_webhook_outbox_due",
+        "webhook_outbox",
+        ["endpoint", "dead_at", "next_attempt_at"],
+    )
+
+
+def upgrade() -> None:
+    create_webhook_outbox_table()
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS webhook_outbox")
@@ -0,0 +1,65 @@
+"""Archive Tables Migration
+
+Revision ID: f1a3c5e7b9d0
+Revises: e7a9c2d4f6b8
+Create Date: 2026-10-19 17:00:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a3c5e7b9d0'
+down_revision: Union[str, None] = 'e7a9c2d4f6b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def archive_timestamps() -> tuple[sa.Column, ...]:
+    # The source row's timestamps, updated_at being when it was deleted
+    return (
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("is_deleted", sa.Boolean, nullable=False),
+        sa.Column("archived_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def create_users_archive_table() -> None:
+    op.create_table(
+        "users_archive",
+        sa.Column("user_id", sa.String(7), primary_key=True),
+        sa.Column("role", sa.String(255), nullable=False),
+        sa.Column("pin_hash", sa.String(255), nullable=False),
+        *archive_timestamps(),
+    )
+
+
+def create_profiles_archive_table() -> None:
+    # No unique user_id, a user's earlier deleted profiles are kept as well
+    op.create_table(
+        "profiles_archive",
+        sa.Column("profile_id", sa.String(36), primary_key=True),
+        sa.Column("user_id", sa.String(7), nullable=False, index=True),
+        sa.Column("email", sa.String(100), nullable=False),
+        sa.Column("first_name", sa.String(50), nullable=False),
+        sa.Column("last_name", sa.String(50), nullable=False),
+        sa.Column("phone", sa.String(20), nullable=False),
+        sa.Column("gender", sa.String(10), nullable=False),
+        sa.Column("date_of_birth", sa.Date(), nullable=True),
+        sa.Column("photo", sa.String(255), nullable=True),
+        sa.Column("marital_status", sa.String(20), nullable=True),
+        sa.Column("emergency_contact", sa.String(20), nullable=True),
+        *archive_timestamps(),
+    )
+
+
+def upgrade() -> None:
+    create_users_archive_table()
+    create_profiles_archive_table()
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS profiles_archive")
+    op.execute("DROP TABLE IF EXISTS users_archive")
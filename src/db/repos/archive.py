@@ -0,0 +1,247 @@
+"""Archive repository.
+
+Users and profiles soft-deleted longer than the retention period are moved
+to users_archive and profiles_archive, so the hot tables only carry rows
+that can still be read. A user is archived together with all their
+profiles, and each transaction moves at most batch_size rows of users and
+profiles together; a user with more profiles than that has them moved over
+several transactions before the user follows. Users still referenced from
+the admins table are left in place.
+"""
+
+import logging
+from typing import Optional
+
+from src.db.codec import decode_row, encode_profile_id
+from src.db.repos.base import BaseRepository
+from src.db.repos.stats import RosterStatsRepository
+from src.errors.database import AlreadyExistsError, NotFoundError
+from src.models.archive import (
+    ArchivedProfile,
+    ArchivedUser,
+    ArchivedUserProfiles,
+    ArchiveRun,
+    RestoredUser,
+)
+from src.models.profiles import ProfilePublic
+from src.models.user import UserPublic
+
+# SQL Queries
+USER_COLUMNS = "user_id, role, pin_hash, created_at, updated_at, is_deleted"
+
+PROFILE_COLUMNS = """
+profile_id, user_id, email, first_name, last_name, phone, gender, date_of_birth,
+photo, marital_status, emergency_contact, created_at, updated_at, is_deleted
+"""
+
+GET_ARCHIVABLE_USERS_QUERY = """
+SELECT user_id, (SELECT COUNT(*) FROM profiles p WHERE p.user_id = u.user_id) AS profiles
+FROM users u
+WHERE is_deleted = TRUE AND updated_at < datetime('now', :age)
+AND NOT EXISTS (SELECT 1 FROM admins a WHERE a.admin_id = u.user_id)
+ORDER BY updated_at
+LIMIT :limit
+"""
+
+GET_ARCHIVABLE_PROFILES_QUERY = """
+SELECT profile_id FROM profiles
+WHERE is_deleted = TRUE AND updated_at < datetime('now', :age)
+ORDER BY updated_at
+LIMIT :limit
+"""
+
+# Completed with the IN list of user IDs
+GET_PROFILE_IDS_BY_USER_IDS_QUERY = """
+SELECT profile_id FROM profiles WHERE user_id IN {user_ids}
+LIMIT :limit
+"""
+
+# Completed with the IN list of user IDs
+ARCHIVE_USERS_QUERY = f"""
+INSERT INTO users_archive ({USER_COLUMNS})
+SELECT {USER_COLUMNS} FROM users WHERE user_id IN {{user_ids}}
+"""
+
+DELETE_USERS_QUERY = """
+DELETE FROM users WHERE user_id IN {user_ids}
+"""
+
+# Completed with the IN list of profile IDs
+ARCHIVE_PROFILES_QUERY = f"""
+INSERT INTO profiles_archive ({PROFILE_COLUMNS})
+SELECT {PROFILE_COLUMNS} FROM profiles WHERE profile_id IN {{profile_ids}}
+"""
+
+DELETE_PROFILES_QUERY = """
+DELETE FROM profiles WHERE profile_id IN {profile_ids}
+"""
+
+GET_ARCHIVED_USER_QUERY = """
+SELECT * FROM users_archive WHERE user_id = :user_id
+"""
+
+GET_ARCHIVED_PROFILES_QUERY = """
+SELECT * FROM profiles_archive WHERE user_id = :user_id
+ORDER BY updated_at DESC, archived_at DESC
+"""
+
+GET_ARCHIVED_PROFILE_QUERY = """
+SELECT * FROM profiles_archive WHERE profile_id = :profile_id
+"""
+
+USER_EXISTS_QUERY = """
+SELECT 1 FROM users WHERE user_id = :user_id
+"""
+
+PROFILE_EXISTS_QUERY = """
+SELECT 1 FROM profiles WHERE user_id = :user_id
+"""
+
+RESTORE_USER_QUERY = f"""
+INSERT INTO users ({USER_COLUMNS})
+SELECT user_id, role, pin_hash, created_at, CURRENT_TIMESTAMP, FALSE
+FROM users_archive WHERE user_id = :user_id
+RETURNING *
+"""
+
+RESTORE_PROFILE_QUERY = f"""
+INSERT INTO profiles ({PROFILE_COLUMNS})
+SELECT profile_id, user_id, email, first_name, last_name, phone, gender, date_of_birth,
+       photo, marital_status, emergency_contact, created_at, CURRENT_TIMESTAMP, FALSE
+FROM profiles_archive WHERE profile_id = :profile_id
+RETURNING *
+"""
+
+DELETE_ARCHIVED_USER_QUERY = """
+DELETE FROM users_archive WHERE user_id = :user_id
+"""
+
+DELETE_ARCHIVED_PROFILE_QUERY = """
+DELETE FROM profiles_archive WHERE profile_id = :profile_id
+"""
+
+audit_logger = logging.getLogger("audit")
+
+
+def _archived(row) -> dict:
+    values = decode_row(row)
+    values.pop("is_deleted")
+    values.pop("pin_hash", None)
+    values["deleted_at"] = values.pop("updated_at")
+    return values
+
+
+class ArchiveRepository(BaseRepository):
+    """Moves long-deleted users and profiles to the archive and back."""
+
+    def __init__(self, db) -> None:
+        super().__init__(db)
+        self.stats_repo = RosterStatsRepository(db)
+
+    async def archive_batch(self, *, retention_seconds: float, batch_size: int) -> tuple[ArchiveRun, bool]:
+        """Archive users and profiles deleted before the retention period, at most batch_size rows in one transaction.
+
+        Returns what was moved and whether rows may be left for another batch.
+        """
+        age = f"-{int(retention_seconds)} seconds"
+
+        async def archive() -> tuple[ArchiveRun, bool]:
+            async with self.db.transaction():
+                rows = await self.db.fetch_all(
+                    query=GET_ARCHIVABLE_USERS_QUERY, values={"age": age, "limit": batch_size}
+                )
+                candidates = len(rows)
+                # Users whose profiles fit in the batch along with them
+                user_ids, moved = [], 0
+                for row in rows:
+                    if moved + 1 + row["profiles"] > batch_size:
+                        break
+                    user_ids.append(row["user_id"])
+                    moved += 1 + row["profiles"]
+                # When the oldest user alone has too many profiles, a batch of them goes first
+                owners = user_ids or [row["user_id"] for row in rows[:1]]
+                profile_ids = []
+                if owners:
+                    in_list, values = self._in_clause("user_id", owners)
+                    rows = await self.db.fetch_all(
+                        query=GET_PROFILE_IDS_BY_USER_IDS_QUERY.format(user_ids=in_list),
+                        values={**values, "limit": batch_size},
+                    )
+                    profile_ids = [row["profile_id"] for row in rows]
+                if len(user_ids) + len(profile_ids) < batch_size:
+                    rows = await self.db.fetch_all(
+                        query=GET_ARCHIVABLE_PROFILES_QUERY,
+                        values={"age": age, "limit": batch_size - len(user_ids) - len(profile_ids)},
+                    )
+                    profile_ids.extend(row["profile_id"] for row in rows if row["profile_id"] not in profile_ids)
+
+                if profile_ids:
+                    in_list, values = self._in_clause("profile_id", profile_ids)
+                    await self.db.execute(query=ARCHIVE_PROFILES_QUERY.format(profile_ids=in_list), values=values)
+                    await self.db.execute(query=DELETE_PROFILES_QUERY.format(profile_ids=in_list), values=values)
+                if user_ids:
+                    in_list, values = self._in_clause("user_id", user_ids)
+                    await self.db.execute(query=ARCHIVE_USERS_QUERY.format(user_ids=in_list), values=values)
+                    await self.db.execute(query=DELETE_USERS_QUERY.format(user_ids=in_list), values=values)
+                more = len(user_ids) < candidates or len(user_ids) + len(profile_ids) >= batch_size
+                return ArchiveRun(users=len(user_ids), profiles=len(profile_ids)), more
+
+        run, more = await self._write(archive)
+        if run.users or run.profiles:
+            audit_logger.info(f"Archived {run.users} users and {run.profiles} profiles")
+        return run, more
+
+    async def get_archived(self, *, user_id: str) -> ArchivedUserProfiles:
+        """Look up what the archive holds for a user."""
+        user = await self.db.fetch_one(query=GET_ARCHIVED_USER_QUERY, values={"user_id": user_id})
+        profiles = await self.db.fetch_all(query=GET_ARCHIVED_PROFILES_QUERY, values={"user_id": user_id})
+        if user is None and not profiles:
+            raise NotFoundError(entity_name="Archived user", entity_identifier=user_id)
+        return ArchivedUserProfiles(
+            user=ArchivedUser(**_archived(user)) if user else None,
+            profiles=[ArchivedProfile(**_archived(profile)) for profile in profiles],
+        )
+
+    async def get_archived_profile(self, *, profile_id: str) -> ArchivedProfile:
+        profile = await self.db.fetch_one(
+            query=GET_ARCHIVED_PROFILE_QUERY, values={"profile_id": encode_profile_id(profile_id)}
+        )
+        if profile is None:
+            raise NotFoundError(entity_name="Archived profile", entity_identifier=profile_id)
+        return ArchivedProfile(**_archived(profile))
+
+    async def restore_user(self, *, user_id: str) -> RestoredUser:
+        """Move an archived user back, with their latest profile if they have no other."""
+
+        async def restore() -> Optional[RestoredUser]:
+            async with self.db.transaction():
+                if await self.db.fetch_one(query=USER_EXISTS_QUERY, values={"user_id": user_id}):
+                    raise AlreadyExistsError(entity_name="User", entity_identifier=f"ID {user_id}")
+                user = await self.db.fetch_one(query=RESTORE_USER_QUERY, values={"user_id": user_id})
+                if user is None:
+                    return None
+                await self.db.execute(query=DELETE_ARCHIVED_USER_QUERY, values={"user_id": user_id})
+
+                profile = None
+                if not await self.db.fetch_one(query=PROFILE_EXISTS_QUERY, values={"user_id": user_id}):
+                    archived = await self.db.fetch_one(query=GET_ARCHIVED_PROFILES_QUERY, values={"user_id": user_id})
+                    if archived is not None:
+                        values = {"profile_id": archived["profile_id"]}
+                        profile = await self.db.fetch_one(query=RESTORE_PROFILE_QUERY, values=values)
+                        await self.db.execute(query=DELETE_ARCHIVED_PROFILE_QUERY, values=values)
+
+                after = await self.stats_repo.get_entry(user_id=user_id)
+                await self.stats_repo.apply(before=None, after=after)
+                await self._record_change("users", user_id, "restore")
+                user = decode_row(user)
+                user.pop("pin_hash")
+                return RestoredUser(
+                    user=UserPublic(**user),
+                    profile=ProfilePublic(**decode_row(profile)) if profile else None,
+                )
+
+        restored = await self._write(restore)
+        if restored is None:
+            raise NotFoundError(entity_name="Archived user", entity_identifier=user_id)
+        audit_logger.info(f"Restored user with ID: {user_id} from the archive")
+        return restored
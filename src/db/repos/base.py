@@ -1,8 +1,143 @@
 """Base Repo"""
 
+import json
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Hashable, Optional, Sequence
+
 from databases import Database
 
+from src.core.config import WEBHOOK_URLS
+from src.db.cache import MISS, get_result_cache
+from src.db.loader import BatchLoad, DataLoader, clear_loaders, get_loader
+from src.db.single_flight import get_single_flight
+from src.db.snapshot import get_roster_snapshot
+from src.db.writer import get_write_coordinator
+from src.services.events import get_event_hub
+
+GET_TABLE_GENERATIONS_QUERY = """
+SELECT table_name, generation FROM table_generations
+"""
+
+BUMP_TABLE_GENERATION_QUERY = """
+UPDATE table_generations
+SET generation = generation + 1
+WHERE table_name = :table_name
+"""
+
+RECORD_CHANGE_QUERY = """
+INSERT INTO change_log (table_name, user_id, action)
+VALUES (:table_name, :user_id, :action)
+"""
+
+CREATE_OUTBOX_ROW_QUERY = """
+INSERT INTO webhook_outbox (endpoint, payload)
+VALUES (:endpoint, :payload)
+"""
+
+# Table -> entity name used in webhook event types, e.g. "user.delete"
+ENTITY_NAMES = {"users": "user", "profiles": "profile"}
+
+
 class BaseRepository:
 
     def __init__(self, db: Database) -> None:
-        self.db = db
\ No newline at end of file
+        self.db = db
+
+    async def _write(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a mutating operation through the write coordinator, if one is attached."""
+        writer = get_write_coordinator(self.db)
+        if writer is None or writer.in_writer():
+            result = await operation()
+        else:
+            result = await writer.submit(operation)
+        flights = get_single_flight(self.db)
+        if flights is not None:
+            flights.note_write()
+        clear_loaders()
+        snapshot = get_roster_snapshot(self.db)
+        if snapshot is not None:
+            snapshot.mark_stale()
+        hub = get_event_hub(self.db)
+        if hub is not None:
+            hub.wake()
+        return result
+
+    async def _submit(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a write through the write coordinator without the invalidation of _write.
+
+        For bookkeeping writes that change no roster rows, so read caches,
+        loaders and event streams are left alone.
+        """
+        writer = get_write_coordinator(self.db)
+        if writer is None or writer.in_writer():
+            return await operation()
+        return await writer.submit(operation)
+
+    async def _shared(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a read, sharing the result with identical reads already in flight.
+
+        The result object is handed to every caller, so it must not be mutated.
+        """
+        flights = get_single_flight(self.db)
+        if flights is None:
+            return await load()
+        return await flights.do(key, load)
+
+    def _loader(self, name: str, batch_load: BatchLoad) -> Optional[DataLoader]:
+        """Return the current request's loader of this name, if inside a request."""
+        return get_loader(name, batch_load)
+
+    @staticmethod
+    def _in_clause(name: str, values: Sequence[Any]) -> tuple[str, dict]:
+        """Build the "(:name_0, :name_1, ...)" list and bind values for an IN query."""
+        params = {f"{name}_{i}": value for i, value in enumerate(values)}
+        return "(" + ", ".join(f":{param}" for param in params) + ")", params
+
+    async def _bump_generation(self, table_name: str) -> None:
+        """Invalidate cached reads of a table. Call in the transaction that writes it."""
+        await self.db.execute(query=BUMP_TABLE_GENERATION_QUERY, values={"table_name": table_name})
+
+    async def _record_change(self, table_name: str, user_id: str, action: str) -> None:
+        """Log a change to a user's roster entry and invalidate cached reads of the table.
+
+        Call in the transaction that writes it, so the change log's sequence
+        follows commit order and webhook outbox rows commit with the change.
+        """
+        seq = await self.db.execute(
+            query=RECORD_CHANGE_QUERY,
+            values={"table_name": table_name, "user_id": str(user_id), "action": action},
+        )
+        await self._bump_generation(table_name)
+
+        if WEBHOOK_URLS:
+            payload = json.dumps({
+                "id": seq,
+                "event": f"{ENTITY_NAMES[table_name]}.{action}",
+                "user_id": str(user_id),
+                "occurred_at": datetime.now(timezone.utc).isoformat(),
+            })
+            for endpoint in WEBHOOK_URLS:
+                await self.db.execute(query=CREATE_OUTBOX_ROW_QUERY, values={"endpoint": endpoint, "payload": payload})
+
+    async def _cached(
+        self,
+        key: Hashable,
+        tables: tuple[str, ...],
+        load: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return a cached result for key, loading it if the tables changed since it was stored."""
+        cache = get_result_cache(self.db)
+        if cache is None:
+            return await load()
+
+        # Read the generations before the data, so a write landing in between
+        # can only make the entry fresher than its tag, never staler
+        rows = await self.db.fetch_all(query=GET_TABLE_GENERATIONS_QUERY)
+        generation_by_table = {row["table_name"]: row["generation"] for row in rows}
+        generations = tuple(generation_by_table.get(table) for table in tables)
+
+        value = cache.get(key, generations)
+        if value is MISS:
+            value = await load()
+            cache.set(key, generations, value)
+        return value
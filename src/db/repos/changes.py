@@ -0,0 +1,159 @@
+"""Change log repository for incremental roster sync.
+
+Changes older than the retention are pruned down to the latest row of each
+user still on the roster, so a sync from cursor 0 keeps yielding the full
+roster while the log stays bounded. The highest pruned cursor is the
+horizon: a client behind it may have missed tombstones and must resync.
+
+A sync from 0 is a scan that returns the current state of every user, so
+rows pruned before it started cannot make it miss anything. Its pages carry
+the latest cursor at its start as scan, and its cursors stay valid behind
+the horizon while the horizon has not passed scan. Pages stay bounded by
+the requested limit.
+"""
+
+from typing import Optional
+
+from src.db.repos.base import BaseRepository
+from src.db.repos.profiles import ProfileRepository
+from src.db.repos.user import UserRepository
+from src.errors.database import CursorExpiredError
+from src.models.changes import RosterChanges
+from src.models.user_profile import UserProfilePublic
+
+# SQL Queries
+GET_CHANGES_SINCE_QUERY = """
+SELECT seq, user_id FROM change_log
+WHERE seq > :since
+ORDER BY seq
+LIMIT :limit
+"""
+
+GET_LATEST_CURSOR_QUERY = """
+SELECT COALESCE(MAX(seq), 0) AS cursor FROM change_log
+"""
+
+GET_HORIZON_QUERY = """
+SELECT seq FROM change_log_horizon WHERE id = 1
+"""
+
+GET_PRUNABLE_HORIZON_QUERY = """
+SELECT COALESCE(MAX(seq), 0) AS seq FROM change_log
+WHERE changed_at < datetime('now', :age)
+"""
+
+RAISE_HORIZON_QUERY = """
+UPDATE change_log_horizon SET seq = MAX(seq, :seq) WHERE id = 1
+"""
+
+# Rows up to the horizon that a later row of the same user supersedes, or
+# whose user is no longer on the roster
+GET_PRUNABLE_ROWS_QUERY = """
+SELECT old.seq FROM change_log AS old
+WHERE old.seq <= :horizon
+AND (
+    EXISTS (
+        SELECT 1 FROM change_log AS newer
+        WHERE newer.user_id = old.user_id AND newer.seq > old.seq
+    )
+    OR NOT EXISTS (
+        SELECT 1 FROM users AS u
+        JOIN profiles AS p ON p.user_id = u.user_id
+        WHERE u.user_id = CAST(old.user_id AS INTEGER)
+        AND u.is_deleted = FALSE AND p.is_deleted = FALSE
+    )
+)
+ORDER BY old.seq
+LIMIT :limit
+"""
+
+DELETE_ROWS_QUERY = """
+DELETE FROM change_log WHERE seq IN {seqs}
+"""
+
+
+class ChangeLogRepository(BaseRepository):
+    """Reads the change log written by the user and profile write paths."""
+
+    async def get_latest_cursor(self) -> int:
+        row = await self.db.fetch_one(query=GET_LATEST_CURSOR_QUERY)
+        return row["cursor"]
+
+    async def get_horizon(self) -> int:
+        """Oldest cursor still served, other than 0."""
+        row = await self.db.fetch_one(query=GET_HORIZON_QUERY)
+        return row["seq"] if row else 0
+
+    async def prune(self, *, retention: float, limit: int) -> tuple[int, int]:
+        """Prune up to limit rows older than retention seconds, in one write.
+
+        Returns the rows removed and the horizon.
+        """
+
+        async def prune() -> tuple[int, int]:
+            row = await self.db.fetch_one(
+                query=GET_PRUNABLE_HORIZON_QUERY, values={"age": f"-{int(retention)} seconds"}
+            )
+            # Raised before any row goes, in the same transaction
+            await self.db.execute(query=RAISE_HORIZON_QUERY, values={"seq": row["seq"]})
+            horizon = await self.get_horizon()
+            rows = await self.db.fetch_all(
+                query=GET_PRUNABLE_ROWS_QUERY, values={"horizon": horizon, "limit": limit}
+            )
+            if rows:
+                in_list, values = self._in_clause("seq", [row["seq"] for row in rows])
+                await self.db.execute(query=DELETE_ROWS_QUERY.format(seqs=in_list), values=values)
+            return len(rows), horizon
+
+        return await self._submit(prune)
+
+    async def get_changes(
+        self, *, since: int, limit: int, role: Optional[str] = None, scan: Optional[int] = None
+    ) -> RosterChanges:
+        """Return the roster entries changed after the cursor.
+
+        Each changed user appears once: as an upsert with their current user
+        and profile if they are on the roster (of the given role), otherwise
+        as a tombstone. Reads one page of the change log by its primary key.
+        Raises CursorExpiredError for a cursor behind the horizon, unless it
+        belongs to a scan the horizon has not passed.
+        """
+        horizon = await self.get_horizon()
+        if not since:
+            # Pruned rows count as read, the latest cursor may be below them
+            scan = max(await self.get_latest_cursor(), horizon)
+        if since and since < horizon and (scan is None or since > scan or scan < horizon):
+            raise CursorExpiredError(since)
+
+        rows = await self.db.fetch_all(
+            query=GET_CHANGES_SINCE_QUERY, values={"since": since, "limit": limit + 1}
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        cursor = rows[-1]["seq"] if rows else since
+        if scan is not None and not has_more:
+            # Every row up to the end was read, those up to scan included
+            cursor = max(cursor, scan)
+        if not rows:
+            return RosterChanges(cursor=cursor, has_more=False, upserts=[], tombstones=[])
+
+        user_ids = list(dict.fromkeys(row["user_id"] for row in rows))
+        users = await UserRepository(self.db).get_users_by_ids(user_ids)
+        profiles = await ProfileRepository(self.db).get_profiles_by_user_ids(user_ids)
+
+        upserts, tombstones = [], []
+        for user_id in user_ids:
+            user, profile = users.get(user_id), profiles.get(user_id)
+            if user is None or profile is None or (role is not None and user.role != role):
+                tombstones.append(user_id)
+            else:
+                upserts.append(UserProfilePublic(user=user, profile=profile))
+
+        return RosterChanges(
+            cursor=cursor,
+            has_more=has_more,
+            # Past the rows written before it started, the scan is an ordinary sync
+            scan=scan if scan is not None and cursor < scan else None,
+            upserts=upserts,
+            tombstones=tombstones,
+        )
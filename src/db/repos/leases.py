@@ -0,0 +1,54 @@
+"""Worker lease repository.
+
+Leases are bookkeeping of the workers, not roster data, so they are taken
+and released through the write coordinator with BaseRepository._submit.
+"""
+
+import time
+from typing import Optional
+
+from src.db.repos.base import BaseRepository
+
+# SQL Queries
+GET_LEASE_QUERY = """
+SELECT holder, expires_at FROM worker_leases
+WHERE name = :name
+"""
+
+# Takes a free or expired lease, or renews one already held. The upsert
+# updates nothing, and so returns no row, while another holder's is live.
+ACQUIRE_LEASE_QUERY = """
+INSERT INTO worker_leases (name, holder, expires_at)
+VALUES (:name, :holder, :expires_at)
+ON CONFLICT (name) DO UPDATE
+SET holder = excluded.holder, expires_at = excluded.expires_at
+WHERE worker_leases.holder = excluded.holder OR worker_leases.expires_at < :now
+RETURNING holder
+"""
+
+RELEASE_LEASE_QUERY = """
+DELETE FROM worker_leases
+WHERE name = :name AND holder = :holder
+"""
+
+
+class LeaseRepository(BaseRepository):
+
+    async def get_lease(self, *, name: str) -> Optional[dict]:
+        row = await self.db.fetch_one(query=GET_LEASE_QUERY, values={"name": name})
+        return dict(row) if row else None
+
+    async def acquire(self, *, name: str, holder: str, seconds: float) -> bool:
+        """Take or renew the lease for seconds. False while another holder has it."""
+        now = time.time()
+        values = {"name": name, "holder": holder, "expires_at": now + seconds, "now": now}
+
+        async def acquire() -> bool:
+            return await self.db.fetch_one(query=ACQUIRE_LEASE_QUERY, values=values) is not None
+
+        return await self._submit(acquire)
+
+    async def release(self, *, name: str, holder: str) -> None:
+        """Give the lease up, so another worker can take it without waiting for it to expire."""
+        values = {"name": name, "holder": holder}
+        await self._submit(lambda: self.db.execute(query=RELEASE_LEASE_QUERY, values=values))
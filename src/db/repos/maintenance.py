@@ -0,0 +1,100 @@
+"""Maintenance repository: planner statistics, free page reclamation and WAL checkpoints.
+
+Every operation here is a small step, so a caller can stop between steps
+once its time budget is spent. Steps that write go through the write
+coordinator with BaseRepository._submit, skipping the cache invalidation
+since they change no rows.
+"""
+
+from src.db.repos.base import BaseRepository
+
+# SQL Queries
+GET_TABLES_QUERY = """
+SELECT name FROM sqlite_master
+WHERE type = 'table' AND substr(name, 1, 7) != 'sqlite_'
+ORDER BY name
+"""
+
+GET_ANALYZED_TABLES_QUERY = """
+SELECT DISTINCT tbl AS name FROM sqlite_stat1
+"""
+
+HAS_STAT_TABLE_QUERY = """
+SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'
+"""
+
+# Rows ANALYZE samples per index, bounding the time it takes on large tables
+SET_ANALYSIS_LIMIT_QUERY = "PRAGMA analysis_limit = {limit}"
+
+# Table names come from sqlite_master, quoted as identifiers
+ANALYZE_TABLE_QUERY = 'ANALYZE "{table}"'
+
+OPTIMIZE_QUERY = "PRAGMA optimize"
+
+GET_AUTO_VACUUM_QUERY = "PRAGMA auto_vacuum"
+
+GET_FREELIST_COUNT_QUERY = "PRAGMA freelist_count"
+
+# The sqlite3 module steps a statement that returns no rows once, and each
+# step of incremental_vacuum frees one page, so pages are freed one by one
+INCREMENTAL_VACUUM_QUERY = "PRAGMA incremental_vacuum(1)"
+
+CHECKPOINT_QUERY = "PRAGMA wal_checkpoint(PASSIVE)"
+
+# PRAGMA auto_vacuum values
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+
+class MaintenanceRepository(BaseRepository):
+
+    async def get_tables(self) -> list[str]:
+        rows = await self.db.fetch_all(query=GET_TABLES_QUERY)
+        return [row["name"] for row in rows]
+
+    async def get_analyzed_tables(self) -> set[str]:
+        """Tables the planner has statistics for."""
+        if await self.db.fetch_one(query=HAS_STAT_TABLE_QUERY) is None:
+            return set()
+        rows = await self.db.fetch_all(query=GET_ANALYZED_TABLES_QUERY)
+        return {row["name"] for row in rows}
+
+    async def analyze_table(self, table: str, *, limit: int) -> None:
+        """Refresh the planner statistics of one table, sampling up to limit rows per index."""
+
+        async def analyze() -> None:
+            await self.db.execute(query=SET_ANALYSIS_LIMIT_QUERY.format(limit=int(limit)))
+            await self.db.execute(query=ANALYZE_TABLE_QUERY.format(table=table.replace('"', '""')))
+
+        await self._submit(analyze)
+
+    async def optimize(self) -> None:
+        """Let SQLite re-analyze whatever its own heuristics consider stale."""
+        await self._submit(lambda: self.db.execute(query=OPTIMIZE_QUERY))
+
+    async def get_auto_vacuum(self) -> str:
+        row = await self.db.fetch_one(query=GET_AUTO_VACUUM_QUERY)
+        return AUTO_VACUUM_MODES.get(row[0], str(row[0]))
+
+    async def get_free_pages(self) -> int:
+        row = await self.db.fetch_one(query=GET_FREELIST_COUNT_QUERY)
+        return row[0]
+
+    async def incremental_vacuum(self, *, pages: int) -> int:
+        """Return up to pages free pages to the filesystem, in one write. Returns the pages left free."""
+
+        async def vacuum() -> int:
+            for _ in range(pages):
+                await self.db.execute(query=INCREMENTAL_VACUUM_QUERY)
+            return await self.get_free_pages()
+
+        return await self._submit(vacuum)
+
+    async def checkpoint(self) -> dict:
+        """Copy committed WAL frames into the database without waiting on readers or writers.
+
+        Must not run inside the writer's transaction, a connection cannot
+        checkpoint while it has one open.
+        """
+        async with self.db.connection():
+            row = await self.db.fetch_one(query=CHECKPOINT_QUERY)
+        return {"busy": bool(row[0]), "wal_frames": row[1], "checkpointed_frames": row[2]}
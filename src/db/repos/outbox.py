@@ -0,0 +1,110 @@
+"""Webhook outbox repository.
+
+Outbox rows are bookkeeping of the dispatcher, not roster data, so claims,
+completions and retries go through the write coordinator with
+BaseRepository._submit and leave read caches and event streams alone.
+"""
+
+import time
+from typing import List
+
+from src.db.repos.base import BaseRepository
+
+# SQL Queries
+# Probed with a plain read first, so an idle outbox costs no write
+HAS_DUE_OUTBOX_ROWS_QUERY = """
+SELECT 1 FROM webhook_outbox
+WHERE endpoint = :endpoint AND dead_at IS NULL AND next_attempt_at <= :now
+  AND (claimed_until IS NULL OR claimed_until < :now)
+LIMIT 1
+"""
+
+# Leases the next due rows, so concurrent batches and other workers skip them
+CLAIM_OUTBOX_ROWS_QUERY = """
+UPDATE webhook_outbox
+SET claimed_until = :lease_until
+WHERE id IN (
+    SELECT id FROM webhook_outbox
+    WHERE endpoint = :endpoint AND dead_at IS NULL AND next_attempt_at <= :now
+      AND (claimed_until IS NULL OR claimed_until < :now)
+    ORDER BY id
+    LIMIT :limit
+)
+RETURNING id, payload, attempts
+"""
+
+# Completed with the IN list of delivered rows
+DELETE_OUTBOX_ROWS_QUERY = """
+DELETE FROM webhook_outbox
+WHERE id IN {ids}
+"""
+
+RETRY_OUTBOX_ROW_QUERY = """
+UPDATE webhook_outbox
+SET attempts = :attempts,
+    next_attempt_at = :next_attempt_at,
+    claimed_until = NULL,
+    last_error = :error,
+    dead_at = :dead_at
+WHERE id = :id
+"""
+
+GET_OUTBOX_BACKLOG_QUERY = """
+SELECT endpoint,
+       SUM(CASE WHEN dead_at IS NULL THEN 1 ELSE 0 END) AS pending,
+       SUM(CASE WHEN dead_at IS NULL THEN 0 ELSE 1 END) AS dead
+FROM webhook_outbox
+GROUP BY endpoint
+"""
+
+
+class OutboxRepository(BaseRepository):
+    """Claims, completes and reschedules webhook outbox rows."""
+
+    async def claim(self, *, endpoint: str, limit: int, lease_seconds: float) -> List[dict]:
+        """Lease up to limit due rows for an endpoint, oldest first."""
+        now = time.time()
+        due = await self.db.fetch_one(query=HAS_DUE_OUTBOX_ROWS_QUERY, values={"endpoint": endpoint, "now": now})
+        if due is None:
+            return []
+        rows = await self._submit(
+            lambda: self.db.fetch_all(
+                query=CLAIM_OUTBOX_ROWS_QUERY,
+                values={"endpoint": endpoint, "now": now, "lease_until": now + lease_seconds, "limit": limit},
+            )
+        )
+        return sorted((dict(row) for row in rows), key=lambda row: row["id"])
+
+    async def complete(self, *, ids: List[int]) -> None:
+        """Remove delivered rows."""
+        in_list, values = self._in_clause("id", ids)
+        await self._submit(lambda: self.db.execute(query=DELETE_OUTBOX_ROWS_QUERY.format(ids=in_list), values=values))
+
+    async def retry(self, *, rows: List[dict], error: str, backoff: float, max_backoff: float, max_attempts: int) -> int:
+        """Reschedule failed rows with exponential backoff, returning how many were given up on."""
+        now = time.time()
+
+        async def reschedule() -> int:
+            dead = 0
+            async with self.db.transaction():
+                for row in rows:
+                    attempts = row["attempts"] + 1
+                    dead_at = now if attempts >= max_attempts else None
+                    dead += dead_at is not None
+                    await self.db.execute(
+                        query=RETRY_OUTBOX_ROW_QUERY,
+                        values={
+                            "id": row["id"],
+                            "attempts": attempts,
+                            "next_attempt_at": now + min(max_backoff, backoff * 2 ** (attempts - 1)),
+                            "error": error[:1000],
+                            "dead_at": dead_at,
+                        },
+                    )
+            return dead
+
+        return await self._submit(reschedule)
+
+    async def get_backlog(self) -> dict[str, dict]:
+        rows = await self.db.fetch_all(query=GET_OUTBOX_BACKLOG_QUERY)
+        return {row["endpoint"]: {"pending": row["pending"], "dead": row["dead"]} for row in rows}
@@ -1,15 +1,21 @@
 """Profile repository for database operations."""
 
 import logging
-from typing import List
+from typing import Any, List, Optional
 import uuid
 
 from databases import Database
 from pydantic import ValidationError
 
+from src.core.config import ROSTER_PAGE_SIZE
+from src.db.codec import decode_row, encode_profile_id
 from src.db.repos.base import BaseRepository
+from src.db.repos.stats import RosterStatsRepository
+from src.db.update_builder import build_update_query, changed_fields
 from src.errors.database import NotFoundError
-from src.models.profiles import ProfileCreate, ProfileInDb, ProfileUpdate
+from src.models.base import CoreModel
+from src.models.fields import projection_model
+from src.models.profiles import ProfileCreate, ProfileInDb, ProfilePublic, ProfileUpdate
 
 # SQL Queries
 CREATE_PROFILE_QUERY = """
@@ -27,6 +33,13 @@ SELECT * FROM profiles
 WHERE is_deleted = FALSE
 """
 
+GET_PROFILES_PAGE_QUERY = """
+SELECT * FROM profiles
+WHERE is_deleted = FALSE
+ORDER BY created_at, profile_id
+LIMIT :limit OFFSET :offset
+"""
+
 GET_PROFILE_BY_ID_QUERY = """
 SELECT * FROM profiles
 WHERE profile_id = :profile_id AND is_deleted = FALSE
@@ -42,23 +55,26 @@ SELECT * FROM profiles
 WHERE user_id = :user_id AND is_deleted = FALSE
 """
 
-UPDATE_PROFILE_QUERY = """
-UPDATE profiles
-SET 
-    first_name = COALESCE(:first_name, first_name),
-    last_name = COALESCE(:last_name, last_name),
-    phone = COALESCE(:phone, phone),
-    gender = COALESCE(:gender, gender),
-    email = COALESCE(:email, email),
-    date_of_birth = COALESCE(:date_of_birth, date_of_birth),
-    photo = COALESCE(:photo, photo),
-    marital_status = COALESCE(:marital_status, marital_status),
-    emergency_contact = COALESCE(:emergency_contact, emergency_contact),
-    updated_at = CURRENT_TIMESTAMP
-WHERE profile_id = :profile_id AND is_deleted = FALSE
-RETURNING *
+# Completed with the IN list for each batch
+GET_PROFILES_BY_USER_IDS_QUERY = """
+SELECT * FROM profiles
+WHERE user_id IN {user_ids} AND is_deleted = FALSE
 """
 
+GET_PROFILES_BY_IDS_QUERY = """
+SELECT * FROM profiles
+WHERE profile_id IN {profile_ids} AND is_deleted = FALSE
+"""
+
+# Completed with the requested columns and the row filter
+SELECT_PROFILE_FIELDS_QUERY = """
+SELECT {columns} FROM profiles
+WHERE {condition} AND is_deleted = FALSE
+"""
+
+# SQLite's default limit on bound variables is 999
+MAX_BATCH_SIZE = 500
+
 DELETE_PROFILE_QUERY = """
 UPDATE profiles
 SET is_deleted = TRUE, updated_at = CURRENT_TIMESTAMP
@@ -75,11 +91,12 @@ class ProfileRepository(BaseRepository):
     def __init__(self, db: Database) -> None:
         """Initialize the repository with database connection."""
         super().__init__(db)
+        self.stats_repo = RosterStatsRepository(db)
 
     async def create_profile(self, *, new_profile: ProfileCreate) -> ProfileInDb:
         """Create a new profile in the database."""
         try:
-            profile_id = str(uuid.uuid4())
+            profile_id = uuid.uuid4()
             audit_logger.info(f"Creating profile for email: {new_profile.email}")
 
             # Extract user_id if it was added by the service layer
@@ -88,7 +105,7 @@ class ProfileRepository(BaseRepository):
                 raise ValueError("user_id is required for profile creation")
 
             values = {
-                "profile_id": profile_id,
+                "profile_id": profile_id.bytes,
                 "user_id": user_id,
                 "first_name": new_profile.first_name,
                 "last_name": new_profile.last_name,
@@ -101,13 +118,22 @@ class ProfileRepository(BaseRepository):
                 "emergency_contact": new_profile.emergency_contact,
             }
 
-            created = await self.db.fetch_one(query=CREATE_PROFILE_QUERY, values=values)
+            async def create():
+                async with self.db.transaction():
+                    created = await self.db.fetch_one(query=CREATE_PROFILE_QUERY, values=values)
+                    # A user without a profile is not counted, so there is nothing to move from
+                    after = await self.stats_repo.get_entry(user_id=user_id)
+                    await self.stats_repo.apply(before=None, after=after)
+                    await self._record_change("profiles", user_id, "create")
+                    return created
+
+            created = await self._write(create)
             if not created:
                 audit_logger.error("Failed to create profile in database.")
                 raise Exception("Failed to create profile in database.")
             
             audit_logger.info(f"Profile created successfully with ID: {profile_id}")
-            return ProfileInDb(**dict(created))
+            return ProfileInDb(**decode_row(created))
 
         except ValidationError as e:
             audit_logger.error(f"Validation error creating profile: {e}")
@@ -116,42 +142,165 @@ class ProfileRepository(BaseRepository):
             audit_logger.error(f"Error creating profile: {e}")
             raise
 
+    async def _select_fields(
+        self,
+        fields: tuple[str, ...],
+        condition: str,
+        values: dict,
+        *,
+        key: Optional[str] = None,
+        suffix: str = "",
+    ) -> list[tuple[Any, CoreModel]]:
+        """Select only the requested profile columns, returning (key, projection) pairs.
+
+        fields must already be checked against ProfilePublic. The key column
+        is read as well when given, so results can be matched to the ids asked for.
+        """
+        columns = fields if key is None or key in fields else (*fields, key)
+        query = SELECT_PROFILE_FIELDS_QUERY.format(columns=", ".join(columns), condition=condition) + suffix
+        rows = await self.db.fetch_all(query=query, values=values)
+        model = projection_model(ProfilePublic, fields)
+        rows = [decode_row(row) for row in rows]
+        return [(row[key] if key else None, model(**row)) for row in rows]
+
+    async def get_profile_fields(
+        self, *, fields: tuple[str, ...], id: Optional[uuid.UUID] = None, user_id: Optional[int] = None
+    ) -> CoreModel:
+        """Get the requested fields of one profile, by profile ID or user ID."""
+        if id is not None:
+            found = await self._select_fields(fields, "profile_id = :profile_id", {"profile_id": encode_profile_id(id)})
+        else:
+            found = await self._select_fields(fields, "user_id = :user_id", {"user_id": str(user_id)})
+        if not found:
+            raise NotFoundError(entity_name="Profile", entity_identifier=str(id or user_id))
+        return found[0][1]
+
     async def get_profile_by_id(self, *, id: uuid.UUID) -> ProfileInDb:
         """Get a profile by its ID."""
-        profile = await self.db.fetch_one(query=GET_PROFILE_BY_ID_QUERY, values={"profile_id": str(id)})
+        profile = await self.db.fetch_one(query=GET_PROFILE_BY_ID_QUERY, values={"profile_id": encode_profile_id(id)})
         if not profile:
             raise NotFoundError(entity_name="Profile", entity_identifier=str(id))
-        return ProfileInDb(**dict(profile))
+        return ProfileInDb(**decode_row(profile))
 
     async def get_profile_by_email(self, *, email: str) -> ProfileInDb:
         """Get a profile by email address."""
         profile = await self.db.fetch_one(query=GET_PROFILE_BY_EMAIL_QUERY, values={"email": email.lower()})
         if not profile:
             raise NotFoundError(entity_name="Profile", entity_identifier=email)
-        return ProfileInDb(**dict(profile))
+        return ProfileInDb(**decode_row(profile))
 
     async def get_profile_by_user_id(self, *, user_id: int) -> ProfileInDb:
-        """Get a profile by user ID."""
-        profile = await self.db.fetch_one(query=GET_PROFILE_BY_USER_ID_QUERY, values={"user_id": user_id})
-        if not profile:
+        """Get a profile by user ID.
+
+        Within a request, lookups made in the same event loop iteration are
+        batched into one query and repeated lookups are answered from memory.
+        """
+        loader = self._loader("profiles_by_user_id", self.get_profiles_by_user_ids)
+        if loader is not None:
+            profile = await loader.load(str(user_id))
+        else:
+            profile = await self._fetch_profile_by_user_id(str(user_id))
+        if profile is None:
             raise NotFoundError(entity_name="Profile", entity_identifier=str(user_id))
-        return ProfileInDb(**dict(profile))
+        return profile
+
+    async def _fetch_profile_by_user_id(self, user_id: str) -> Optional[ProfileInDb]:
+        async def load() -> Optional[ProfileInDb]:
+            profile = await self.db.fetch_one(query=GET_PROFILE_BY_USER_ID_QUERY, values={"user_id": user_id})
+            return ProfileInDb(**decode_row(profile)) if profile else None
+
+        return await self._shared((GET_PROFILE_BY_USER_ID_QUERY, user_id), load)
+
+    async def get_profiles_by_user_ids(
+        self, user_ids: List[str], fields: Optional[tuple[str, ...]] = None
+    ) -> dict[str, ProfileInDb]:
+        """Get the active profiles of several users, keyed by user ID.
+
+        With fields, only those columns are read and projections are returned.
+        """
+        if fields is not None:
+            return await self._select_fields_in("user_id", user_ids, fields)
+        if len(user_ids) == 1:
+            # A lone lookup can still share a query with other requests
+            profile = await self._fetch_profile_by_user_id(user_ids[0])
+            return {user_ids[0]: profile} if profile else {}
+
+        profiles = {}
+        for start in range(0, len(user_ids), MAX_BATCH_SIZE):
+            in_list, values = self._in_clause("user_id", user_ids[start:start + MAX_BATCH_SIZE])
+            rows = await self.db.fetch_all(query=GET_PROFILES_BY_USER_IDS_QUERY.format(user_ids=in_list), values=values)
+            for row in rows:
+                profile = ProfileInDb(**decode_row(row))
+                profiles[profile.user_id] = profile
+        return profiles
         
+    async def get_profiles_by_ids(
+        self, profile_ids: List[str], fields: Optional[tuple[str, ...]] = None
+    ) -> dict[str, ProfileInDb]:
+        """Get several active profiles, keyed by profile ID."""
+        if fields is not None:
+            return await self._select_fields_in("profile_id", profile_ids, fields)
+        profiles = {}
+        for start in range(0, len(profile_ids), MAX_BATCH_SIZE):
+            chunk = [encode_profile_id(profile_id) for profile_id in profile_ids[start:start + MAX_BATCH_SIZE]]
+            in_list, values = self._in_clause("profile_id", chunk)
+            rows = await self.db.fetch_all(query=GET_PROFILES_BY_IDS_QUERY.format(profile_ids=in_list), values=values)
+            for row in rows:
+                profile = ProfileInDb(**decode_row(row))
+                profiles[profile.profile_id] = profile
+        return profiles
+
+    async def _select_fields_in(self, key: str, ids: List[str], fields: tuple[str, ...]) -> dict[str, CoreModel]:
+        profiles = {}
+        for start in range(0, len(ids), MAX_BATCH_SIZE):
+            chunk = ids[start:start + MAX_BATCH_SIZE]
+            if key == "profile_id":
+                chunk = [encode_profile_id(profile_id) for profile_id in chunk]
+            in_list, values = self._in_clause(key, chunk)
+            profiles.update(await self._select_fields(fields, f"{key} IN {in_list}", values, key=key))
+        return profiles
+
     async def update_profile(self, *, id: uuid.UUID, profile_update: ProfileUpdate) -> ProfileInDb:
-        """Update an existing profile's information."""
+        """Update an existing profile's information.
+
+        Only columns whose values change are written. When nothing changes the
+        stored row is returned untouched, without bumping updated_at.
+        """
         try:
-            values = {
-                "profile_id": str(id),
-                **profile_update.model_dump(exclude_unset=True),
-            }
+            values = {"profile_id": encode_profile_id(id)}
+            # Null means "leave as is", as the COALESCE update used to
+            updates = profile_update.model_dump(exclude_unset=True, exclude_none=True)
+
+            current = await self.db.fetch_one(query=GET_PROFILE_BY_ID_QUERY, values=values)
+            if not current:
+                raise NotFoundError(entity_name="Profile", entity_identifier=str(id))
+            if not changed_fields(current, updates):
+                return ProfileInDb(**decode_row(current))
+
+            async def update():
+                # Re-check inside the writer, the row may have moved on since
+                latest = await self.db.fetch_one(query=GET_PROFILE_BY_ID_QUERY, values=values)
+                if not latest:
+                    return None
+                changes = changed_fields(latest, updates)
+                if not changes:
+                    return latest
+                query = build_update_query("profiles", "profile_id", changes)
+                async with self.db.transaction():
+                    before = await self.stats_repo.get_entry(user_id=latest["user_id"])
+                    updated = await self.db.fetch_one(query=query.bindparams(**values, **changes))
+                    after = await self.stats_repo.get_entry(user_id=latest["user_id"])
+                    await self.stats_repo.apply(before=before, after=after)
+                    await self._record_change("profiles", latest["user_id"], "update")
+                return updated
 
-            updated = await self.db.fetch_one(query=UPDATE_PROFILE_QUERY, values=values)
+            updated = await self._write(update)
 
             if not updated:
                 raise NotFoundError(entity_name="Profile", entity_identifier=str(id))
 
             audit_logger.info(f"Profile with ID: {id} updated successfully")
-            return ProfileInDb(**dict(updated))
+            return ProfileInDb(**decode_row(updated))
 
         except ValidationError as e:
             audit_logger.error(f"Validation error updating profile: {e}")
@@ -163,19 +312,52 @@ class ProfileRepository(BaseRepository):
     async def delete_profile(self, *, id: uuid.UUID) -> ProfileInDb:
         """Soft delete a profile."""
         try:
-            deleted = await self.db.fetch_one(query=DELETE_PROFILE_QUERY, values={"profile_id": str(id)})
+            async def delete():
+                async with self.db.transaction():
+                    current = await self.db.fetch_one(query=GET_PROFILE_BY_ID_QUERY, values={"profile_id": encode_profile_id(id)})
+                    if not current:
+                        return None
+                    before = await self.stats_repo.get_entry(user_id=current["user_id"])
+                    deleted = await self.db.fetch_one(query=DELETE_PROFILE_QUERY, values={"profile_id": encode_profile_id(id)})
+                    await self.stats_repo.apply(before=before, after=None)
+                    await self._record_change("profiles", current["user_id"], "delete")
+                    return deleted
+
+            deleted = await self._write(delete)
 
             if not deleted:
                 raise NotFoundError(entity_name="Profile", entity_identifier=str(id))
 
             audit_logger.info(f"Profile with ID: {id} deleted successfully")
-            return ProfileInDb(**dict(deleted))
+            return ProfileInDb(**decode_row(deleted))
 
         except Exception as e:
             audit_logger.error(f"Error deleting profile {id}: {e}")
             raise
 
-    async def get_profiles(self) -> List[ProfileInDb]:
-        """Get all active profiles."""
-        profiles = await self.db.fetch_all(query=GET_PROFILES_QUERY)
-        return [ProfileInDb(**dict(profile)) for profile in profiles]
+    async def get_profiles(
+        self, *, page: Optional[int] = None, fields: Optional[tuple[str, ...]] = None
+    ) -> List[ProfileInDb]:
+        """Get all active profiles, or one page of them ordered by creation.
+
+        With fields, only those columns are read and projections are returned.
+        """
+
+        async def load() -> List[ProfileInDb]:
+            if fields is not None:
+                suffix, values = "", {}
+                if page is not None:
+                    suffix = "ORDER BY created_at, profile_id\nLIMIT :limit OFFSET :offset"
+                    values = {"limit": ROSTER_PAGE_SIZE, "offset": (page - 1) * ROSTER_PAGE_SIZE}
+                rows = await self._select_fields(fields, "TRUE", values, suffix=suffix)
+                return [profile for _, profile in rows]
+            if page is None:
+                profiles = await self.db.fetch_all(query=GET_PROFILES_QUERY)
+            else:
+                profiles = await self.db.fetch_all(
+                    query=GET_PROFILES_PAGE_QUERY,
+                    values={"limit": ROSTER_PAGE_SIZE, "offset": (page - 1) * ROSTER_PAGE_SIZE},
+                )
+            return [ProfileInDb(**decode_row(profile)) for profile in profiles]
+
+        return await self._cached(("profiles", None, page, fields), ("profiles",), load)
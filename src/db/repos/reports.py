@@ -0,0 +1,19 @@
+"""Report repository."""
+
+from datetime import date
+
+from src.db.repos.base import BaseRepository
+from src.models.reports import DemographicReport
+from src.services.reports import ReportEngine
+
+
+class ReportRepository(BaseRepository):
+
+    async def get_demographics(self, engine: ReportEngine, as_of: date) -> DemographicReport:
+        """Demographic report, recomputed only after users or profiles change."""
+        key = ("demographics", as_of)
+        return await self._cached(
+            key,
+            ("users", "profiles"),
+            lambda: self._shared(key, lambda: engine.demographics(as_of)),
+        )
@@ -0,0 +1,60 @@
+"""Roster repository: filtering users with their profiles by role, gender and marital status."""
+
+from src.db.codec import decode_row
+from src.db.repos.base import BaseRepository
+from src.db.snapshot import GET_ROSTER_QUERY, SORT_KEYS, fold_search, get_roster_snapshot
+from src.models.roster import RosterEntry, RosterFilter, RosterPage
+
+# Snapshot column -> SQL column
+SORT_COLUMNS = {
+    "user_id": "u.user_id",
+    "first_name": "p.first_name",
+    "last_name": "p.last_name",
+}
+
+# The search is a literal fragment, its LIKE wildcards are escaped with a backslash
+SEARCH_CONDITION = (
+    "(LOWER(p.first_name) LIKE :search ESCAPE '\\' OR LOWER(p.last_name) LIKE :search ESCAPE '\\'"
+    " OR LOWER(p.email) LIKE :search ESCAPE '\\')"
+)
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class RosterRepository(BaseRepository):
+
+    async def filter_roster(self, roster_filter: RosterFilter) -> RosterPage:
+        """Filter, sort and count the roster, from the in-memory snapshot when one is attached."""
+        snapshot = get_roster_snapshot(self.db)
+        if snapshot is not None:
+            page = await snapshot.query(roster_filter)
+            if page is not None:
+                return page
+        return await self._query_roster(roster_filter)
+
+    async def _query_roster(self, roster_filter: RosterFilter) -> RosterPage:
+        conditions, values = [], {}
+        for column, alias in (("role", "u"), ("gender", "p"), ("marital_status", "p")):
+            value = getattr(roster_filter, column)
+            if value is not None:
+                conditions.append(f"{alias}.{column} = :{column}")
+                values[column] = value
+        if roster_filter.search:
+            conditions.append(SEARCH_CONDITION)
+            # Folded like the snapshot, so both paths match the same rows
+            values["search"] = f"%{_escape_like(fold_search(roster_filter.search))}%"
+        query = GET_ROSTER_QUERY + "".join(f" AND {condition}" for condition in conditions)
+
+        count = await self.db.fetch_one(query=f"SELECT COUNT(*) AS total FROM ({query})", values=values)
+        if roster_filter.limit == 0:
+            return RosterPage(total=count["total"], items=[])
+
+        direction = "DESC" if roster_filter.descending else "ASC"
+        order_by = ", ".join(f"{SORT_COLUMNS[name]} {direction}" for name in SORT_KEYS[roster_filter.sort])
+        rows = await self.db.fetch_all(
+            query=f"{query} ORDER BY {order_by} LIMIT :limit OFFSET :offset",
+            values={**values, "limit": roster_filter.limit, "offset": roster_filter.offset},
+        )
+        return RosterPage(total=count["total"], items=[RosterEntry(**decode_row(row)) for row in rows])
@@ -0,0 +1,113 @@
+"""Roster statistics repository.
+
+The roster_stats table holds a count per (role, gender, marital status) of
+active users with an active profile. Write paths read a user's roster entry
+before and after their change and apply the difference, inside the same
+transaction as the change itself.
+"""
+
+import logging
+from typing import Optional
+
+from src.db.repos.base import BaseRepository
+from src.models.stats import RoleStats, RosterStats
+
+# SQL Queries
+GET_ROSTER_ENTRY_QUERY = """
+SELECT u.role, p.gender, COALESCE(p.marital_status, '') AS marital_status
+FROM users u
+JOIN profiles p ON p.user_id = u.user_id
+WHERE u.user_id = :user_id AND u.is_deleted = FALSE AND p.is_deleted = FALSE
+"""
+
+ADJUST_ROSTER_STATS_QUERY = """
+INSERT INTO roster_stats (role, gender, marital_status, count)
+VALUES (:role, :gender, :marital_status, :delta)
+ON CONFLICT (role, gender, marital_status) DO UPDATE SET
+    count = count + excluded.count
+"""
+
+GET_ROSTER_STATS_QUERY = """
+SELECT role, gender, marital_status, count FROM roster_stats
+WHERE count != 0
+"""
+
+CLEAR_ROSTER_STATS_QUERY = """
+DELETE FROM roster_stats
+"""
+
+REBUILD_ROSTER_STATS_QUERY = """
+INSERT INTO roster_stats (role, gender, marital_status, count)
+SELECT u.role, p.gender, COALESCE(p.marital_status, ''), COUNT(*)
+FROM users u
+JOIN profiles p ON p.user_id = u.user_id
+WHERE u.is_deleted = FALSE AND p.is_deleted = FALSE
+GROUP BY u.role, p.gender, COALESCE(p.marital_status, '')
+"""
+
+RosterEntry = tuple[str, str, str]
+
+audit_logger = logging.getLogger("audit")
+
+
+class RosterStatsRepository(BaseRepository):
+    """Repository for the incrementally maintained roster statistics."""
+
+    async def get_entry(self, *, user_id: str) -> Optional[RosterEntry]:
+        """Return the (role, gender, marital status) a user is counted under, if any."""
+        row = await self.db.fetch_one(query=GET_ROSTER_ENTRY_QUERY, values={"user_id": user_id})
+        if not row:
+            return None
+        return row["role"], row["gender"], row["marital_status"]
+
+    async def apply(self, *, before: Optional[RosterEntry], after: Optional[RosterEntry]) -> None:
+        """Move a user's count from their old roster entry to their new one.
+
+        Must run in the transaction that made the change.
+        """
+        if before == after:
+            return
+        if before is not None:
+            await self._adjust(before, -1)
+        if after is not None:
+            await self._adjust(after, 1)
+
+    async def _adjust(self, entry: RosterEntry, delta: int) -> None:
+        role, gender, marital_status = entry
+        await self.db.execute(
+            query=ADJUST_ROSTER_STATS_QUERY,
+            values={"role": role, "gender": gender, "marital_status": marital_status, "delta": delta},
+        )
+
+    async def get_stats(self) -> RosterStats:
+        """Read the roster statistics, one small row per combination."""
+        rows = await self.db.fetch_all(query=GET_ROSTER_STATS_QUERY)
+        return self._summarize(rows)
+
+    async def rebuild(self) -> RosterStats:
+        """Recompute the statistics from the users and profiles tables."""
+
+        async def rebuild():
+            async with self.db.transaction():
+                previous = await self.db.fetch_all(query=GET_ROSTER_STATS_QUERY)
+                await self.db.execute(query=CLEAR_ROSTER_STATS_QUERY)
+                await self.db.execute(query=REBUILD_ROSTER_STATS_QUERY)
+                current = await self.db.fetch_all(query=GET_ROSTER_STATS_QUERY)
+                return previous, current
+
+        previous, current = await self._write(rebuild)
+        if self._summarize(previous) != self._summarize(current):
+            audit_logger.warning("Roster statistics had drifted and were rebuilt")
+        audit_logger.info("Roster statistics rebuilt")
+        return self._summarize(current)
+
+    @staticmethod
+    def _summarize(rows) -> RosterStats:
+        roles: dict[str, RoleStats] = {}
+        for row in rows:
+            stats = roles.setdefault(row["role"], RoleStats())
+            marital_status = row["marital_status"] or "unknown"
+            stats.total += row["count"]
+            stats.by_gender[row["gender"]] = stats.by_gender.get(row["gender"], 0) + row["count"]
+            stats.by_marital_status[marital_status] = stats.by_marital_status.get(marital_status, 0) + row["count"]
+        return RosterStats(roles=roles)
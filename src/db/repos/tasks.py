@@ -5,7 +5,22 @@ import logging
 from databases import Database
 from fastapi import FastAPI
 
-from src.core.config import DATABASE_URL
+from src.core.config import (
+    DATABASE_URL,
+    RESULT_CACHE_ENABLED,
+    RESULT_CACHE_MAX_ENTRIES,
+    ROSTER_SNAPSHOT_ENABLED,
+    ROSTER_SNAPSHOT_MAX_AGE_MS,
+    ROSTER_SNAPSHOT_MAX_DELTA,
+    SINGLE_FLIGHT_ENABLED,
+    WRITE_COORDINATOR_ENABLED,
+    WRITE_COORDINATOR_MAX_BATCH,
+    WRITE_COORDINATOR_WINDOW_MS,
+)
+from src.db.cache import ResultCache, attach_result_cache, detach_result_cache
+from src.db.single_flight import SingleFlight, attach_single_flight, detach_single_flight
+from src.db.snapshot import RosterSnapshot, attach_roster_snapshot, detach_roster_snapshot
+from src.db.writer import WriteCoordinator, attach_write_coordinator, detach_write_coordinator
 
 app_logger = logging.getLogger("app")
 
@@ -14,8 +29,40 @@ async def connect_database(app: FastAPI) -> None:
     try:
         database = Database(DATABASE_URL)
         await database.connect()
+        # WAL lets readers proceed while the single writer commits
+        await database.execute("PRAGMA journal_mode=WAL")
         app.state._db = database
         app_logger.info("Connected to db.")
+
+        if WRITE_COORDINATOR_ENABLED:
+            writer = WriteCoordinator(
+                database,
+                window=WRITE_COORDINATOR_WINDOW_MS / 1000,
+                max_batch=WRITE_COORDINATOR_MAX_BATCH,
+            )
+            await writer.start()
+            attach_write_coordinator(database, writer)
+            app.state.writer = writer
+
+        if RESULT_CACHE_ENABLED:
+            cache = ResultCache(max_entries=RESULT_CACHE_MAX_ENTRIES)
+            attach_result_cache(database, cache)
+            app.state.result_cache = cache
+
+        if SINGLE_FLIGHT_ENABLED:
+            flights = SingleFlight()
+            attach_single_flight(database, flights)
+            app.state.single_flight = flights
+
+        if ROSTER_SNAPSHOT_ENABLED:
+            # Loaded by the first roster query
+            snapshot = RosterSnapshot(
+                database,
+                max_age=ROSTER_SNAPSHOT_MAX_AGE_MS / 1000,
+                max_delta=ROSTER_SNAPSHOT_MAX_DELTA,
+            )
+            attach_roster_snapshot(database, snapshot)
+            app.state.roster_snapshot = snapshot
     except Exception as e:
         app_logger.exception(
             "Failed to connect to db",
@@ -24,9 +71,16 @@ async def connect_database(app: FastAPI) -> None:
 
 async def disconnect_database(app: FastAPI) -> None:
     try:
+        writer = getattr(app.state, "writer", None)
+        if writer is not None:
+            await writer.stop()
+            detach_write_coordinator(app.state._db)
+        detach_result_cache(app.state._db)
+        detach_single_flight(app.state._db)
+        detach_roster_snapshot(app.state._db)
         await app.state._db.disconnect()
         app_logger.info("Disconnected from db")
     except Exception as e:
         app_logger.exception(
             "Error disconnecting from db",
-        )
\ No newline at end of file
+        )
@@ -1,24 +1,37 @@
 """User repository for database operations."""
 
 import logging
-from typing import List
+from typing import List, Optional
 
 from databases import Database
 from pydantic import ValidationError
 
 from src.utils.helpers import Helpers
 from src.models.token import AccessToken
+from src.db.codec import decode_row
 from src.db.repos.base import BaseRepository
+from src.db.repos.stats import RosterStatsRepository
+from src.db.update_builder import build_update_query, changed_fields
 from src.errors.database import IncorrectCredentialsError, NotFoundError
 from src.models.user import UserCreate, UserInDb, UserLogin, UserUpdate
 from src.services.auth import AuthService
 
 # SQL Queries
+# User IDs are seven digits. The insert allocates the next one itself, after
+# the highest ever used, archived users included, so it stays unique across
+# workers and is never reused.
+FIRST_USER_ID = 1000005
+LAST_USER_ID = 9999999
+
 CREATE_USER_QUERY = """
 INSERT INTO users (
     user_id, role, pin_hash
 )
-VALUES (:user_id, :role, :pin_hash)
+SELECT MAX(
+    :first_user_id - 1,
+    COALESCE((SELECT MAX(user_id) FROM users), 0),
+    COALESCE((SELECT MAX(user_id) FROM users_archive), 0)
+) + 1, :role, :pin_hash
 RETURNING *
 """
 
@@ -32,12 +45,25 @@ SELECT * FROM users
 WHERE user_id = :user_id AND is_deleted = FALSE
 """
 
-UPDATE_USER_QUERY = """
-UPDATE users
-SET role = COALESCE(:role, role),
-    updated_at = CURRENT_TIMESTAMP
+# Completed with the IN list for each batch
+GET_USERS_BY_IDS_QUERY = """
+SELECT * FROM users
+WHERE user_id IN {user_ids} AND is_deleted = FALSE
+"""
+
+# SQLite's default limit on bound variables is 999
+MAX_BATCH_SIZE = 500
+
+GET_USER_FOR_UPDATE_QUERY = """
+SELECT * FROM users
 WHERE user_id = :user_id
-RETURNING *
+"""
+
+# Leaves updated_at alone, re-encoding the PIN is not a change to the user
+UPDATE_USER_PIN_HASH_QUERY = """
+UPDATE users
+SET pin_hash = :pin_hash
+WHERE user_id = :user_id AND pin_hash = :old_pin_hash
 """
 
 DELETE_USER_QUERY = """
@@ -57,39 +83,58 @@ class UserRepository(BaseRepository):
     def __init__(self, db: Database) -> None:
         """Initialize the repository with database connection."""
         super().__init__(db)
+        self.stats_repo = RosterStatsRepository(db)
 
     async def create_user(self, *, new_user: UserCreate) -> tuple[UserInDb, str]:
         """Create a new user in the database."""
-        try:
-            # Generate sequential user ID
-            user_id = Helpers.generate_sequential_id()
-            
-            # Generate PIN if not provided or if "string" is passed (treat as no PIN)
-            if new_user.pin is None or new_user.pin == "string":
-                pin = Helpers.generate_pin()
-                print(f"Generated new PIN: {pin}")  # Debug log
-            else:
-                pin = new_user.pin
-                print(f"Using provided PIN: {pin}")  # Debug log
-            
-            # Hash the plain PIN
-            pin_hash = await AuthService().get_pin_hash(pin)
+        values, pin = await self.prepare_new_user(new_user=new_user)
+        user = await self.insert_user(values=values)
+        return user, pin
+
+    async def prepare_new_user(self, *, new_user: UserCreate) -> tuple[dict, str]:
+        """Generate the PIN for a new user and hash it.
+
+        Kept separate from the insert so the slow hash never runs inside the
+        single writer. The user ID is allocated by the insert.
+        """
+        # Generate PIN if not provided or if "string" is passed (treat as no PIN)
+        if new_user.pin is None or new_user.pin == "string":
+            pin = Helpers.generate_pin()
+            audit_logger.info("Generated a PIN for the new user")
+        else:
+            pin = new_user.pin
+            audit_logger.info("Using the PIN provided for the new user")
+
+        # Hash the plain PIN
+        pin_hash = await AuthService().get_pin_hash(pin)
+
+        values = {
+            "role": new_user.role,
+            "pin_hash": pin_hash
+        }
+        return values, pin
 
-            values = {
-                "user_id": user_id,
-                "role": new_user.role,
-                "pin_hash": pin_hash
-            }
+    async def insert_user(self, *, values: dict) -> UserInDb:
+        """Insert a user prepared by prepare_new_user, allocating the next user ID."""
+        try:
+            async def insert():
+                async with self.db.transaction():
+                    created = await self.db.fetch_one(
+                        query=CREATE_USER_QUERY, values={**values, "first_user_id": FIRST_USER_ID}
+                    )
+                    if created["user_id"] > LAST_USER_ID:
+                        raise ValueError("No more IDs available")
+                    await self._record_change("users", created["user_id"], "create")
+                    return created
 
-            created_user = await self.db.fetch_one(query=CREATE_USER_QUERY, values=values)
+            created_user = await self._write(insert)
             if not created_user:
                 audit_logger.error("Failed to create user in database.")
                 raise Exception("Failed to create user in database.")
-            
-            audit_logger.info(f"User created successfully, ID: {user_id}")
-            print(f"Returning PIN from create_user: {pin}")  # Debug log
-            return UserInDb(**dict(created_user)), pin
-            
+
+            audit_logger.info(f"User created successfully, ID: {created_user['user_id']}")
+            return UserInDb(**decode_row(created_user))
+
         except ValidationError as e:
             audit_logger.error(f"Validation error creating user: {e}")
             raise
@@ -98,39 +143,96 @@ class UserRepository(BaseRepository):
             raise
 
     async def get_user_by_id(self, *, user_id: str) -> UserInDb:
-        """Get a user by their ID."""
-        user = await self.db.fetch_one(query=GET_USER_BY_ID_QUERY, values={"user_id": user_id})
-        if not user:
+        """Get a user by their ID, batched and memoized within a request."""
+        loader = self._loader("users_by_id", self.get_users_by_ids)
+        if loader is not None:
+            user = await loader.load(str(user_id))
+        else:
+            user = await self._fetch_user_by_id(str(user_id))
+        if user is None:
             raise NotFoundError(entity_name="User", entity_identifier=user_id)
+        return user
+
+    async def _fetch_user_by_id(self, user_id: str) -> Optional[UserInDb]:
+        async def load() -> Optional[UserInDb]:
+            user = await self.db.fetch_one(query=GET_USER_BY_ID_QUERY, values={"user_id": user_id})
+            return self._hydrate(user) if user else None
+
+        return await self._shared((GET_USER_BY_ID_QUERY, user_id), load)
+
+    async def get_users_by_ids(self, user_ids: List[str]) -> dict[str, UserInDb]:
+        """Get several active users, keyed by user ID."""
+        if len(user_ids) == 1:
+            # A lone lookup can still share a query with other requests
+            user = await self._fetch_user_by_id(user_ids[0])
+            return {user_ids[0]: user} if user else {}
+
+        users = {}
+        for start in range(0, len(user_ids), MAX_BATCH_SIZE):
+            in_list, values = self._in_clause("user_id", user_ids[start:start + MAX_BATCH_SIZE])
+            rows = await self.db.fetch_all(query=GET_USERS_BY_IDS_QUERY.format(user_ids=in_list), values=values)
+            for row in rows:
+                user = self._hydrate(row)
+                if user is not None:
+                    users[user.user_id] = user
+        return users
+
+    @staticmethod
+    def _hydrate(row) -> Optional[UserInDb]:
         try:
-            return UserInDb(**dict(user))
+            return UserInDb(**decode_row(row))
         except ValidationError as e:
-            audit_logger.error(f"User with ID {user_id} has invalid data: {e}")
-            raise NotFoundError(entity_name="User", entity_identifier=user_id)
+            # Treated as missing, as a lookup by ID always has
+            audit_logger.error(f"User with ID {row['user_id']} has invalid data: {e}")
+            return None
 
 
 
     async def update_user(self, *, user_id: str, user_update: UserUpdate) -> UserInDb:
-        """Update an existing user's information."""
-        values = {
-            "user_id": user_id,
-            "role": user_update.role
-        }
-        updated_user = await self.db.fetch_one(query=UPDATE_USER_QUERY, values=values)
+        """Update an existing user's information, skipping the write when nothing changes."""
+        values = {"user_id": user_id}
+        updates = user_update.model_dump(exclude_none=True)
+
+        async def update():
+            current = await self.db.fetch_one(query=GET_USER_FOR_UPDATE_QUERY, values=values)
+            if not current:
+                return None
+            changes = changed_fields(current, updates)
+            if not changes:
+                return current
+            query = build_update_query("users", "user_id", changes, active_only=False)
+            async with self.db.transaction():
+                before = await self.stats_repo.get_entry(user_id=user_id)
+                updated = await self.db.fetch_one(query=query.bindparams(**values, **changes))
+                after = await self.stats_repo.get_entry(user_id=user_id)
+                await self.stats_repo.apply(before=before, after=after)
+                await self._record_change("users", user_id, "update")
+            return updated
+
+        updated_user = await self._write(update)
         if not updated_user:
             raise NotFoundError(entity_name="User", entity_identifier=user_id)
         
         audit_logger.info(f"User with ID: {user_id} updated successfully")
-        return UserInDb(**dict(updated_user))
+        return UserInDb(**decode_row(updated_user))
 
     async def delete_user(self, *, user_id: str) -> UserInDb:
         """Soft delete a user."""
-        deleted_user = await self.db.fetch_one(query=DELETE_USER_QUERY, values={"user_id": user_id})
+        async def delete():
+            async with self.db.transaction():
+                before = await self.stats_repo.get_entry(user_id=user_id)
+                deleted = await self.db.fetch_one(query=DELETE_USER_QUERY, values={"user_id": user_id})
+                if deleted:
+                    await self.stats_repo.apply(before=before, after=None)
+                    await self._record_change("users", user_id, "delete")
+                return deleted
+
+        deleted_user = await self._write(delete)
         if not deleted_user:
             raise NotFoundError(entity_name="User", entity_identifier=user_id)
         
         audit_logger.info(f"User with ID: {user_id} deleted successfully")
-        return UserInDb(**dict(deleted_user))
+        return UserInDb(**decode_row(deleted_user))
 
     async def login(self, login_data: UserLogin) -> AccessToken:
         """Authenticate user and return access token."""
@@ -145,6 +247,9 @@ class UserRepository(BaseRepository):
             if not user or not await AuthService().verify_pin(plain_pin, user.pin_hash):
                 raise IncorrectCredentialsError()
 
+            if AuthService.pin_needs_rehash(user.pin_hash):
+                await self._rehash_pin(user=user, plain_pin=plain_pin)
+
             # Create access token with user_id and role
             access_token = AuthService().create_access_token(
                 data={
@@ -166,8 +271,28 @@ class UserRepository(BaseRepository):
             audit_logger.error(f"Login error for user ID: {login_data.user_id} - {e}")
             raise
 
-    async def get_users_by_role(self, *, role: str, search: str = None) -> List[UserInDb]:
-        """Get users by role, with optional search on profile fields."""
+    async def _rehash_pin(self, *, user: UserInDb, plain_pin: str) -> None:
+        """Re-hash a verified PIN under the current hashing policy."""
+        try:
+            pin_hash = await AuthService().get_pin_hash(plain_pin)
+            async def rehash():
+                async with self.db.transaction():
+                    await self.db.execute(
+                        query=UPDATE_USER_PIN_HASH_QUERY,
+                        values={"user_id": user.user_id, "pin_hash": pin_hash, "old_pin_hash": user.pin_hash},
+                    )
+                    await self._bump_generation("users")
+
+            await self._write(rehash)
+            audit_logger.info(f"Re-hashed PIN for user ID: {user.user_id}")
+        except Exception as e:
+            # The login already succeeded, the upgrade is retried next time
+            audit_logger.error(f"Failed to re-hash PIN for user ID: {user.user_id} - {e}")
+
+    async def get_users_by_role(
+        self, *, role: str, search: str = None, limit: Optional[int] = None, offset: int = 0
+    ) -> List[UserInDb]:
+        """Get users by role, with optional search on profile fields and paging."""
         query = '''
         SELECT u.* FROM users u
         JOIN profiles p ON u.user_id = p.user_id
@@ -177,5 +302,8 @@ class UserRepository(BaseRepository):
         if search:
             query += " AND (LOWER(p.first_name) LIKE :search OR LOWER(p.last_name) LIKE :search OR LOWER(p.email) LIKE :search)"
             values["search"] = f"%{search.lower()}%"
+        if limit is not None:
+            query += " ORDER BY u.user_id LIMIT :limit OFFSET :offset"
+            values.update(limit=limit, offset=offset)
         users = await self.db.fetch_all(query=query, values=values)
-        return [UserInDb(**dict(user)) for user in users]
+        return [UserInDb(**decode_row(user)) for user in users]
@@ -1,8 +1,11 @@
 """User Profile repository for combined user and profile operations."""
 
 import logging
+from typing import Optional
+
 from databases import Database
 
+from src.core.config import ROSTER_PAGE_SIZE
 from src.models.profiles import ProfileCreate
 from src.models.user import UserCreate
 from src.models.user_profile import UserProfileInDb
@@ -30,32 +33,60 @@ class UserProfileRepository(BaseRepository):
         new_profile: ProfileCreate,
     ) -> tuple[UserProfileInDb, str]:
         """Create a new user and profile in a single transaction."""
-        async with self.db.transaction():
-            # Create user first
-            user, generated_pin = await self.user_repo.create_user(new_user=new_user)
-            audit_logger.info(f"Created user: {user.user_id}")
-            print(f"Received PIN from user creation: {generated_pin}")  # Debug log
-
-            # Create profile with user_id
-            profile_data = new_profile.model_copy(
-                update={"user_id": user.user_id}
+        # Hash the PIN before queueing, only the inserts run in the writer
+        user_values, generated_pin = await self.user_repo.prepare_new_user(new_user=new_user)
+
+        async def create() -> UserProfileInDb:
+            async with self.db.transaction():
+                # Create user first
+                user = await self.user_repo.insert_user(values=user_values)
+                audit_logger.info(f"Created user: {user.user_id}")
+
+                # Create profile with user_id
+                profile_data = new_profile.model_copy(
+                    update={"user_id": user.user_id}
+                )
+
+                profile = await self.profile_repo.create_profile(new_profile=profile_data)
+                audit_logger.info(f"Created profile: {profile.profile_id}")
+                return UserProfileInDb(user=user, profile=profile)
+
+        user_profile = await self._write(create)
+        return user_profile, generated_pin
+
+    async def get_user_profiles_by_role(
+        self,
+        *,
+        role: str,
+        search: str = None,
+        page: Optional[int] = None,
+        fields: Optional[tuple[str, ...]] = None,
+    ) -> list[UserProfileInDb]:
+        """Get user profiles by role, with optional search on profile fields.
+
+        With fields, only those profile columns are read and the entries are
+        (user, profile projection) pairs instead. Results are cached until the
+        next write to users or profiles.
+        """
+
+        async def load() -> list[UserProfileInDb]:
+            paging = {}
+            if page is not None:
+                paging = {"limit": ROSTER_PAGE_SIZE, "offset": (page - 1) * ROSTER_PAGE_SIZE}
+            users = await self.user_repo.get_users_by_role(role=role, search=search, **paging)
+            if not users:
+                return []
+            profiles = await self.profile_repo.get_profiles_by_user_ids(
+                [user.user_id for user in users], fields=fields
             )
+            if fields is not None:
+                return [(user, profiles[user.user_id]) for user in users if user.user_id in profiles]
+            return [
+                UserProfileInDb(user=user, profile=profiles[user.user_id])
+                for user in users
+                if user.user_id in profiles
+            ]
 
-            profile = await self.profile_repo.create_profile(new_profile=profile_data)
-            audit_logger.info(f"Created profile: {profile.profile_id}")
-            print(f"Returning PIN from user_profile: {generated_pin}")  # Debug log
-            
-            return UserProfileInDb(user=user, profile=profile), generated_pin
-
-    async def get_user_profiles_by_role(self, *, role: str, search: str = None) -> list[UserProfileInDb]:
-        """Get user profiles by role, with optional search on profile fields."""
-        users = await self.user_repo.get_users_by_role(role=role, search=search)
-        profiles = []
-        for user in users:
-            try:
-                profile = await self.profile_repo.get_profile_by_user_id(user_id=user.user_id)
-                profiles.append(UserProfileInDb(user=user, profile=profile))
-            except Exception:
-                continue
-        return profiles
+        search_key = search.lower() if search else None
+        return await self._cached((role, search_key, page, fields), ("users", "profiles"), load)
 
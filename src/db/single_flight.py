@@ -0,0 +1,81 @@
+"""Single-flight coalescing of identical concurrent reads.
+
+The first caller of a key runs the read; callers arriving while it is in
+flight wait for and share its result (or exception). A read is only joined if
+no write has completed in this process since it started, so a client never
+reads back data older than its own last write.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Optional
+from weakref import WeakKeyDictionary
+
+from databases import Database
+
+_flights: "WeakKeyDictionary[Database, SingleFlight]" = WeakKeyDictionary()
+
+
+def _consume(future: asyncio.Future) -> None:
+    # Nobody may have joined, retrieve the exception so asyncio does not warn
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight:
+    """Shares in-flight reads between concurrent callers."""
+
+    def __init__(self) -> None:
+        self.leaders = 0
+        self.coalesced = 0
+        self.epoch = 0
+        self._in_flight: dict[Hashable, tuple[int, asyncio.Future]] = {}
+
+    def note_write(self) -> None:
+        """Stop later callers joining reads that started before a write."""
+        self.epoch += 1
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._in_flight.get(key)
+        if flight is not None and flight[0] == self.epoch:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(flight[1])
+            except asyncio.CancelledError:
+                if not flight[1].cancelled():
+                    raise
+                # The leader was cancelled rather than us, read it ourselves
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume)
+        flight = (self.epoch, future)
+        self._in_flight[key] = flight
+        self.leaders += 1
+        try:
+            result = await load()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._in_flight.get(key) is flight:
+                del self._in_flight[key]
+
+    def snapshot(self) -> dict:
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._in_flight)}
+
+
+def attach_single_flight(db: Database, flights: SingleFlight) -> None:
+    _flights[db] = flights
+
+
+def detach_single_flight(db: Database) -> None:
+    _flights.pop(db, None)
+
+
+def get_single_flight(db: Database) -> Optional[SingleFlight]:
+    return _flights.get(db)
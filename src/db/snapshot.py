@@ -0,0 +1,298 @@
+"""In-memory columnar snapshot of the roster.
+
+Each worker keeps the active users joined with their profiles as NumPy
+columns: role, gender and marital status as small integer codes, names and
+emails as UTF-8 byte strings. Roster queries then filter, sort and count with
+vectorized operations instead of a database round trip.
+
+The snapshot follows the change_log table: a refresh re-reads only the users
+changed since its cursor. Writes made by this worker mark it stale so the next
+query sees them; writes made by other workers are picked up once the snapshot
+is older than max_age.
+"""
+
+import asyncio
+import logging
+import string
+import time
+from typing import Iterable, Optional
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from databases import Database
+
+from src.db.codec import decode_row
+from src.enums.gender import GenderEnum
+from src.enums.marital_status import MaritalStatusEnum
+from src.enums.users import UserRole
+from src.models.roster import RosterEntry, RosterFilter, RosterPage
+
+app_logger = logging.getLogger("app")
+
+_snapshots: "WeakKeyDictionary[Database, RosterSnapshot]" = WeakKeyDictionary()
+
+GET_ROSTER_QUERY = """
+SELECT u.user_id, u.role, p.first_name, p.last_name, p.email, p.gender, p.marital_status
+FROM users u
+JOIN profiles p ON p.user_id = u.user_id
+WHERE u.is_deleted = FALSE AND p.is_deleted = FALSE
+"""
+
+# Completed with the IN list of user IDs
+GET_ROSTER_ENTRIES_QUERY = GET_ROSTER_QUERY + " AND u.user_id IN {user_ids}"
+
+GET_CHANGED_USERS_QUERY = """
+SELECT DISTINCT user_id FROM change_log
+WHERE seq > :since AND seq <= :until
+"""
+
+GET_LATEST_SEQ_QUERY = """
+SELECT COALESCE(MAX(seq), 0) AS seq FROM change_log
+"""
+
+# SQLite's default limit on bound variables is 999
+MAX_BATCH_SIZE = 500
+
+# Code 0 is kept for a missing value
+ROLES = [None] + [role.value for role in UserRole]
+GENDERS = [None] + [gender.value for gender in GenderEnum]
+MARITAL_STATUSES = [None] + [status.value for status in MaritalStatusEnum]
+
+ROLE_CODES = {value: code for code, value in enumerate(ROLES)}
+GENDER_CODES = {value: code for code, value in enumerate(GENDERS)}
+MARITAL_STATUS_CODES = {value: code for code, value in enumerate(MARITAL_STATUSES)}
+
+# Column -> (code table, codes), for the dictionary-encoded columns
+CODED_COLUMNS = {
+    "role": (ROLES, ROLE_CODES),
+    "gender": (GENDERS, GENDER_CODES),
+    "marital_status": (MARITAL_STATUSES, MARITAL_STATUS_CODES),
+}
+TEXT_COLUMNS = ("user_id", "first_name", "last_name", "email")
+
+# Sort key -> columns, most significant first, matching the SQL ordering
+SORT_KEYS = {
+    "last_name": ("last_name", "first_name", "user_id"),
+    "first_name": ("first_name", "last_name", "user_id"),
+    "user_id": ("user_id",),
+}
+
+
+# SQLite's LOWER() and bytes.lower() only fold ASCII letters
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def fold_search(term: str) -> str:
+    """Lowercase the ASCII letters of a search term only, as both query paths fold the columns."""
+    return term.translate(_ASCII_LOWER)
+
+
+def _encode_text(value: Optional[str]) -> bytes:
+    return (value or "").encode("utf-8")
+
+
+class RosterSnapshot:
+    """Columnar copy of the roster with vectorized filtering."""
+
+    def __init__(self, db: Database, *, max_age: float, max_delta: int) -> None:
+        self.db = db
+        self.max_age = max_age
+        self.max_delta = max_delta
+        self.hits = 0
+        self.loads = 0
+        self.refreshes = 0
+        self.failures = 0
+        self._cursor: Optional[int] = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._lock = asyncio.Lock()
+        self._columns: dict[str, np.ndarray] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._positions: dict[str, int] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._cursor is not None
+
+    def mark_stale(self) -> None:
+        """Refresh before the next query, called after local writes."""
+        self._stale = True
+
+    async def query(self, roster_filter: RosterFilter) -> Optional[RosterPage]:
+        """Answer a roster query, or return None if the snapshot cannot be brought up to date."""
+        try:
+            await self._ensure_fresh()
+        except Exception:
+            self.failures += 1
+            app_logger.exception("Failed to refresh the roster snapshot")
+            return None
+        self.hits += 1
+        return self._query(roster_filter)
+
+    async def _ensure_fresh(self) -> None:
+        if not self._stale and time.monotonic() - self._checked_at < self.max_age:
+            return
+        async with self._lock:
+            if not self._stale and time.monotonic() - self._checked_at < self.max_age:
+                return
+            # Cleared first, a write landing during the refresh marks it again
+            self._stale = False
+            checked_at = time.monotonic()
+            try:
+                async with self.db.connection():
+                    row = await self.db.fetch_one(query=GET_LATEST_SEQ_QUERY)
+                    latest = row["seq"]
+                    if self._cursor is None or latest - self._cursor > self.max_delta:
+                        await self._load(latest)
+                    elif latest > self._cursor:
+                        await self._refresh(latest)
+            except BaseException:
+                self._stale = True
+                raise
+            self._checked_at = checked_at
+
+    async def _load(self, latest: int) -> None:
+        # Rows changed after latest was read are re-read by the next refresh
+        rows = [decode_row(row) for row in await self.db.fetch_all(query=GET_ROSTER_QUERY)]
+        self._columns = self._build_columns(rows)
+        self._alive = np.ones(len(rows), dtype=bool)
+        self._positions = {row["user_id"]: position for position, row in enumerate(rows)}
+        self._cursor = latest
+        self.loads += 1
+        app_logger.info(f"Loaded roster snapshot of {len(rows)} entries at change {latest}")
+
+    async def _refresh(self, latest: int) -> None:
+        rows = await self.db.fetch_all(
+            query=GET_CHANGED_USERS_QUERY, values={"since": self._cursor, "until": latest}
+        )
+        user_ids = [row["user_id"] for row in rows]
+        entries = {}
+        for start in range(0, len(user_ids), MAX_BATCH_SIZE):
+            params = {f"user_id_{i}": user_id for i, user_id in enumerate(user_ids[start:start + MAX_BATCH_SIZE])}
+            in_list = "(" + ", ".join(f":{param}" for param in params) + ")"
+            for row in await self.db.fetch_all(query=GET_ROSTER_ENTRIES_QUERY.format(user_ids=in_list), values=params):
+                row = decode_row(row)
+                entries[row["user_id"]] = row
+
+        # Everything is read, apply it without yielding to queries
+        appended = []
+        for user_id in user_ids:
+            position = self._positions.get(user_id)
+            row = entries.get(user_id)
+            if position is None:
+                if row is not None:
+                    appended.append(row)
+            elif row is None:
+                self._alive[position] = False
+            else:
+                self._update(position, row)
+                self._alive[position] = True
+        if appended:
+            self._append(appended)
+        if np.count_nonzero(~self._alive) > max(1024, len(self._alive) // 4):
+            self._compact()
+        self._cursor = latest
+        self.refreshes += 1
+
+    def _build_columns(self, rows: Iterable) -> dict[str, np.ndarray]:
+        rows = list(rows)
+        columns = {
+            name: np.array([codes[row[name]] for row in rows], dtype=np.uint8)
+            for name, (_, codes) in CODED_COLUMNS.items()
+        }
+        for name in TEXT_COLUMNS:
+            columns[name] = np.array([_encode_text(row[name]) for row in rows], dtype=bytes)
+        # Folded like SQLite's LOWER(), which only changes ASCII letters
+        for name in ("first_name", "last_name", "email"):
+            columns[f"{name}_folded"] = np.char.lower(columns[name]) if rows else columns[name]
+        return columns
+
+    def _update(self, position: int, row) -> None:
+        for name, (_, codes) in CODED_COLUMNS.items():
+            self._columns[name][position] = codes[row[name]]
+        for name in TEXT_COLUMNS:
+            value = _encode_text(row[name])
+            self._set_text(name, position, value)
+            if name != "user_id":
+                self._set_text(f"{name}_folded", position, value.lower())
+
+    def _set_text(self, name: str, position: int, value: bytes) -> None:
+        column = self._columns[name]
+        if len(value) > column.dtype.itemsize:
+            # Fixed width byte strings, widen the column rather than truncate
+            column = self._columns[name] = column.astype(f"S{len(value)}")
+        column[position] = value
+
+    def _append(self, rows: list) -> None:
+        start = len(self._alive)
+        added = self._build_columns(rows)
+        for name, column in added.items():
+            self._columns[name] = np.concatenate([self._columns[name], column]) if start else column
+        self._alive = np.concatenate([self._alive, np.ones(len(rows), dtype=bool)])
+        for offset, row in enumerate(rows):
+            self._positions[row["user_id"]] = start + offset
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self._alive)
+        self._columns = {name: column[keep] for name, column in self._columns.items()}
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._positions = {user_id.decode(): position for position, user_id in enumerate(self._columns["user_id"])}
+
+    def _query(self, roster_filter: RosterFilter) -> RosterPage:
+        columns = self._columns
+        mask = self._alive.copy()
+        for name, (_, codes) in CODED_COLUMNS.items():
+            value = getattr(roster_filter, name)
+            if value is not None:
+                mask &= columns[name] == codes[value]
+        matches = np.flatnonzero(mask)
+
+        if roster_filter.search and len(matches):
+            term = fold_search(roster_filter.search).encode("utf-8")
+            found = np.zeros(len(matches), dtype=bool)
+            for name in ("first_name_folded", "last_name_folded", "email_folded"):
+                found |= np.char.find(columns[name][matches], term) >= 0
+            matches = matches[found]
+
+        total = len(matches)
+        if roster_filter.limit == 0 or roster_filter.offset >= total:
+            return RosterPage(total=total, items=[])
+
+        # lexsort takes its most significant key last
+        keys = SORT_KEYS[roster_filter.sort]
+        order = np.lexsort(tuple(columns[name][matches] for name in reversed(keys)))
+        if roster_filter.descending:
+            order = order[::-1]
+        page = matches[order[roster_filter.offset:roster_filter.offset + roster_filter.limit]]
+        return RosterPage(total=total, items=[self._entry(position) for position in page])
+
+    def _entry(self, position: int) -> RosterEntry:
+        columns = self._columns
+        values = {name: columns[name][position].decode("utf-8") for name in TEXT_COLUMNS}
+        for name, (table, _) in CODED_COLUMNS.items():
+            values[name] = table[columns[name][position]]
+        return RosterEntry(**values)
+
+    def snapshot(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "entries": int(np.count_nonzero(self._alive)),
+            "bytes": sum(column.nbytes for column in self._columns.values()) + self._alive.nbytes,
+            "cursor": self._cursor,
+            "hits": self.hits,
+            "loads": self.loads,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+        }
+
+
+def attach_roster_snapshot(db: Database, snapshot: RosterSnapshot) -> None:
+    _snapshots[db] = snapshot
+
+
+def detach_roster_snapshot(db: Database) -> None:
+    _snapshots.pop(db, None)
+
+
+def get_roster_snapshot(db: Database) -> Optional[RosterSnapshot]:
+    return _snapshots.get(db)
@@ -0,0 +1,43 @@
+"""UPDATE statement builder that only writes changed columns."""
+
+from functools import lru_cache
+from typing import Any, Mapping
+
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+
+from src.errors.database import FailedToCreateUpdateQueryError
+
+
+def changed_fields(current: Mapping[str, Any], updates: Mapping[str, Any]) -> dict:
+    """Return the updates whose values differ from the stored row."""
+    return {field: value for field, value in updates.items() if current[field] != value}
+
+
+@lru_cache(maxsize=256)
+def _compile_update_query(table: str, key_column: str, fields: tuple[str, ...], active_only: bool) -> TextClause:
+    assignments = ",\n    ".join(f"{field} = :{field}" for field in fields)
+    where = f"{key_column} = :{key_column}"
+    if active_only:
+        where += " AND is_deleted = FALSE"
+    return text(
+        f"""
+UPDATE {table}
+SET
+    {assignments},
+    updated_at = CURRENT_TIMESTAMP
+WHERE {where}
+RETURNING *
+"""
+    )
+
+
+def build_update_query(table: str, key_column: str, fields: Mapping[str, Any], active_only: bool = True) -> TextClause:
+    """Build an UPDATE setting only the given fields, cached per field set.
+
+    Column names come from model fields, never from request data, so they are
+    safe to interpolate. Bind the values with `.bindparams()`.
+    """
+    if not fields:
+        raise FailedToCreateUpdateQueryError(entity_name=table)
+    return _compile_update_query(table, key_column, tuple(sorted(fields)), active_only)
@@ -0,0 +1,144 @@
+"""Single-writer queue with group commit.
+
+SQLite allows one writer at a time, so mutating repository operations are
+funnelled through one task that owns one connection. Operations that arrive
+within a short window are committed together in a single transaction, each
+inside its own savepoint so a failing operation only fails its own caller.
+"""
+
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional
+from weakref import WeakKeyDictionary
+
+from databases import Database
+
+app_logger = logging.getLogger("app")
+
+_in_writer: ContextVar[bool] = ContextVar("in_writer", default=False)
+_coordinators: "WeakKeyDictionary[Database, WriteCoordinator]" = WeakKeyDictionary()
+
+Operation = Callable[[], Awaitable[Any]]
+
+
+class WriteCoordinator:
+    """Serializes write operations onto one connection and group commits them."""
+
+    def __init__(self, db: Database, *, window: float, max_batch: int) -> None:
+        self.db = db
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.writes = 0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def in_writer() -> bool:
+        """True when called from inside an operation the writer is running."""
+        return _in_writer.get()
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="write-coordinator")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, operation: Operation) -> Any:
+        """Queue an operation and wait for the batch holding it to commit."""
+        if self._task is None or self._task.done():
+            raise RuntimeError("Write coordinator is not running.")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, future))
+        return await future
+
+    def snapshot(self) -> dict:
+        return {"batches": self.batches, "writes": self.writes, "queued": self._queue.qsize()}
+
+    async def _run(self) -> None:
+        _in_writer.set(True)
+        try:
+            await self._process()
+        finally:
+            # Fail anything still queued rather than leaving callers hanging
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is not None and not item[1].done():
+                    item[1].set_exception(RuntimeError("Write coordinator stopped."))
+
+    async def _process(self) -> None:
+        loop = asyncio.get_running_loop()
+        # Holding the connection pins it to this task for every operation
+        async with self.db.connection():
+            stopping = False
+            while not stopping:
+                item = await self._queue.get()
+                if item is None:
+                    break
+                batch = [item]
+                deadline = loop.time() + self.window
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            item = await asyncio.wait_for(self._queue.get(), remaining)
+                        except asyncio.TimeoutError:
+                            break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                await self._commit(batch)
+
+    async def _commit(self, batch: list) -> None:
+        outcomes = []
+        try:
+            async with self.db.transaction():
+                for operation, future in batch:
+                    if future.done():
+                        continue
+                    try:
+                        async with self.db.transaction():
+                            result = await operation()
+                    except Exception as e:
+                        outcomes.append((future, e, False))
+                    else:
+                        outcomes.append((future, result, True))
+        except Exception as e:
+            app_logger.exception("Group commit failed")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.writes += len(outcomes)
+        # Callers only see their results once the whole batch is durable
+        for future, value, ok in outcomes:
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+def attach_write_coordinator(db: Database, coordinator: WriteCoordinator) -> None:
+    _coordinators[db] = coordinator
+
+
+def detach_write_coordinator(db: Database) -> None:
+    _coordinators.pop(db, None)
+
+
+def get_write_coordinator(db: Database) -> Optional[WriteCoordinator]:
+    return _coordinators.get(db)
@@ -109,3 +109,12 @@ class DataTypeError(DatabaseError):
         if entity_name:
             message += f" for {entity_name.capitalize()}"
         super().__init__(message, status.HTTP_400_BAD_REQUEST)
+
+
+class CursorExpiredError(DatabaseError):
+    """Raised when a sync cursor is older than the change log keeps."""
+
+    def __init__(self, cursor: int) -> None:
+        """Initializes the error with the expired cursor."""
+        message = f"Cursor {cursor} is too old, resync from 0"
+        super().__init__(message, status.HTTP_410_GONE)
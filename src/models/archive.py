@@ -0,0 +1,61 @@
+"""Archive models."""
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import Field
+
+from src.enums.users import UserRole
+from src.models.base import CoreModel
+from src.models.profiles import ProfilePublic
+from src.models.user import UserPublic
+
+
+class ArchivedUser(CoreModel):
+    """Model for an archived user, without their PIN hash"""
+
+    user_id: str = Field(..., description="User ID")
+    role: UserRole = Field(..., description="User Role")
+    created_at: datetime = Field(..., description="When the user was created")
+    deleted_at: datetime = Field(..., description="When the user was deleted")
+    archived_at: datetime = Field(..., description="When the user was moved to the archive")
+
+
+class ArchivedProfile(CoreModel):
+    """Model for an archived profile"""
+
+    profile_id: str = Field(..., description="Profile ID")
+    user_id: str = Field(..., description="User ID")
+    first_name: str = Field(..., description="First name of the user")
+    last_name: str = Field(..., description="Last name of the user")
+    phone: str = Field(..., description="Phone number of the user")
+    email: str = Field(..., description="Email address of the user")
+    gender: str = Field(..., description="Gender of user")
+    date_of_birth: Optional[str] = Field(None, description="Date of birth in YYYY-MM-DD format")
+    photo: Optional[str] = Field(None, description="Photo path or URL")
+    marital_status: Optional[str] = Field(None, description="Marital status")
+    emergency_contact: Optional[str] = Field(None, description="Emergency contact")
+    created_at: datetime = Field(..., description="When the profile was created")
+    deleted_at: datetime = Field(..., description="When the profile was deleted")
+    archived_at: datetime = Field(..., description="When the profile was moved to the archive")
+
+
+class ArchivedUserProfiles(CoreModel):
+    """Model for what the archive holds for one user"""
+
+    user: Optional[ArchivedUser] = Field(None, description="The archived user, None if the user is not archived")
+    profiles: List[ArchivedProfile] = Field(..., description="Archived profiles of the user, newest first")
+
+
+class RestoredUser(CoreModel):
+    """Model for a user restored from the archive"""
+
+    user: UserPublic
+    profile: Optional[ProfilePublic] = Field(None, description="The restored profile, None if none was archived")
+
+
+class ArchiveRun(CoreModel):
+    """Model for the result of an archival run"""
+
+    users: int = Field(..., description="Users moved to the archive")
+    profiles: int = Field(..., description="Profiles moved to the archive")
@@ -0,0 +1,39 @@
+"""Batch request models."""
+
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import Field
+
+from src.models.base import CoreModel
+
+
+class BatchItem(CoreModel):
+    """One API call inside a batch"""
+
+    id: Optional[str] = Field(None, description="Echoed back on the matching response")
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = Field("GET", description="HTTP method")
+    path: str = Field(..., description="API path, with an optional query string")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Extra request headers")
+    body: Optional[Any] = Field(None, description="JSON request body")
+
+
+class BatchRequest(CoreModel):
+    """API calls to run together, concurrently"""
+
+    requests: List[BatchItem] = Field(..., min_length=1, description="Calls to run")
+
+
+class BatchItemResponse(CoreModel):
+    """Response to one call of a batch"""
+
+    id: Optional[str] = Field(None, description="ID of the call")
+    status: int = Field(..., description="HTTP status code")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Response headers worth passing on")
+    body: Optional[Any] = Field(None, description="Decoded JSON body, or text, or base64 for binary bodies")
+    encoding: Optional[Literal["base64"]] = Field(None, description="Set when body is base64")
+
+
+class BatchResponse(CoreModel):
+    """Responses in the order of the calls"""
+
+    responses: List[BatchItemResponse] = Field(..., description="One response per call")
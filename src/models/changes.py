@@ -0,0 +1,20 @@
+"""Roster change models."""
+
+from typing import List, Optional
+
+from pydantic import Field
+
+from src.models.base import CoreModel
+from src.models.user_profile import UserProfilePublic
+
+
+class RosterChanges(CoreModel):
+    """Model for a page of roster changes after a cursor"""
+
+    cursor: int = Field(..., description="Pass as since to fetch the following changes")
+    has_more: bool = Field(..., description="More changes are waiting after cursor")
+    scan: Optional[int] = Field(
+        None, description="Set while a full sync is catching up, pass back as scan with the cursor"
+    )
+    upserts: List[UserProfilePublic] = Field(..., description="Current state of changed roster entries")
+    tombstones: List[str] = Field(..., description="User IDs that are no longer on the roster")
@@ -0,0 +1,43 @@
+"""Sparse fieldsets: response models restricted to the fields a client asked for."""
+
+from functools import lru_cache
+from typing import Optional
+
+from pydantic import ConfigDict, create_model
+
+from src.models.base import CoreModel
+
+
+class ProjectionModel(CoreModel):
+    """Base of projections, columns selected only to key results are dropped"""
+
+    model_config = ConfigDict(extra="ignore")
+
+
+def parse_fields(model: type[CoreModel], fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    """Check a comma separated field list against a model, None meaning all fields."""
+    if fields is None:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    if not names:
+        raise ValueError("fields must name at least one field.")
+    unknown = [name for name in names if name not in model.model_fields]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}. Allowed fields: {', '.join(model.model_fields)}"
+        )
+    return names
+
+
+@lru_cache(maxsize=128)
+def projection_model(model: type[CoreModel], fields: tuple[str, ...]) -> type[CoreModel]:
+    """Build a model holding only the given fields of model, keeping their types.
+
+    Validators of the full model are not carried over, projections are only
+    used to serialize rows that were validated when written.
+    """
+    return create_model(
+        f"{model.__name__}Fields",
+        __base__=ProjectionModel,
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields},
+    )
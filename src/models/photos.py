@@ -0,0 +1,13 @@
+"""Photo models."""
+
+from pydantic import Field
+
+from src.models.base import CoreModel
+
+
+class PhotoPublic(CoreModel):
+    """Model for an uploaded photo in API responses"""
+
+    filename: str = Field(..., description="Content-addressed file name")
+    url: str = Field(..., description="URL of the original image")
+    thumbnails: dict[int, str] = Field(..., description="Thumbnail URLs keyed by bounding box size in pixels")
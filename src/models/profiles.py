@@ -1,8 +1,10 @@
 """Profile models."""
 
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
-from pydantic import Field, EmailStr, field_validator, ConfigDict
+from pydantic import Field, EmailStr, field_validator, model_validator, ConfigDict
+
+from src.core.config import PROFILE_BATCH_MAX_IDS
 
 from src.models.base import (
     CoreModel,
@@ -127,11 +129,12 @@ class ProfileUpdate(CoreModel):
     
     @field_validator("emergency_contact")
     @classmethod
-    def validate_emergency_contact(cls, value: str) -> str:
-        if not value.isdigit():
-            raise ValueError("Phone number must contain only digits.")
-        if not (7 <= len(value) <= 20):
-            raise ValueError("Phone number must be between 7 and 20 digits.")
+    def validate_emergency_contact(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None:
+            if not value.isdigit():
+                raise ValueError("Phone number must contain only digits.")
+            if not (7 <= len(value) <= 20):
+                raise ValueError("Phone number must be between 7 and 20 digits.")
         return value
 
 
@@ -148,3 +151,28 @@ class ProfilePublic(ProfileBase, UserIDModelMixin, TimestampMixin):
 class ProfileInDb(ProfilePublic, DeleteMixin):
     """Model for profile data as stored in database"""
     pass
+
+
+# Model for fetching many profiles at once
+class ProfileBatchRequest(CoreModel):
+    """Model for requesting profiles by user IDs or by profile IDs"""
+
+    user_ids: Optional[List[str]] = Field(
+        None, min_length=1, max_length=PROFILE_BATCH_MAX_IDS, description="User IDs to fetch"
+    )
+    profile_ids: Optional[List[UUID]] = Field(
+        None, min_length=1, max_length=PROFILE_BATCH_MAX_IDS, description="Profile IDs to fetch"
+    )
+
+    @model_validator(mode="after")
+    def validate_one_kind(self) -> "ProfileBatchRequest":
+        if (self.user_ids is None) == (self.profile_ids is None):
+            raise ValueError("Provide either user_ids or profile_ids.")
+        return self
+
+
+class ProfileBatchResponse(CoreModel):
+    """Model for a multi-get response, ids without an active profile are listed in missing"""
+
+    profiles: List[ProfilePublic] = Field(..., description="Found profiles, in the order requested")
+    missing: List[str] = Field(..., description="Requested ids with no active profile")
@@ -0,0 +1,24 @@
+"""Report models."""
+
+from datetime import date
+
+from pydantic import Field
+
+from src.models.base import CoreModel
+
+
+class GenderBreakdown(CoreModel):
+    """Gender counts of one role"""
+
+    counts: dict[str, int] = Field(..., description="Users keyed by gender, 'unknown' without a profile")
+    ratios: dict[str, float] = Field(..., description="Share of the role's users keyed by gender")
+
+
+class DemographicReport(CoreModel):
+    """Model for the demographic report"""
+
+    as_of: date = Field(..., description="Date ages are computed at")
+    total: int = Field(..., description="Active users")
+    age_bands: dict[str, dict[str, int]] = Field(..., description="Users by role, then age band")
+    gender: dict[str, GenderBreakdown] = Field(..., description="Gender breakdown by role")
+    enrolments: dict[str, dict[str, int]] = Field(..., description="New users by month (YYYY-MM), then role")
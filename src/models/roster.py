@@ -0,0 +1,42 @@
+"""Roster filtering models."""
+
+from typing import List, Literal, Optional
+
+from pydantic import Field
+
+from src.enums.gender import GenderEnum
+from src.enums.marital_status import MaritalStatusEnum
+from src.enums.users import UserRole
+from src.models.base import CoreModel
+
+
+class RosterFilter(CoreModel):
+    """Filter, sort and page of a roster query"""
+
+    role: Optional[UserRole] = Field(None, description="Only users of this role")
+    gender: Optional[GenderEnum] = Field(None, description="Only users of this gender")
+    marital_status: Optional[MaritalStatusEnum] = Field(None, description="Only users of this marital status")
+    search: Optional[str] = Field(None, description="Fragment of the first name, last name or email")
+    sort: Literal["last_name", "first_name", "user_id"] = Field("last_name", description="Sort key")
+    descending: bool = Field(False, description="Sort in descending order")
+    offset: int = Field(0, ge=0, description="Matching entries to skip")
+    limit: int = Field(50, ge=0, description="Most entries to return, 0 to only count")
+
+
+class RosterEntry(CoreModel):
+    """Model for one compact roster entry"""
+
+    user_id: str = Field(..., description="User ID")
+    role: UserRole = Field(..., description="Role of the user")
+    first_name: str = Field(..., description="First name of the user")
+    last_name: str = Field(..., description="Last name of the user")
+    email: str = Field(..., description="Email address of the user")
+    gender: GenderEnum = Field(..., description="Gender of the user")
+    marital_status: Optional[MaritalStatusEnum] = Field(None, description="Marital status")
+
+
+class RosterPage(CoreModel):
+    """Model for a page of roster query results"""
+
+    total: int = Field(..., description="Entries matching the filter")
+    items: List[RosterEntry] = Field(..., description="Matching entries in the requested order")
@@ -0,0 +1,21 @@
+"""Roster statistics models."""
+
+from pydantic import Field
+
+from src.models.base import CoreModel
+
+
+class RoleStats(CoreModel):
+    """Counts for one role"""
+
+    total: int = Field(0, description="Active users with an active profile")
+    by_gender: dict[str, int] = Field(default_factory=dict, description="Counts keyed by gender")
+    by_marital_status: dict[str, int] = Field(
+        default_factory=dict, description="Counts keyed by marital status, 'unknown' when not given"
+    )
+
+
+class RosterStats(CoreModel):
+    """Model for roster statistics"""
+
+    roles: dict[str, RoleStats] = Field(default_factory=dict, description="Counts keyed by role")
@@ -0,0 +1,110 @@
+"""Background archival of long soft-deleted users and profiles.
+
+Each run archives in batches of batch_size rows, one short transaction per
+batch, and pauses between batches so other writes are not held up behind it.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from databases import Database
+
+from src.core import config
+from src.db.repos.archive import ArchiveRepository
+from src.models.archive import ArchiveRun
+from src.services.leases import WorkerLease
+
+app_logger = logging.getLogger("app")
+
+
+class ArchiveJob:
+    """Periodically moves rows deleted longer than the retention period to the archive."""
+
+    def __init__(
+        self,
+        db: Database,
+        lease: Optional[WorkerLease],
+        *,
+        retention: float,
+        interval: float,
+        batch_size: int,
+        pause: float,
+    ) -> None:
+        self.repo = ArchiveRepository(db)
+        # With a lease, scheduled runs only happen while this worker holds it
+        self.lease = lease
+        self.retention = retention
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self.runs = 0
+        self.archived_users = 0
+        self.archived_profiles = 0
+        self.last_duration_ms: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="archive-job")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            if self.lease is None or self.lease.held:
+                try:
+                    await self.run_once()
+                except Exception:
+                    app_logger.exception("Archival run failed")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> ArchiveRun:
+        """Archive everything due, batch by batch."""
+        async with self._lock:
+            started = time.perf_counter()
+            total = ArchiveRun(users=0, profiles=0)
+            while True:
+                run, more = await self.repo.archive_batch(retention_seconds=self.retention, batch_size=self.batch_size)
+                total.users += run.users
+                total.profiles += run.profiles
+                self.archived_users += run.users
+                self.archived_profiles += run.profiles
+                if not more:
+                    break
+                await asyncio.sleep(self.pause)
+            self.runs += 1
+            self.last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            return total
+
+    def snapshot(self) -> dict:
+        return {
+            "runs": self.runs,
+            "archived_users": self.archived_users,
+            "archived_profiles": self.archived_profiles,
+            "last_duration_ms": self.last_duration_ms,
+        }
+
+
+def create_archive_job(db: Database, lease: Optional[WorkerLease]) -> Optional[ArchiveJob]:
+    """Build the job from config, or None when archival is disabled."""
+    if not config.ARCHIVE_ENABLED:
+        return None
+    return ArchiveJob(
+        db,
+        lease,
+        retention=config.ARCHIVE_RETENTION_DAYS * 86400,
+        interval=config.ARCHIVE_INTERVAL_SECONDS,
+        # Row IDs are bound as parameters, at most 999 per statement
+        batch_size=min(config.ARCHIVE_BATCH_SIZE, 999),
+        pause=config.ARCHIVE_BATCH_PAUSE_MS / 1000,
+    )
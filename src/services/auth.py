@@ -1,6 +1,11 @@
 """Auth  module."""
 
+import asyncio
+import math
+import statistics
+import time
 from datetime import datetime, timedelta
+from typing import Optional, Sequence
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -8,17 +13,70 @@ from passlib.context import CryptContext
 from src.core.config import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     ALGORITHM,
+    PIN_HASH_ROUNDS,
+    PIN_HASH_SCHEMES,
     REFRESH_TOKEN_EXPIRE_DAYS,
     SECRET_KEY,
 )
 from src.errors.core import InvalidTokenError
 
 
+def build_pwd_context(schemes: Sequence[str], rounds: Optional[int] = None) -> CryptContext:
+    """Build the PIN hashing policy.
+
+    The first scheme is the default and every other scheme is deprecated. When
+    rounds are given they are pinned as the default, minimum and maximum, so
+    `needs_update` flags any hash created under a different cost.
+    """
+    default_scheme = schemes[0]
+    options = {}
+    if rounds:
+        options = {
+            f"{default_scheme}__default_rounds": rounds,
+            f"{default_scheme}__min_rounds": rounds,
+            f"{default_scheme}__max_rounds": rounds,
+        }
+    return CryptContext(schemes=list(schemes), deprecated="auto", **options)
+
+
+def calibrate_rounds(scheme: str, target_ms: float, samples: int = 5, probe_rounds: Optional[int] = None) -> dict:
+    """Measure hashing cost on this machine and pick rounds that fit the target latency.
+
+    The slowest sample is used for the per-round cost, so the chosen rounds
+    leave headroom for the tail rather than the median.
+    """
+    handler = CryptContext(schemes=[scheme]).handler(scheme)
+    if "rounds" not in handler.setting_kwds:
+        raise ValueError(f"Scheme {scheme} has no configurable rounds")
+
+    rounds = probe_rounds or handler.default_rounds
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.using(rounds=rounds).hash("000000")
+        timings.append((time.perf_counter() - started) * 1000)
+    slowest = max(timings)
+
+    if handler.rounds_cost == "log2":
+        chosen = rounds + math.floor(math.log2(target_ms / slowest))
+    else:
+        chosen = int(rounds * target_ms / slowest) // 1000 * 1000
+    chosen = max(handler.min_rounds, min(chosen, handler.max_rounds))
+
+    return {
+        "scheme": scheme,
+        "probe_rounds": rounds,
+        "median_ms": statistics.median(timings),
+        "slowest_ms": slowest,
+        "rounds": chosen,
+    }
+
+
 class AuthService:
     """Auth service."""
 
     # Use sha256_crypt for easier development (more predictable than bcrypt)
-    pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
+    pwd_context = build_pwd_context(PIN_HASH_SCHEMES, PIN_HASH_ROUNDS)
 
     def create_access_token(
         self, data: dict, expires_delta: timedelta | None = None
@@ -73,12 +131,19 @@ class AuthService:
         except JWTError:
             raise credentials_exception
 
+    # Hashing is CPU bound for hundreds of milliseconds, so it runs in a worker
+    # thread to keep the event loop free for cheap requests.
     @staticmethod
     async def get_pin_hash(pin: str) -> str:
         """Hash a PIN using sha256_crypt (more predictable than bcrypt)"""
-        return AuthService.pwd_context.hash(pin)
+        return await asyncio.to_thread(AuthService.pwd_context.hash, pin)
 
     @staticmethod
     async def verify_pin(plain_pin: str, hashed_pin: str) -> bool:
         """Verify a PIN against its hashed version"""
-        return AuthService.pwd_context.verify(plain_pin, hashed_pin)
\ No newline at end of file
+        return await asyncio.to_thread(AuthService.pwd_context.verify, plain_pin, hashed_pin)
+
+    @staticmethod
+    def pin_needs_rehash(hashed_pin: str) -> bool:
+        """Check whether a stored hash was created under an outdated policy."""
+        return AuthService.pwd_context.needs_update(hashed_pin)
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""Fan-out of roster changes to Server-Sent Events subscribers.
+
+Each worker tails the change_log table, which every write path appends to in
+its own transaction, and hands new rows to its local subscribers. The table is
+shared by all gunicorn workers, so a change committed by one worker reaches
+subscribers of every worker within one poll interval; writes made by this
+worker wake the tail at once. Nothing is polled while nobody is subscribed.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Optional
+from weakref import WeakKeyDictionary
+
+from databases import Database
+
+from src.core import config
+
+app_logger = logging.getLogger("app")
+
+_hubs: "WeakKeyDictionary[Database, RosterEventHub]" = WeakKeyDictionary()
+
+GET_EVENTS_SINCE_QUERY = """
+SELECT seq, table_name, user_id, action, changed_at FROM change_log
+WHERE seq > :since
+ORDER BY seq
+LIMIT :limit
+"""
+
+GET_LATEST_SEQ_QUERY = """
+SELECT COALESCE(MAX(seq), 0) AS seq FROM change_log
+"""
+
+# Queued to a subscriber that fell too far behind, ends its stream
+EVICTED = object()
+
+
+class RosterEvent:
+    """One change_log row, formatted once and shared by all subscribers."""
+
+    __slots__ = ("seq", "message")
+
+    def __init__(self, row) -> None:
+        self.seq = row["seq"]
+        data = {
+            "seq": row["seq"],
+            "table": row["table_name"],
+            "user_id": row["user_id"],
+            "action": row["action"],
+            "changed_at": str(row["changed_at"]),
+        }
+        self.message = f"id: {self.seq}\nevent: {row['action']}\ndata: {json.dumps(data)}\n\n"
+
+
+class Subscriber:
+    """A stream's bounded queue of events."""
+
+    def __init__(self, max_queue: int) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.evicted = False
+
+    def offer(self, event: RosterEvent) -> bool:
+        """Queue an event, returning False if the subscriber is too far behind."""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def evict(self) -> None:
+        self.evicted = True
+        # Drop what it has not read, the client resumes from its last event ID
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(EVICTED)
+
+
+class RosterEventHub:
+    """Tails the change log and fans new rows out to subscribers."""
+
+    def __init__(self, db: Database, *, interval: float, max_queue: int, batch_size: int = 500) -> None:
+        self.db = db
+        self.interval = interval
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.published = 0
+        self.evictions = 0
+        self._cursor: Optional[int] = None
+        self._subscribers: set[Subscriber] = set()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="roster-event-hub")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        for subscriber in list(self._subscribers):
+            subscriber.evict()
+
+    def wake(self) -> None:
+        """Poll now rather than at the next interval, called after local writes."""
+        self._wake.set()
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.max_queue)
+        self._subscribers.add(subscriber)
+        self.wake()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    async def replay(self, since: int, limit: int) -> list[RosterEvent]:
+        """Events after a client's last event ID, for resuming a stream."""
+        rows = await self.db.fetch_all(query=GET_EVENTS_SINCE_QUERY, values={"since": since, "limit": limit})
+        return [RosterEvent(row) for row in rows]
+
+    async def _run(self) -> None:
+        # Holding the connection keeps one SQLite connection for the tail
+        async with self.db.connection():
+            while True:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                try:
+                    await self._poll()
+                except Exception:
+                    app_logger.exception("Failed to read roster changes")
+
+    async def _poll(self) -> None:
+        if not self._subscribers:
+            # Start from now when the next subscriber arrives
+            self._cursor = None
+            return
+        if self._cursor is None:
+            row = await self.db.fetch_one(query=GET_LATEST_SEQ_QUERY)
+            self._cursor = row["seq"]
+            return
+
+        while True:
+            rows = await self.db.fetch_all(
+                query=GET_EVENTS_SINCE_QUERY, values={"since": self._cursor, "limit": self.batch_size}
+            )
+            for row in rows:
+                self._publish(RosterEvent(row))
+            if rows:
+                self._cursor = rows[-1]["seq"]
+            if len(rows) < self.batch_size:
+                return
+
+    def _publish(self, event: RosterEvent) -> None:
+        self.published += 1
+        for subscriber in list(self._subscribers):
+            if not subscriber.offer(event):
+                self._subscribers.discard(subscriber)
+                subscriber.evict()
+                self.evictions += 1
+                app_logger.warning("Evicted a slow roster event subscriber")
+
+    def snapshot(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "evictions": self.evictions,
+            "cursor": self._cursor,
+        }
+
+
+def create_event_hub(db: Database) -> RosterEventHub:
+    """Build the hub from config."""
+    return RosterEventHub(
+        db,
+        interval=config.SSE_POLL_INTERVAL_MS / 1000,
+        max_queue=config.SSE_QUEUE_SIZE,
+    )
+
+
+def attach_event_hub(db: Database, hub: RosterEventHub) -> None:
+    _hubs[db] = hub
+
+
+def detach_event_hub(db: Database) -> None:
+    _hubs.pop(db, None)
+
+
+def get_event_hub(db: Database) -> Optional[RosterEventHub]:
+    return _hubs.get(db)
@@ -0,0 +1,101 @@
+"""Election of the worker that runs background jobs.
+
+Every gunicorn worker starts archival, SQLite maintenance and webhook
+delivery, but only the worker holding the "background" lease row runs
+them; the others check on it and stand by. The holder renews the lease
+every third of its length and counts it as held only until the time it
+last renewed plus the length, which is never later than the expiry in
+the database. A worker that dies or hangs loses the lease once it
+expires, and one that stops releases it for another to take over.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Optional
+
+from databases import Database
+
+from src.core import config
+from src.db.repos.leases import LeaseRepository
+
+app_logger = logging.getLogger("app")
+
+BACKGROUND_LEASE = "background"
+
+
+class WorkerLease:
+    """A lease row this worker tries to take and, once taken, keeps renewing."""
+
+    def __init__(self, db: Database, *, name: str, seconds: float) -> None:
+        self.repo = LeaseRepository(db)
+        self.name = name
+        self.seconds = seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.acquired = 0
+        self._held_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def held(self) -> bool:
+        return time.monotonic() < self._held_until
+
+    async def start(self) -> None:
+        # Once before the jobs start, so the first worker up runs them right away
+        await self.refresh()
+        self._task = asyncio.create_task(self._run(), name=f"{self.name}-lease")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.held:
+            self._held_until = 0.0
+            try:
+                await self.repo.release(name=self.name, holder=self.holder)
+            except Exception:
+                app_logger.exception(f"Releasing the {self.name} lease failed")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.seconds / 3)
+            try:
+                await self.refresh()
+            except Exception:
+                app_logger.exception(f"Refreshing the {self.name} lease failed")
+
+    async def refresh(self) -> bool:
+        """Renew the lease if held, take it if it is free. Returns whether it is held."""
+        if not self.held:
+            # A plain read first, standing by costs no write
+            lease = await self.repo.get_lease(name=self.name)
+            if lease is not None and lease["holder"] != self.holder and lease["expires_at"] >= time.time():
+                return False
+        # Taken before the write, so it never outlasts the expiry it sets
+        started = time.monotonic()
+        was_held = self.held
+        if not await self.repo.acquire(name=self.name, holder=self.holder, seconds=self.seconds):
+            self._held_until = 0.0
+            return False
+        self._held_until = started + self.seconds
+        if not was_held:
+            self.acquired += 1
+            app_logger.info(f"Worker {self.holder} took the {self.name} lease")
+        return True
+
+    def snapshot(self) -> dict:
+        return {"name": self.name, "holder": self.holder, "held": self.held, "acquired": self.acquired}
+
+
+def create_background_lease(db: Database) -> Optional[WorkerLease]:
+    """Build the background jobs lease from config, or None to run them in every worker."""
+    if not config.WORKER_LEASE_ENABLED:
+        return None
+    return WorkerLease(db, name=BACKGROUND_LEASE, seconds=config.WORKER_LEASE_SECONDS)
@@ -0,0 +1,173 @@
+"""Event loop health.
+
+A task sleeps for a fixed interval, over and over, and measures how late it
+wakes up. That lag is how long any callback ready at the same moment waited
+for the loop, so it shows blocking calls made from async code: hashing or
+file I/O on the loop thread, synchronous logging or print to a slow stream.
+A wake-up later than the stall threshold counts as a stall.
+
+In debug mode a watchdog thread also watches the task's heartbeat. When the
+loop has not come back for longer than the threshold, the watchdog records
+the loop thread's stack at that moment, which names the blocking call. The
+thread only runs while Python lets it take the GIL, so a C call that holds
+the GIL is caught as soon as it returns to Python.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+
+from src.core import config
+
+app_logger = logging.getLogger("app")
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LoopMonitor:
+    """Measures event loop lag and, in debug mode, captures the stacks of stalls."""
+
+    def __init__(self, *, interval: float, threshold: float, window: int, debug: bool, history: int) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.debug = debug
+        self.samples = 0
+        self.stalls = 0
+        self.stalled_seconds = 0.0
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self._lags: deque[float] = deque(maxlen=max(1, window))
+        self._blocking: deque[dict] = deque(maxlen=max(1, history))
+        # (heartbeat, entry) of a captured stall the loop has not come back from
+        self._open: Optional[tuple[float, dict]] = None
+        self._lock = threading.Lock()
+        self._beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    async def start(self) -> None:
+        self._beat = time.monotonic()
+        self._loop_thread = threading.get_ident()
+        self._task = asyncio.create_task(self._run(), name="loop-monitor")
+        if self.debug:
+            self._stopping.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._watchdog is not None:
+            self._stopping.set()
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            beat = self._beat
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            lag = max(0.0, now - expected)
+            self.record(lag)
+            if self.debug and lag > self.threshold:
+                with self._lock:
+                    if self._open is not None and self._open[0] == beat:
+                        self._open[1]["lag_ms"] = round(lag * 1000, 1)
+                        self._open = None
+
+    def record(self, lag: float) -> None:
+        self.samples += 1
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self._lags.append(lag)
+        if lag > self.threshold:
+            self.stalls += 1
+            self.stalled_seconds += lag
+            app_logger.warning(f"Event loop stalled for {lag * 1000:.0f} ms")
+
+    def _watch(self) -> None:
+        # Late by more than the threshold past the expected wake-up
+        limit = self.interval + self.threshold
+        poll = max(0.005, self.threshold / 2)
+        captured_beat = None
+        while not self._stopping.wait(poll):
+            beat = self._beat
+            blocked = time.monotonic() - beat
+            if blocked <= limit or beat == captured_beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            # Skip stalls that ended meanwhile, the stack would be of whatever runs now
+            if frame is None or self._beat != beat:
+                continue
+            captured_beat = beat
+            stack = [line.rstrip() for line in traceback.format_stack(frame)]
+            del frame
+            entry = {
+                "at": datetime.now(timezone.utc).isoformat(),
+                "blocked_ms": round((blocked - self.interval) * 1000, 1),
+                "lag_ms": None,
+                "stack": stack,
+            }
+            with self._lock:
+                self._blocking.append(entry)
+                if self._beat != beat:
+                    # The loop came back while the stack was formatted
+                    entry["lag_ms"] = round(max(0.0, self._beat - beat - self.interval) * 1000, 1)
+                else:
+                    # The lag is filled in when the loop comes back
+                    self._open = (beat, entry)
+            app_logger.warning(
+                f"Event loop blocked for {entry['blocked_ms']:.0f} ms in:\n" + "\n".join(stack[-3:])
+            )
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self._lags)
+        snapshot = {
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "samples": self.samples,
+            "lag_ms": {
+                "last": round(self.last_lag * 1000, 2),
+                "p50": round(_percentile(ordered, 0.5) * 1000, 2) if ordered else 0.0,
+                "p99": round(_percentile(ordered, 0.99) * 1000, 2) if ordered else 0.0,
+                "max": round(self.max_lag * 1000, 2),
+            },
+            "stalls": self.stalls,
+            "stalled_ms": round(self.stalled_seconds * 1000, 1),
+            "debug": self.debug,
+        }
+        if self.debug:
+            with self._lock:
+                snapshot["blocking_calls"] = [dict(entry) for entry in self._blocking]
+        return snapshot
+
+
+def create_loop_monitor() -> Optional[LoopMonitor]:
+    """Build the monitor from config, or None when it is disabled."""
+    if not config.LOOP_MONITOR_ENABLED:
+        return None
+    return LoopMonitor(
+        interval=config.LOOP_MONITOR_INTERVAL_MS / 1000,
+        threshold=config.LOOP_MONITOR_STALL_MS / 1000,
+        window=config.LOOP_MONITOR_WINDOW,
+        debug=config.LOOP_MONITOR_DEBUG,
+        history=config.LOOP_MONITOR_HISTORY,
+    )
@@ -0,0 +1,246 @@
+"""Background SQLite maintenance.
+
+Four tasks keep the database in shape:
+
+- analyze refreshes the planner statistics table by table, with
+  analysis_limit bounding the rows sampled per index, then runs
+  PRAGMA optimize.
+- vacuum returns free pages left by deletes and archival to the
+  filesystem with incremental vacuum.
+- checkpoint copies committed WAL frames into the database file with a
+  passive checkpoint, which never waits on readers or writers.
+- prune drops change log rows older than the retention, keeping the latest
+  row of each user on the roster.
+
+A task runs once its interval has passed and the worker is quiet. Each run
+works in small steps and stops when its time budget is spent or traffic
+picks up, pausing between steps so live writes queued behind a step are not
+held up for long. An unfinished task carries on at the next quiet check.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+from databases import Database
+
+from src.core import config
+from src.core.activity import RequestActivity
+from src.db.repos.changes import ChangeLogRepository
+from src.db.repos.maintenance import MaintenanceRepository
+from src.services.leases import WorkerLease
+
+app_logger = logging.getLogger("app")
+
+# Run order within one check, the cheapest first
+TASKS = ("checkpoint", "prune", "vacuum", "analyze")
+
+
+class MaintenanceScheduler:
+    """Runs SQLite maintenance tasks in quiet periods, each within a time budget."""
+
+    def __init__(
+        self,
+        db: Database,
+        activity: Optional[RequestActivity],
+        lease: Optional[WorkerLease],
+        *,
+        check_interval: float,
+        budget: float,
+        pause: float,
+        intervals: dict[str, float],
+        analysis_limit: int,
+        vacuum_pages: int,
+        retention: float,
+        prune_batch: int,
+        history: int,
+    ) -> None:
+        self.repo = MaintenanceRepository(db)
+        self.changes = ChangeLogRepository(db)
+        self.activity = activity
+        # With a lease, checks only happen while this worker holds it
+        self.lease = lease
+        self.check_interval = check_interval
+        self.budget = budget
+        self.pause = pause
+        self.intervals = intervals
+        self.analysis_limit = analysis_limit
+        self.vacuum_pages = vacuum_pages
+        self.retention = retention
+        self.prune_batch = prune_batch
+        self.runs = {task: 0 for task in TASKS}
+        self.failures = {task: 0 for task in TASKS}
+        # Every task is due at the first quiet check
+        self._due_at = {task: 0.0 for task in TASKS}
+        self._pending_tables: list[str] = []
+        self._history: deque[dict] = deque(maxlen=history)
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="sqlite-maintenance")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            if self.lease is not None and not self.lease.held:
+                continue
+            try:
+                await self.run_due()
+            except Exception:
+                app_logger.exception("SQLite maintenance check failed")
+
+    def _quiet(self) -> bool:
+        return self.activity is None or self.activity.is_quiet()
+
+    async def run_due(self, *, force: bool = False) -> list[dict]:
+        """Run the tasks that are due, or all of them with force. Returns their history entries."""
+        runners: dict[str, Callable[[float, bool], Awaitable[tuple[bool, str, dict]]]] = {
+            "checkpoint": self._checkpoint,
+            "prune": self._prune,
+            "vacuum": self._vacuum,
+            "analyze": self._analyze,
+        }
+        entries = []
+        async with self._lock:
+            for task in TASKS:
+                now = time.monotonic()
+                if not force and now < self._due_at[task]:
+                    continue
+                # Overdue by a whole interval, traffic no longer defers it
+                overdue = force or now >= self._due_at[task] + self.intervals[task]
+                if not overdue and not self._quiet():
+                    continue
+                entries.append(await self._run_task(task, runners[task], overdue))
+        return entries
+
+    async def _run_task(self, task: str, runner, overdue: bool) -> dict:
+        started_at = datetime.now(timezone.utc)
+        started = time.monotonic()
+        try:
+            finished, status, detail = await runner(started + self.budget, overdue)
+        except Exception as e:
+            app_logger.exception(f"SQLite maintenance task {task} failed")
+            self.failures[task] += 1
+            finished, status, detail = False, "failed", {"error": str(e)}
+        ended = time.monotonic()
+        # A failed task is retried after its interval rather than on every check
+        if finished or status == "failed":
+            self._due_at[task] = ended + self.intervals[task]
+        self.runs[task] += 1
+        entry = {
+            "task": task,
+            "started_at": started_at.isoformat(),
+            "duration_ms": round((ended - started) * 1000, 1),
+            "status": status,
+            **detail,
+        }
+        self._history.append(entry)
+        return entry
+
+    def _can_continue(self, deadline: float, overdue: bool) -> bool:
+        return time.monotonic() < deadline and (overdue or self._quiet())
+
+    async def _analyze(self, deadline: float, overdue: bool) -> tuple[bool, str, dict]:
+        if not self._pending_tables:
+            tables = await self.repo.get_tables()
+            analyzed = await self.repo.get_analyzed_tables()
+            # Tables the planner knows nothing about go first
+            self._pending_tables = sorted(tables, key=lambda table: table in analyzed)
+        done = []
+        while self._pending_tables:
+            table = self._pending_tables.pop(0)
+            await self.repo.analyze_table(table, limit=self.analysis_limit)
+            done.append(table)
+            if self._pending_tables:
+                if not self._can_continue(deadline, overdue):
+                    return False, "partial", {"tables": done, "remaining": len(self._pending_tables)}
+                await asyncio.sleep(self.pause)
+        await self.repo.optimize()
+        return True, "done", {"tables": done, "remaining": 0}
+
+    async def _vacuum(self, deadline: float, overdue: bool) -> tuple[bool, str, dict]:
+        mode = await self.repo.get_auto_vacuum()
+        free_pages = await self.repo.get_free_pages()
+        if mode != "incremental":
+            return True, "skipped", {"auto_vacuum": mode, "free_pages": free_pages}
+        freed = 0
+        while free_pages:
+            left = await self.repo.incremental_vacuum(pages=min(self.vacuum_pages, free_pages))
+            freed += free_pages - left
+            free_pages = left
+            if free_pages:
+                if not self._can_continue(deadline, overdue):
+                    return False, "partial", {"freed_pages": freed, "free_pages": free_pages}
+                await asyncio.sleep(self.pause)
+        return True, "done", {"freed_pages": freed, "free_pages": 0}
+
+    async def _prune(self, deadline: float, overdue: bool) -> tuple[bool, str, dict]:
+        pruned = 0
+        while True:
+            removed, horizon = await self.changes.prune(retention=self.retention, limit=self.prune_batch)
+            pruned += removed
+            if removed < self.prune_batch:
+                return True, "done", {"pruned_rows": pruned, "horizon": horizon}
+            if not self._can_continue(deadline, overdue):
+                return False, "partial", {"pruned_rows": pruned, "horizon": horizon}
+            await asyncio.sleep(self.pause)
+
+    async def _checkpoint(self, deadline: float, overdue: bool) -> tuple[bool, str, dict]:
+        result = await self.repo.checkpoint()
+        return True, "done", result
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        return {
+            "quiet": self._quiet(),
+            "tasks": {
+                task: {
+                    "runs": self.runs[task],
+                    "failures": self.failures[task],
+                    "due_in_s": round(max(0.0, self._due_at[task] - now), 1),
+                }
+                for task in TASKS
+            },
+            "history": list(self._history),
+        }
+
+
+def create_maintenance_scheduler(
+    db: Database, activity: Optional[RequestActivity], lease: Optional[WorkerLease]
+) -> Optional[MaintenanceScheduler]:
+    """Build the scheduler from config, or None when maintenance is disabled."""
+    if not config.MAINTENANCE_ENABLED:
+        return None
+    return MaintenanceScheduler(
+        db,
+        activity,
+        lease,
+        check_interval=config.MAINTENANCE_CHECK_SECONDS,
+        budget=config.MAINTENANCE_BUDGET_MS / 1000,
+        pause=config.MAINTENANCE_STEP_PAUSE_MS / 1000,
+        intervals={
+            "analyze": config.MAINTENANCE_ANALYZE_INTERVAL_SECONDS,
+            "vacuum": config.MAINTENANCE_VACUUM_INTERVAL_SECONDS,
+            "checkpoint": config.MAINTENANCE_CHECKPOINT_INTERVAL_SECONDS,
+            "prune": config.MAINTENANCE_PRUNE_INTERVAL_SECONDS,
+        },
+        analysis_limit=config.MAINTENANCE_ANALYZE_LIMIT,
+        vacuum_pages=config.MAINTENANCE_VACUUM_PAGES,
+        retention=config.CHANGE_LOG_RETENTION_DAYS * 86400,
+        prune_batch=min(config.CHANGE_LOG_PRUNE_BATCH_SIZE, 999),
+        history=config.MAINTENANCE_HISTORY,
+    )
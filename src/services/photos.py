@@ -0,0 +1,181 @@
+"""Content-addressed photo storage with background thumbnailing."""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from src.core import config
+from src.errors.database import BadRequestError
+
+app_logger = logging.getLogger("app")
+
+ORIGINAL = "original"
+
+# Pillow format name -> stored extension and media type
+FORMATS = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "WEBP": ("webp", "image/webp"),
+    "GIF": ("gif", "image/gif"),
+}
+MEDIA_TYPES = {extension: media_type for extension, media_type in FORMATS.values()}
+FILENAME_PATTERN = re.compile(r"^(?P<digest>[0-9a-f]{64})\.(?P<extension>jpg|png|webp|gif)$")
+
+
+def _write_atomically(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _inspect_image(data: bytes) -> str:
+    """Return the Pillow format of an upload, rejecting anything we do not store."""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+            image_format = image.format
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        raise BadRequestError("Photo must be a JPEG, PNG, WEBP or GIF image")
+    if image_format not in FORMATS:
+        raise BadRequestError("Photo must be a JPEG, PNG, WEBP or GIF image")
+    return image_format
+
+
+def _make_thumbnail(source: Path, target: Path, size: int) -> None:
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=85, optimize=True)
+    _write_atomically(target, buffer.getvalue())
+
+
+class StoredPhoto:
+    """Location of a stored photo and its thumbnails."""
+
+    def __init__(self, filename: str, url: str, thumbnails: dict[int, str]) -> None:
+        self.filename = filename
+        self.url = url
+        self.thumbnails = thumbnails
+
+
+class PhotoStorage:
+    """Stores uploads under their SHA-256 so identical photos share one file."""
+
+    def __init__(self, root: str, thumbnail_sizes: list[int], url_prefix: str, workers: int) -> None:
+        self.root = Path(root)
+        self.thumbnail_sizes = thumbnail_sizes
+        self.url_prefix = url_prefix.rstrip("/")
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: set[asyncio.Task] = set()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Created lazily so a forked worker never inherits the parent's threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="photos")
+        return self._executor
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def original_path(self, filename: str) -> Path:
+        return self.root / ORIGINAL / filename[:2] / filename
+
+    def thumbnail_path(self, filename: str, size: int) -> Path:
+        digest = filename.split(".", 1)[0]
+        return self.root / str(size) / digest[:2] / f"{digest}.jpg"
+
+    def url_for(self, filename: str, variant: str = ORIGINAL) -> str:
+        return f"{self.url_prefix}/{variant}/{filename}"
+
+    def describe(self, filename: str) -> StoredPhoto:
+        return StoredPhoto(
+            filename=filename,
+            url=self.url_for(filename),
+            thumbnails={size: self.url_for(filename, str(size)) for size in self.thumbnail_sizes},
+        )
+
+    async def save(self, data: bytes) -> StoredPhoto:
+        """Store an upload, deduplicating by content, and queue its thumbnails."""
+        image_format = await self._run(_inspect_image, data)
+        extension = FORMATS[image_format][0]
+        filename = f"{hashlib.sha256(data).hexdigest()}.{extension}"
+
+        path = self.original_path(filename)
+        if path.exists():
+            app_logger.info(f"Photo {filename} already stored")
+        else:
+            await self._run(_write_atomically, path, data)
+            app_logger.info(f"Stored photo {filename}")
+
+        task = asyncio.create_task(self._generate_thumbnails(filename))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return self.describe(filename)
+
+    async def _generate_thumbnails(self, filename: str) -> None:
+        for size in self.thumbnail_sizes:
+            try:
+                await self.ensure_thumbnail(filename, size)
+            except Exception:
+                app_logger.exception(f"Failed to create {size}px thumbnail for {filename}")
+
+    async def ensure_thumbnail(self, filename: str, size: int) -> Optional[Path]:
+        """Return the thumbnail path, creating it first if the background job has not yet."""
+        target = self.thumbnail_path(filename, size)
+        if target.exists():
+            return target
+        source = self.original_path(filename)
+        if not source.exists():
+            return None
+        await self._run(_make_thumbnail, source, target, size)
+        return target
+
+    async def resolve(self, variant: str, filename: str) -> Optional[tuple[Path, str]]:
+        """Find the file for a variant, returning its path and media type."""
+        match = FILENAME_PATTERN.match(filename)
+        if match is None:
+            return None
+        if variant == ORIGINAL:
+            path = self.original_path(filename)
+            return (path, MEDIA_TYPES[match["extension"]]) if path.exists() else None
+        if not variant.isdigit() or int(variant) not in self.thumbnail_sizes:
+            return None
+        path = await self.ensure_thumbnail(filename, int(variant))
+        return (path, "image/jpeg") if path else None
+
+    async def close(self) -> None:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def create_photo_storage() -> PhotoStorage:
+    """Build the storage from config."""
+    return PhotoStorage(
+        root=config.PHOTO_STORAGE_DIR,
+        thumbnail_sizes=sorted(int(size) for size in config.PHOTO_THUMBNAIL_SIZES),
+        url_prefix=f"{config.API_PREFIX}/profile/photos",
+        workers=config.PHOTO_WORKERS,
+    )
@@ -0,0 +1,158 @@
+"""Demographic reports over the roster.
+
+Aggregates are computed with pandas in a separate process, which reads the
+SQLite file itself in chunks, so neither the event loop nor the worker's
+memory carries the full table. Results are cached by the repository under
+the generations of the users and profiles tables.
+"""
+
+import asyncio
+import csv
+import io
+import logging
+import multiprocessing
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.core import config
+from src.models.reports import DemographicReport
+
+app_logger = logging.getLogger("app")
+
+REPORT_QUERY = """
+SELECT u.role, u.created_at, p.gender, p.date_of_birth
+FROM users u
+LEFT JOIN profiles p ON p.user_id = u.user_id AND p.is_deleted = FALSE
+WHERE u.is_deleted = FALSE
+"""
+
+UNKNOWN = "unknown"
+
+
+def age_band_labels(edges: list[int]) -> list[str]:
+    """Labels for the bands split at edges, e.g. [18, 25] -> ["0-17", "18-24", "25+", "unknown"]."""
+    bounds = [0] + edges
+    labels = [f"{low}-{high - 1}" for low, high in zip(bounds, bounds[1:])]
+    return labels + [f"{bounds[-1]}+", UNKNOWN]
+
+
+def _add(total: Optional[pd.Series], counts: pd.Series) -> pd.Series:
+    return counts if total is None else total.add(counts, fill_value=0)
+
+
+def compute_demographics(database: str, as_of: date, edges: list[int], chunk_size: int) -> dict:
+    """Aggregate the roster, run in a worker process."""
+    labels = age_band_labels(edges)
+    today = as_of.month * 100 + as_of.day
+    ages = genders = enrolments = None
+    total = 0
+
+    connection = sqlite3.connect(f"file:{database}?mode=ro", uri=True)
+    try:
+        for chunk in pd.read_sql_query(REPORT_QUERY, connection, chunksize=chunk_size):
+            total += len(chunk)
+            role = chunk["role"]
+
+            born = pd.to_datetime(chunk["date_of_birth"], format="%Y-%m-%d", errors="coerce")
+            years = as_of.year - born.dt.year - ((born.dt.month * 100 + born.dt.day) > today)
+            codes = np.searchsorted(edges, years.fillna(-1).to_numpy(), side="right")
+            codes[years.isna().to_numpy() | (years < 0).to_numpy()] = len(labels) - 1
+            band = pd.Categorical.from_codes(codes, categories=labels)
+            ages = _add(ages, chunk.groupby([role, band], observed=True).size())
+
+            gender = chunk["gender"].fillna(UNKNOWN)
+            genders = _add(genders, chunk.groupby([role, gender]).size())
+
+            month = chunk["created_at"].astype(str).str.slice(0, 7)
+            enrolments = _add(enrolments, chunk.groupby([month, role]).size())
+    finally:
+        connection.close()
+
+    report = {"as_of": as_of, "total": total, "age_bands": {}, "gender": {}, "enrolments": {}}
+    if not total:
+        return report
+    for (role, band), count in ages.items():
+        report["age_bands"].setdefault(role, dict.fromkeys(labels, 0))[band] = int(count)
+    for role, counts in genders.groupby(level=0):
+        counts = counts.droplevel(0)
+        report["gender"][role] = {
+            "counts": {key: int(value) for key, value in counts.items()},
+            "ratios": {key: round(float(value) / float(counts.sum()), 4) for key, value in counts.items()},
+        }
+    for (month, role), count in enrolments.sort_index().items():
+        report["enrolments"].setdefault(month, {})[role] = int(count)
+    return report
+
+
+def demographics_csv(report: DemographicReport) -> str:
+    """Flatten a report to CSV rows of section, role, group, count and share."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["section", "role", "group", "count", "share"])
+    for role, bands in report.age_bands.items():
+        for band, count in bands.items():
+            writer.writerow(["age_band", role, band, count, ""])
+    for role, breakdown in report.gender.items():
+        for gender, count in breakdown.counts.items():
+            writer.writerow(["gender", role, gender, count, breakdown.ratios[gender]])
+    for month, roles in report.enrolments.items():
+        for role, count in roles.items():
+            writer.writerow(["enrolment", role, month, count, ""])
+    return buffer.getvalue()
+
+
+class ReportEngine:
+    """Runs report aggregations in a process pool."""
+
+    def __init__(self, database: str, *, age_bands: list[int], chunk_size: int, workers: int) -> None:
+        self.database = database
+        self.age_bands = age_bands
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.runs = 0
+        self.last_duration_ms: Optional[float] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # Spawned, not forked, so the process does not inherit the event loop's threads
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def demographics(self, as_of: date) -> DemographicReport:
+        started = time.perf_counter()
+        result = await asyncio.get_running_loop().run_in_executor(
+            self.executor, compute_demographics, self.database, as_of, self.age_bands, self.chunk_size
+        )
+        self.runs += 1
+        self.last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        app_logger.info(f"Computed demographic report of {result['total']} users in {self.last_duration_ms}ms")
+        return DemographicReport(**result)
+
+    async def close(self) -> None:
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            # Waits for running reports in a thread, the event loop keeps going meanwhile
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    def snapshot(self) -> dict:
+        return {"runs": self.runs, "last_duration_ms": self.last_duration_ms}
+
+
+def create_report_engine() -> ReportEngine:
+    """Build the engine from config."""
+    return ReportEngine(
+        config.DATABASE_URL.database,
+        age_bands=sorted(int(edge) for edge in config.REPORT_AGE_BANDS),
+        chunk_size=config.REPORT_CHUNK_SIZE,
+        workers=config.REPORT_WORKERS,
+    )
@@ -0,0 +1,180 @@
+"""Batched webhook delivery from the outbox.
+
+Write paths add a webhook_outbox row per configured endpoint in the same
+transaction as each roster change, so an event is sent if and only if its
+change committed. The dispatcher leases due rows per endpoint, posts them as
+one JSON batch and deletes them on a 2xx response, or reschedules them with
+exponential backoff. It only polls in the worker holding the background
+lease, and the row leases keep a worker that just lost it from sending the
+same rows as the new holder.
+
+Events carry the change log cursor as "id". With more than one batch in
+flight per endpoint, batches may arrive out of order, receivers that care
+should order by id.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Optional
+
+import httpx
+from databases import Database
+
+from src.core import config
+from src.db.repos.outbox import OutboxRepository
+from src.services.leases import WorkerLease
+
+app_logger = logging.getLogger("app")
+
+
+class EndpointState:
+    """Delivery counters and the in-flight limit of one endpoint."""
+
+    def __init__(self, url: str, concurrency: int) -> None:
+        self.url = url
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.delivered = 0
+        self.failed_batches = 0
+        self.dead = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "delivered": self.delivered,
+            "failed_batches": self.failed_batches,
+            "dead": self.dead,
+        }
+
+
+class WebhookDispatcher:
+    """Delivers outbox rows to the configured endpoints."""
+
+    def __init__(
+        self,
+        db: Database,
+        endpoints: list[str],
+        lease: Optional[WorkerLease],
+        *,
+        batch_size: int,
+        concurrency: int,
+        timeout: float,
+        max_attempts: int,
+        backoff: float,
+        max_backoff: float,
+        interval: float,
+    ) -> None:
+        self.repo = OutboxRepository(db)
+        self.endpoints = {url: EndpointState(url, concurrency) for url in endpoints}
+        # With a lease, polls only happen while this worker holds it
+        self.lease = lease
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.interval = interval
+        # A batch must be answered or abandoned well before its lease ends
+        self.lease_seconds = timeout * 3
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._deliveries: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        self._client = httpx.AsyncClient(timeout=self.timeout)
+        self._task = asyncio.create_task(self._run(), name="webhook-dispatcher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Let batches already sent finish, unfinished leases simply expire
+        if self._deliveries:
+            await asyncio.wait(self._deliveries, timeout=self.timeout)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _run(self) -> None:
+        while True:
+            if self.lease is None or self.lease.held:
+                try:
+                    await self.dispatch_due()
+                except Exception:
+                    app_logger.exception("Webhook dispatch failed")
+            await asyncio.sleep(self.interval)
+
+    async def dispatch_due(self) -> None:
+        """Start batches for every endpoint with free slots and due rows."""
+        for endpoint in self.endpoints.values():
+            while endpoint.in_flight < endpoint.concurrency:
+                rows = await self.repo.claim(
+                    endpoint=endpoint.url, limit=self.batch_size, lease_seconds=self.lease_seconds
+                )
+                if not rows:
+                    break
+                endpoint.in_flight += 1
+                task = asyncio.create_task(self._deliver(endpoint, rows))
+                self._deliveries.add(task)
+                task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, endpoint: EndpointState, rows: list[dict]) -> None:
+        try:
+            body = '{"events": [' + ", ".join(row["payload"] for row in rows) + "]}"
+            error = None
+            try:
+                response = await self._client.post(
+                    endpoint.url, content=body, headers={"Content-Type": "application/json"}
+                )
+                if not response.is_success:
+                    error = f"HTTP {response.status_code}"
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {e}"
+
+            if error is None:
+                await self.repo.complete(ids=[row["id"] for row in rows])
+                endpoint.delivered += len(rows)
+                return
+
+            endpoint.failed_batches += 1
+            dead = await self.repo.retry(
+                rows=rows,
+                error=error,
+                backoff=self.backoff,
+                max_backoff=self.max_backoff,
+                max_attempts=self.max_attempts,
+            )
+            endpoint.dead += dead
+            app_logger.warning(f"Webhook batch of {len(rows)} to {endpoint.url} failed: {error}")
+            if dead:
+                app_logger.error(f"Gave up on {dead} webhook events for {endpoint.url}")
+        except Exception:
+            app_logger.exception(f"Webhook delivery to {endpoint.url} failed")
+        finally:
+            endpoint.in_flight -= 1
+
+    def snapshot(self) -> dict:
+        return {url: endpoint.snapshot() for url, endpoint in self.endpoints.items()}
+
+
+def create_webhook_dispatcher(db: Database, lease: Optional[WorkerLease]) -> Optional[WebhookDispatcher]:
+    """Build the dispatcher from config, or None when no endpoints are configured."""
+    if not config.WEBHOOK_URLS:
+        return None
+    return WebhookDispatcher(
+        db,
+        list(config.WEBHOOK_URLS),
+        lease,
+        batch_size=config.WEBHOOK_BATCH_SIZE,
+        concurrency=config.WEBHOOK_CONCURRENCY,
+        timeout=config.WEBHOOK_TIMEOUT_SECONDS,
+        max_attempts=config.WEBHOOK_MAX_ATTEMPTS,
+        backoff=config.WEBHOOK_BACKOFF_SECONDS,
+        max_backoff=config.WEBHOOK_MAX_BACKOFF_SECONDS,
+        interval=config.WEBHOOK_POLL_INTERVAL_MS / 1000,
+    )
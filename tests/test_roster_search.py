@@ -0,0 +1,99 @@
+"""The roster snapshot and the SQL fallback answer every filter with the same rows."""
+
+import asyncio
+import sqlite3
+
+import pytest
+from databases import Database
+
+from src.db.repos.roster import RosterRepository
+from src.db.snapshot import RosterSnapshot
+from src.models.roster import RosterFilter
+
+SCHEMA = """
+CREATE TABLE users (user_id INTEGER PRIMARY KEY, role TEXT NOT NULL, is_deleted BOOLEAN NOT NULL DEFAULT FALSE);
+CREATE TABLE profiles (
+    user_id INTEGER NOT NULL, first_name TEXT, last_name TEXT, email TEXT,
+    gender TEXT, marital_status TEXT, is_deleted BOOLEAN NOT NULL DEFAULT FALSE
+);
+CREATE TABLE change_log (seq INTEGER PRIMARY KEY AUTOINCREMENT, table_name TEXT, user_id INTEGER, action TEXT);
+"""
+
+# (role, first name, last name, email, gender, marital status)
+PEOPLE = [
+    ("student", "Émile", "Zola", "emile@example.com", "male", "single"),
+    ("student", "émile", "Durand", "e.durand@example.com", "male", None),
+    ("staff", "Ama", "Mensah", "ama_mensah@example.com", "female", "married"),
+    ("staff", "AMA", "Owusu", "ama.owusu@example.com", "female", "single"),
+    ("admin", "Kofi", "100%Boateng", "kofi@example.com", "male", "divorced"),
+    ("student", "Zoë", "Ünal", "ZOE@EXAMPLE.COM", "female", "widowed"),
+    ("student", "Ama", "Back\\slash", "ama@example.com", "female", None),
+]
+
+FILTERS = [
+    RosterFilter(),
+    RosterFilter(search="É"),
+    RosterFilter(search="é"),
+    RosterFilter(search="ÉMILE"),
+    RosterFilter(search="ama"),
+    RosterFilter(search="AMA", role="staff"),
+    RosterFilter(search="_"),
+    RosterFilter(search="%"),
+    RosterFilter(search="a_m"),
+    RosterFilter(search="100%b"),
+    RosterFilter(search="\\"),
+    RosterFilter(search="ü"),
+    RosterFilter(search="Ü"),
+    RosterFilter(search="zoe@"),
+    RosterFilter(search="nobody"),
+    RosterFilter(gender="female", sort="first_name", descending=True),
+    RosterFilter(search="e", sort="user_id", offset=2, limit=3),
+]
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    path = tmp_path / "roster.db"
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    for user_id, (role, *profile) in enumerate(PEOPLE, start=1000001):
+        connection.execute("INSERT INTO users (user_id, role) VALUES (?, ?)", (user_id, role))
+        connection.execute(
+            "INSERT INTO profiles (user_id, first_name, last_name, email, gender, marital_status)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (user_id, *profile),
+        )
+    connection.commit()
+    connection.close()
+    return f"sqlite:///{path}"
+
+
+async def _pages(url: str) -> tuple[list, list]:
+    db = Database(url)
+    await db.connect()
+    try:
+        snapshot = RosterSnapshot(db, max_age=60, max_delta=1000)
+        from_snapshot = [await snapshot.query(roster_filter) for roster_filter in FILTERS]
+        # Nothing attached to db, so the repository queries SQLite
+        from_sql = [await RosterRepository(db).filter_roster(roster_filter) for roster_filter in FILTERS]
+    finally:
+        await db.disconnect()
+    return from_snapshot, from_sql
+
+
+def test_snapshot_and_sql_match(database_url):
+    from_snapshot, from_sql = asyncio.run(_pages(database_url))
+    for roster_filter, snapshot_page, sql_page in zip(FILTERS, from_snapshot, from_sql):
+        assert snapshot_page is not None
+        assert snapshot_page.model_dump() == sql_page.model_dump(), roster_filter
+
+
+def test_search_is_literal_and_folds_ascii_only(database_url):
+    from_snapshot, _ = asyncio.run(_pages(database_url))
+    totals = {roster_filter.search: page.total for roster_filter, page in zip(FILTERS, from_snapshot)}
+    assert totals["É"] == 1
+    assert totals["é"] == 1
+    assert totals["_"] == 1
+    assert totals["%"] == 1
+    assert totals["\\"] == 1
+    assert totals["zoe@"] == 1
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Local webhook receiver for trying out and testing roster change delivery.
+
+Prints every batch it receives. Point the backend at it with
+WEBHOOK_URLS=http://127.0.0.1:8900/hook, and use --fail-rate or --delay-ms to
+exercise retries, backoff and the per-endpoint concurrency limit.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(fail_rate: float, delay: float, log_file):
+    lock = threading.Lock()
+    state = {"in_flight": 0, "peak": 0, "events": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            try:
+                time.sleep(delay)
+                if random.random() < fail_rate:
+                    self.send_response(503)
+                    self.end_headers()
+                    print(f"Rejected a batch of {len(json.loads(body)['events'])} events")
+                    return
+
+                events = json.loads(body)["events"]
+                with lock:
+                    state["events"] += len(events)
+                    print(
+                        f"Received {len(events)} events (total {state['events']}, "
+                        f"peak concurrency {state['peak']}): "
+                        + ", ".join(f"{event['id']}:{event['event']}:{event['user_id']}" for event in events)
+                    )
+                    if log_file:
+                        for event in events:
+                            log_file.write(json.dumps(event) + "\n")
+                        log_file.flush()
+                self.send_response(204)
+                self.end_headers()
+            finally:
+                with lock:
+                    state["in_flight"] -= 1
+
+        def log_message(self, format, *args) -> None:
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of batches answered with 503")
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="Time taken to answer each batch")
+    parser.add_argument("--log", help="Append received events to this file as JSON lines")
+    args = parser.parse_args()
+
+    log_file = open(args.log, "a") if args.log else None
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", args.port), make_handler(args.fail_rate, args.delay_ms / 1000, log_file)
+    )
+    print(f"Listening on http://127.0.0.1:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()